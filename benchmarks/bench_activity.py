@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк журнала активности: запись суток в сегмент, показ последних строк
+чтением с конца файла против readlines(), выборка часа по индексу времени
+против полного просмотра и удаление дня.
+
+Запуск: python benchmarks/bench_activity.py [--records 500000]
+"""
+
+import argparse
+import datetime
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from soika.activity import ActivityLog  # noqa: E402
+
+
+def timed(func, repeat: int = 20) -> float:
+    """Median wall time of ``func`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--records', type=int, default=500_000)
+    args = parser.parse_args()
+
+    day = datetime.date.today() - datetime.timedelta(days=1)
+    midnight = time.mktime(day.timetuple())
+    step = 86400 / args.records
+    with tempfile.TemporaryDirectory() as tmp:
+        log = ActivityLog(Path(tmp))
+        start = time.perf_counter()
+        for i in range(args.records):
+            log.append(midnight + i * step, f"INFO - Выполняется команда #{i}: открой браузер")
+        write = time.perf_counter() - start
+        log.close()
+        log_path, _ = log.paths(day)
+        size = log_path.stat().st_size
+        print(f"Записей: {args.records}, сегмент {size / 1024 ** 2:.1f} МБ, "
+              f"запись {write / args.records * 1e6:.1f} мкс на строку")
+
+        def readlines_tail():
+            with open(log_path, encoding='utf-8') as source:
+                return source.readlines()[-20:]
+
+        def full_scan(start: float, end: float):
+            found = []
+            with open(log_path, 'rb') as source:
+                for line in source:
+                    ts = float(line.split(b'\t', 1)[0])
+                    if start <= ts < end:
+                        found.append(line)
+            return found
+
+        hour = (midnight + 15 * 3600, midnight + 16 * 3600)
+        assert len(log.between(*hour)) == len(full_scan(*hour))
+        print(f"20 последних строк: с конца {timed(lambda: log.tail(20, day)):.3f} мс, "
+              f"readlines {timed(readlines_tail, 5):.1f} мс")
+        print(f"Один час из суток: по индексу {timed(lambda: log.between(*hour), 5):.1f} мс, "
+              f"полный просмотр {timed(lambda: full_scan(*hour), 3):.1f} мс")
+        start = time.perf_counter()
+        log.forget(day)
+        print(f"Удаление дня: {(time.perf_counter() - start) * 1000:.3f} мс")
+
+
+if __name__ == "__main__":
+    main()
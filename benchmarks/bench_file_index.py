@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк индекса файлов на синтетическом дереве из миллиона файлов.
+Дерево живёт в памяти, поэтому измеряется сам индекс, а не скорость диска:
+первичное построение, повторный обход без изменений, обход после изменения части папок,
+сохранение, загрузка и время поиска.
+
+Запуск: python benchmarks/bench_file_index.py [--files 1000000] [--per-dir 100]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from soika.file_index import FileIndex  # noqa: E402
+
+WORDS = ('отчет', 'договор', 'счет', 'план', 'фото', 'песня', 'альбом', 'проект', 'заметки', 'резюме',
+         'report', 'invoice', 'budget', 'summer', 'holiday', 'track', 'mix', 'draft', 'final', 'backup')
+EXTENSIONS = ('.docx', '.pdf', '.txt', '.xlsx', '.mp3', '.flac', '.jpg', '.png', '.mp4', '.zip')
+
+
+class SyntheticIndex(FileIndex):
+    """FileIndex over an in-memory tree: path -> (mtime, files, subdirs)."""
+
+    def __init__(self, tree, path: Path) -> None:
+        super().__init__(roots=['root'], path=path)
+        self.tree = tree
+
+    def _stat(self, path: str) -> float:
+        if path not in self.tree:
+            raise FileNotFoundError(path)
+        return self.tree[path][0]
+
+    def _list(self, path: str):
+        _, files, subdirs = self.tree[path]
+        return list(files), list(subdirs)
+
+
+def build_tree(files: int, per_dir: int, rng: random.Random):
+    tree = {}
+    dirs = max(1, files // per_dir)
+    fanout = 10
+    names = [os.path.join('root', *(f"d{digit}" for digit in f"{i:06d}"[-4:])) for i in range(dirs)]
+    for path in names:
+        listing = [f"{rng.choice(WORDS)}_{rng.choice(WORDS)}_{rng.randrange(10000)}{rng.choice(EXTENSIONS)}"
+                   for _ in range(per_dir)]
+        tree[path] = [1.0, listing, []]
+    # Промежуточные папки
+    for path in list(tree):
+        child = path
+        while child != 'root':
+            parent = os.path.dirname(child)
+            entry = tree.setdefault(parent, [1.0, [], []])
+            name = os.path.basename(child)
+            if name not in entry[2] and len(entry[2]) <= fanout:
+                entry[2].append(name)
+            child = parent
+    return tree
+
+
+def timed(label: str, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:32s} {time.perf_counter() - start:8.2f} с")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="File index benchmark")
+    parser.add_argument("--files", type=int, default=1000000)
+    parser.add_argument("--per-dir", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    tree = build_tree(args.files, args.per_dir, rng)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = SyntheticIndex(tree, Path(tmp) / 'file_index.json')
+        timed("Первичное построение", index.refresh)
+        print(f"Файлов в индексе: {len(index)}, папок: {len(tree)}")
+        timed("Повторный обход без изменений", index.refresh)
+        leaves = [path for path, entry in tree.items() if entry[1]]
+        for path in rng.sample(leaves, len(leaves) // 100):
+            tree[path][0] += 1
+            tree[path][1] = tree[path][1][1:] + [f"новый_{rng.choice(WORDS)}.docx"]
+        timed("Обход после изменения 1% папок", index.refresh)
+        timed("Сохранение", index.save)
+        print(f"Размер файла индекса: {os.path.getsize(index.path) / 1024 ** 2:.1f} МБ")
+        loaded = SyntheticIndex(tree, index.path)
+        timed("Загрузка", loaded.load)
+
+        latencies = []
+        for _ in range(args.queries):
+            query = f"{rng.choice(WORDS)} {rng.choice(WORDS)[:4]} {rng.randrange(10000)}"
+            category = rng.choice((None, 'document', 'music'))
+            start = time.perf_counter()
+            loaded.search(query, category)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"Поиск: p50 {statistics.median(latencies):.2f} мс, "
+              f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} мс, max {latencies[-1]:.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
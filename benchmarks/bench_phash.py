@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк индекса перцептивных хешей экрана.
+Строит индекс из десятков тысяч показов и сравнивает поиск по мультииндексу с полным перебором.
+
+Запуск: python benchmarks/bench_phash.py [--entries 50000] [--screens 2000] [--queries 200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from soika.monitoring.phash import HashIndex, distance  # noqa: E402
+
+
+def flip(value: int, bits: int, rng: random.Random) -> int:
+    for bit in rng.sample(range(64), bits):
+        value ^= 1 << bit
+    return value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Perceptual hash index benchmark")
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--screens", type=int, default=2000, help="Различных экранов в истории")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--distance", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    screens = [rng.getrandbits(64) for _ in range(args.screens)]
+    index = HashIndex(duplicate_distance=0)
+    start = time.perf_counter()
+    for i in range(args.entries):
+        # Возврат к одному из прежних экранов с небольшим шумом
+        index.add(flip(rng.choice(screens), rng.randint(0, 3), rng), float(i))
+    built = time.perf_counter() - start
+
+    queries = [flip(rng.choice(screens), rng.randint(0, 4), rng) for _ in range(args.queries)]
+    index_times, scan_times = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found = index.search(query, args.distance)
+        index_times.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        expected = [i for i, value in enumerate(index.hashes) if distance(value, query) <= args.distance]
+        scan_times.append((time.perf_counter() - start) * 1000)
+        assert len(found) == len(expected)
+
+    print(f"Показов в индексе: {len(index)}, построение {built / args.entries * 1e6:.1f} мкс/кадр")
+    print(f"Память массивов: {(index.hashes.itemsize + 2 * index.first.itemsize) * len(index) / 1024:.0f} КБ")
+    print(f"Мультииндекс:   p50 {statistics.median(index_times):.2f} мс, max {max(index_times):.2f} мс")
+    print(f"Полный перебор: p50 {statistics.median(scan_times):.2f} мс, max {max(scan_times):.2f} мс")
+
+
+if __name__ == "__main__":
+    main()
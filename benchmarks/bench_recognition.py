@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Офлайн-бенчмарк распознавания: сравнивает время до запуска команды
+при ожидании финального результата и при раннем запуске по частичному,
+а также стоимость пересчёта n-best вариантов по грамматике команд.
+
+Запуск: python benchmarks/bench_recognition.py [файл_с_фразами] [--wav файл.wav]
+"""
+
+import argparse
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from soika.capture import Utterance  # noqa: E402
+from soika.recognition import ScriptedBackend, transcribe  # noqa: E402
+from soika.router import Command, CommandRouter  # noqa: E402
+
+
+TRANSCRIPTS = [
+    'который час сейчас подскажи',
+    'сделай тише пожалуйста',
+    'открой проводник',
+    'найди картинку котики',
+    'сколько времени',
+]
+
+# Первый вариант распознан неверно, правильный ниже в списке
+NBEST = [
+    ['который чаc', 'который час', 'которых час', 'который часть', 'каторый час'],
+    ['открой провод ник', 'открой проводник', 'открыть проводник', 'открой проводник а', 'открой про водник'],
+    ['найди картину котики', 'найди картинку котики', 'найди картинки котики', 'найти картинку котики', 'найди'],
+    ['сделай тиши', 'сделай тише', 'сделать тише', 'сделай тишь', 'с дела и тише'],
+]
+
+
+def noop(*_args: object) -> None:
+    return None
+
+
+ROUTER = CommandRouter([
+    Command('time', noop, phrases=('который час', 'сколько времени'), early=True),
+    Command('volume_down', noop, phrases=('сделай тише',), early=True),
+    Command('explorer', noop, phrases=('открой проводник',)),
+    Command('images', noop, prefixes=('найди картинку',)),
+    Command('search', noop, prefixes=('найди',)),
+])
+
+
+def make_utterance(wav: str = "") -> Utterance:
+    if wav:
+        return Utterance.from_wav(wav)
+    utterance = Utterance(16000, 2, [b"\x00\x00" * 1024] * 16)
+    utterance.close()
+    return utterance
+
+
+def run(transcripts: list, word_delay: float, early: bool, wav: str) -> float:
+    backend = ScriptedBackend(transcripts, word_delay=word_delay)
+    accept = (lambda text: ROUTER.resolve_early(text) is not None) if early else None
+    total = 0.0
+    for _ in transcripts:
+        start = time.perf_counter()
+        hypothesis = transcribe(backend, make_utterance(wav), accept)
+        if hypothesis is not None:
+            ROUTER.resolve(hypothesis.text)
+        total += time.perf_counter() - start
+    return total / len(transcripts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline recognition latency benchmark")
+    parser.add_argument("transcripts", nargs="?", help="Файл с фразами, по одной на строку")
+    parser.add_argument("--wav", default="", help="WAV-файл, подаваемый как звук каждой фразы")
+    parser.add_argument("--word-delay", type=float, default=0.05, help="Задержка декодера на слово, с")
+    args = parser.parse_args()
+    transcripts = TRANSCRIPTS
+    if args.transcripts:
+        transcripts = ScriptedBackend.from_file(args.transcripts).transcripts
+    final = run(transcripts, args.word_delay, early=False, wav=args.wav)
+    early = run(transcripts, args.word_delay, early=True, wav=args.wav)
+    print(f"Фраз: {len(transcripts)}, задержка на слово: {args.word_delay * 1000:.0f} мс")
+    print(f"Ожидание финального результата: {final * 1000:8.1f} мс на команду")
+    print(f"Ранний запуск по частичному:    {early * 1000:8.1f} мс на команду")
+
+    repeat = 2000
+    batched = timeit.timeit(lambda: [ROUTER.pick(nbest) for nbest in NBEST], number=repeat)
+    single = timeit.timeit(lambda: [[ROUTER.resolve(text) for text in nbest] for nbest in NBEST], number=repeat)
+    picked = [nbest[ROUTER.pick(nbest)[0]] for nbest in NBEST]
+    fixed = sum(1 for nbest, text in zip(NBEST, picked) if text == nbest[1])
+    per_list = 1e6 / (repeat * len(NBEST))
+    print(f"Пересчёт n-best ({len(NBEST[0])} вариантов): {batched * per_list:6.1f} мкс на список одним проходом, "
+          f"{single * per_list:6.1f} мкс на отдельный разбор каждого варианта без выбора; исправлено {fixed} из {len(NBEST)}")
+
+
+if __name__ == "__main__":
+    main()
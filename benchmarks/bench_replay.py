@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Сквозной бенчмарк: записанные фразы (WAV) или расшифровки прогоняются через
+весь конвейер Soika — захват, распознавание, разбор, действие, озвучивание —
+без микрофона, динамиков и сети. Микрофон, распознаватель и pyttsx3 заменены
+имитациями: микрофон «произносит» следующую фразу, когда Soika закончила
+отвечать, распознаватель выдаёт расшифровку, синтез «говорит» паузой по
+длине текста. Системные вызовы действий (os.system, webbrowser.open)
+перехватываются и только подсчитываются.
+
+Печатает p50/p95/p99 по этапам и команды в секунду; с --save-baseline
+сохраняет результат как эталон, иначе сравнивает с эталоном и завершается
+с кодом 1, если p95 какого-либо этапа или пропускная способность ухудшились
+больше порога.
+
+Запуск: python benchmarks/bench_replay.py [--script фразы.txt | --wav-dir папка] [--speed 4]
+        [--repeat 1] [--threshold 0.2] [--save-baseline]
+"""
+
+import argparse
+import array
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+import types
+import wave
+import webbrowser
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BASELINE_PATH = Path(__file__).resolve().parent / 'baselines' / 'replay.json'
+THRESHOLD = 0.2           # допустимое ухудшение относительно эталона
+SLACK_MS = 5.0            # абсолютный допуск для быстрых этапов, где шум сравним со временем
+SAMPLE_RATE = 16000
+CHUNK = 1024
+WORD_SECONDS = 0.35       # длительность синтетического слова
+CHAR_SECONDS = 0.06       # «произнесение» одного символа ответа
+GAP_SECONDS = 0.3         # пауза пользователя после ответа Soika
+TURN_TIMEOUT = 15.0       # секунд на одну фразу до признания её потерянной
+STAGES = ('capture', 'recognize', 'queue', 'dispatch', 'command', 'speak.wait', 'speak', 'response')
+
+# Безопасные команды: ничего не открывают и не меняют в системе
+SCRIPT = [
+    'привет',
+    'который час',
+    'какой сегодня день',
+    'расскажи шутку',
+    'какие таймеры',
+    'прочитай заметки',
+    'что ты можешь',
+    'который чаc | который час',
+    'сделай что-нибудь непонятное',
+    'сколько времени',
+]
+
+
+class FakeEngine:
+    """pyttsx3 stand-in: «speaks» by sleeping in proportion to the text length."""
+
+    def __init__(self, speed: float, on_say: Callable[[str], None]) -> None:
+        self.speed = speed
+        self.on_say = on_say
+        self._queue: List[str] = []
+        self._stop = threading.Event()
+
+    def setProperty(self, name: str, value: object) -> None:
+        return None
+
+    def getProperty(self, name: str) -> object:
+        return 'replay'
+
+    def connect(self, topic: str, callback: Callable) -> None:
+        return None
+
+    def say(self, text: str) -> None:
+        self._queue.append(text)
+
+    def save_to_file(self, text: str, path: str) -> None:
+        return None
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def runAndWait(self) -> None:
+        self._stop.clear()
+        for text in self._queue:
+            self.on_say(text)
+            self._stop.wait(len(text) * CHAR_SECONDS / self.speed)
+        self._queue.clear()
+
+
+class FakeMicrophone:
+    """``sr.Microphone`` stand-in that plays the next utterance once Soika has finished answering."""
+
+    SAMPLE_WIDTH = 2
+    CHUNK = CHUNK
+
+    def __init__(self, utterances: List[bytes], sample_rate: int, speed: float,
+                 busy: Callable[[], bool]) -> None:
+        self.SAMPLE_RATE = sample_rate
+        self.stream = self
+        self.speed = speed
+        self.busy = busy
+        self.turn = threading.Event()
+        self.pending = list(utterances)
+        self.ended_at: Optional[float] = None   # конец последней произнесённой фразы
+        self.awaiting_reply = False
+        self._chunks: List[bytes] = []
+        self._idle = 0
+        self._chunk_seconds = CHUNK / sample_rate
+        rng = random.Random(1)
+        self._silence = array.array('h', (rng.randint(-40, 40) for _ in range(CHUNK))).tobytes()
+
+    def __enter__(self) -> 'FakeMicrophone':
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+    def read(self, size: int) -> bytes:
+        time.sleep(self._chunk_seconds / self.speed)
+        if not self._chunks:
+            self._idle = self._idle + 1 if self.turn.is_set() and not self.busy() else 0
+            if not self.pending or self._idle * self._chunk_seconds < GAP_SECONDS:
+                return self._silence
+            self.turn.clear()
+            audio = self.pending.pop(0)
+            step = CHUNK * self.SAMPLE_WIDTH
+            self._chunks = [audio[i:i + step].ljust(step, b'\x00') for i in range(0, len(audio), step)]
+        chunk = self._chunks.pop(0)
+        if not self._chunks:
+            self.ended_at = time.monotonic()
+            self.awaiting_reply = True
+        return chunk
+
+
+def synthetic_speech(text: str, sample_rate: int) -> bytes:
+    """A tone as long as the phrase would take to say; only its loudness matters to capture."""
+    samples = int(len(text.split()) * WORD_SECONDS * sample_rate)
+    return array.array('h', (int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate))
+                             for i in range(samples))).tobytes()
+
+
+def load_wav_dir(directory: Path) -> Tuple[List[str], List[bytes], int]:
+    """``*.wav`` files (mono, 16 bit, one sample rate) with transcripts in ``*.txt`` next to them."""
+    transcripts, utterances, rates = [], [], set()
+    for path in sorted(directory.glob('*.wav')):
+        with wave.open(str(path), 'rb') as wav:
+            if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+                raise SystemExit(f"{path.name}: нужен моно WAV 16 бит")
+            rates.add(wav.getframerate())
+            utterances.append(wav.readframes(wav.getnframes()))
+        transcripts.append(path.with_suffix('.txt').read_text(encoding='utf-8').strip())
+    if not utterances:
+        raise SystemExit(f"В {directory} нет WAV-файлов")
+    if len(rates) > 1:
+        raise SystemExit("Все WAV-файлы должны иметь одну частоту дискретизации")
+    return transcripts, utterances, rates.pop()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def replay(transcripts: List[str], utterances: List[bytes], sample_rate: int,
+           speed: float, word_delay: float) -> Dict[str, object]:
+    mic: Optional[FakeMicrophone] = None
+
+    def on_say(text: str) -> None:
+        if mic is not None and mic.awaiting_reply and mic.ended_at is not None:
+            mic.awaiting_reply = False
+            metrics.observe('response', (time.monotonic() - mic.ended_at) * 1000)
+
+    # Подмена pyttsx3 до первой фразы: движок создаётся в потоке синтеза при первом вызове
+    pyttsx3 = types.ModuleType('pyttsx3')
+    pyttsx3.init = lambda *args, **kwargs: FakeEngine(speed, on_say)  # type: ignore[attr-defined]
+    sys.modules['pyttsx3'] = pyttsx3
+
+    from soika import app, voice  # noqa: E402
+    from soika.capture import CaptureSession  # noqa: E402
+    from soika.metrics import metrics  # noqa: E402
+    from soika.recognition import ScriptedBackend  # noqa: E402
+    from soika.speech import speaker  # noqa: E402
+
+    suppressed: List[str] = []
+    os.system = lambda command: suppressed.append(command) or 0  # type: ignore[assignment]
+    webbrowser.open = lambda url, *args, **kwargs: suppressed.append(url) or True  # type: ignore[assignment]
+
+    speaker.cache = None
+    metrics.keep_samples = True
+    metrics.reset()
+    mic = FakeMicrophone(utterances, sample_rate, speed, busy=lambda: speaker.speaking)
+    voice.configure(backend=ScriptedBackend(transcripts, word_delay=word_delay / speed))
+    session = CaptureSession(microphone_factory=lambda: mic, is_muted=lambda: speaker.speaking,
+                             on_barge_in=speaker.interrupt)
+    session.start()
+    pipeline = app.build_pipeline(lambda: session)
+    pipeline.start()
+
+    executed = lost = 0
+    started = time.monotonic()
+    mic.turn.set()
+    while executed + lost < len(utterances):
+        pending = pipeline.next_command(timeout=TURN_TIMEOUT / speed + 5)
+        if pending is None:
+            lost += 1
+            mic.turn.set()
+            continue
+        app.execute_pending(pending)
+        executed += 1
+        mic.turn.set()
+    while speaker.speaking:
+        time.sleep(0.01)
+    elapsed = time.monotonic() - started
+    pipeline.stop()
+    session.stop()
+
+    stages = {}
+    for name in STAGES:
+        values = metrics.samples.get(name, [])
+        if values:
+            stages[name] = {'p50': round(percentile(values, 0.5), 2), 'p95': round(percentile(values, 0.95), 2),
+                            'p99': round(percentile(values, 0.99), 2), 'count': len(values)}
+    command_ms = sum(metrics.samples.get('command', [])) or 1e-9
+    return {
+        'stages': stages,
+        'executed': executed,
+        'lost': lost,
+        'elapsed': elapsed,
+        'commands_per_second': executed / elapsed,
+        'executor_per_second': executed / (command_ms / 1000),
+        'suppressed': len(suppressed),
+    }
+
+
+def compare(result: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for name, base in baseline['stages'].items():
+        current = result['stages'].get(name)
+        if current is None:
+            continue
+        limit = base['p95'] * (1 + threshold) + SLACK_MS
+        if current['p95'] > limit:
+            regressions.append(f"{name}: p95 {current['p95']:.1f} мс > {limit:.1f} мс (эталон {base['p95']:.1f})")
+    limit = baseline['commands_per_second'] * (1 - threshold)
+    if result['commands_per_second'] < limit:
+        regressions.append(f"команд/с {result['commands_per_second']:.2f} < {limit:.2f} "
+                           f"(эталон {baseline['commands_per_second']:.2f})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end replay benchmark")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--script', help="Файл с расшифровками, по одной фразе на строку (варианты через |)")
+    source.add_argument('--wav-dir', help="Папка с фразами: name.wav и расшифровка в name.txt")
+    parser.add_argument('--speed', type=float, default=4.0, help="Во сколько раз ускорить речь, паузы и синтез")
+    parser.add_argument('--word-delay', type=float, default=0.05, help="Задержка распознавателя на слово, с")
+    parser.add_argument('--repeat', type=int, default=1, help="Сколько раз повторить сценарий")
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    if args.wav_dir:
+        transcripts, utterances, sample_rate = load_wav_dir(Path(args.wav_dir))
+        name = f"wav:{Path(args.wav_dir).name}"
+    else:
+        transcripts = SCRIPT
+        if args.script:
+            lines = Path(args.script).read_text(encoding='utf-8').splitlines()
+            transcripts = [line.strip() for line in lines if line.strip()]
+        sample_rate = SAMPLE_RATE
+        utterances = [synthetic_speech(text.split('|')[0], sample_rate) for text in transcripts]
+        name = f"script:{Path(args.script).name}" if args.script else 'script:builtin'
+    transcripts, utterances = transcripts * args.repeat, utterances * args.repeat
+    settings = {'source': name, 'phrases': len(transcripts), 'speed': args.speed, 'word_delay': args.word_delay}
+
+    result = replay(transcripts, utterances, sample_rate, args.speed, args.word_delay)
+    print(f"Фраз: {len(transcripts)}, ускорение ×{args.speed:g}, выполнено {result['executed']}, "
+          f"потеряно {result['lost']}, перехвачено системных вызовов {result['suppressed']}")
+    print(f"{'этап':<12} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9} {'n':>5}")
+    for stage, values in result['stages'].items():
+        print(f"{stage:<12} {values['p50']:>9.1f} {values['p95']:>9.1f} {values['p99']:>9.1f} {values['count']:>5}")
+    print(f"Команд в секунду: {result['commands_per_second']:.2f} в диалоге "
+          f"({result['elapsed']:.1f} с), {result['executor_per_second']:.0f} на исполнителе")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {'settings': settings, 'stages': result['stages'],
+                'commands_per_second': round(result['commands_per_second'], 3)}
+        baseline_path.write_text(json.dumps(data, ensure_ascii=False, indent=1), encoding='utf-8')
+        print(f"Эталон сохранён в {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print("Эталона нет; сохраните его с --save-baseline")
+        return
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    if baseline.get('settings') != settings:
+        print(f"Эталон снят с другими параметрами ({baseline.get('settings')}), сравнение пропущено")
+        return
+    regressions = compare(result, baseline, args.threshold)
+    for line in regressions:
+        print(f"Регрессия: {line}")
+    print("ПРОВАЛ" if regressions else f"OK (порог {args.threshold:.0%})")
+    sys.exit(1 if regressions or result['lost'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Микро-бенчмарк маршрутизатора команд: время разбора не должно расти
+вместе с числом зарегистрированных команд. Отдельно измеряется неточное
+сопоставление искажённых распознаванием фраз.
+
+Запуск: python benchmarks/bench_router.py
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from soika.fuzzy import FuzzyMatcher  # noqa: E402
+from soika.router import Command, CommandRouter  # noqa: E402
+
+
+WORDS = [
+    'открой', 'найди', 'включи', 'выключи', 'покажи', 'запиши', 'сделай', 'поставь',
+    'музыку', 'браузер', 'заметку', 'таймер', 'экран', 'папку', 'файл', 'громче',
+    'почту', 'календарь', 'погоду', 'новости', 'игру', 'режим', 'логи', 'память',
+]
+
+TRANSCRIPTS = [
+    'открой проводник',
+    'найди картинку котики',
+    'сделай тише пожалуйста',
+    'напомни мне позвонить маме в 8:30',
+    'скажи что-нибудь непонятное совсем',
+]
+
+MISHEARD = [
+    'открой проводнк',
+    'найди картинк котики',
+    'сделай по тише',
+    'напомни позвонить маме в 8:30',
+]
+
+
+def noop(*_args: object) -> None:
+    return None
+
+
+def synthetic_commands(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    commands = [
+        Command('explorer', noop, phrases=('открой проводник',)),
+        Command('images', noop, prefixes=('найди картинку',)),
+        Command('search', noop, prefixes=('найди',)),
+        Command('volume_down', noop, phrases=('сделай тише',)),
+        Command('reminder', noop, prefixes=('напомни мне',)),
+    ]
+    while len(commands) < count:
+        phrase = ' '.join(rng.sample(WORDS, 3)) + f' {len(commands)}'
+        if rng.random() < 0.5:
+            commands.append(Command(f'cmd_{len(commands)}', noop, phrases=(phrase,)))
+        else:
+            commands.append(Command(f'cmd_{len(commands)}', noop, prefixes=(phrase,)))
+    return commands
+
+
+def linear_resolve(commands: list, text: str):
+    """Эквивалент старой цепочки if/elif: проверка каждой команды по очереди."""
+    for command in commands:
+        if any(phrase in text for phrase in command.phrases):
+            return command
+        if any(text.startswith(prefix + ' ') for prefix in command.prefixes):
+            return command
+    return None
+
+
+def main() -> None:
+    repeat = 2000
+    print(f"{'команд':>8} {'trie, мкс':>12} {'линейно, мкс':>14} {'компиляция, мс':>16}")
+    for count in (50, 100, 250, 500, 1000):
+        commands = synthetic_commands(count)
+        start = timeit.default_timer()
+        router = CommandRouter(commands)
+        compile_ms = (timeit.default_timer() - start) * 1000
+        compiled = timeit.timeit(lambda: [router.resolve(t) for t in TRANSCRIPTS], number=repeat)
+        linear = timeit.timeit(lambda: [linear_resolve(commands, t) for t in TRANSCRIPTS], number=repeat)
+        per_call = 1e6 / (repeat * len(TRANSCRIPTS))
+        print(f"{count:>8} {compiled * per_call:>12.2f} {linear * per_call:>14.2f} {compile_ms:>16.2f}")
+
+    print()
+    print(f"{'команд':>8} {'неточно, мкс':>14} {'индекс, мс':>12}")
+    for count in (50, 100, 250, 500, 1000):
+        commands = synthetic_commands(count)
+        start = timeit.default_timer()
+        matcher = FuzzyMatcher(commands)
+        build_ms = (timeit.default_timer() - start) * 1000
+        fuzzy = timeit.timeit(lambda: [matcher.match(t) for t in MISHEARD], number=repeat // 4)
+        print(f"{count:>8} {fuzzy * 1e6 / (repeat // 4 * len(MISHEARD)):>14.2f} {build_ms:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
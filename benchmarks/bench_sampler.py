@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сэмплера ресурсов: собственная нагрузка на процессор.
+Опрашивает метрики с ускоренными интервалами и сравнивает нагрузку с бюджетом.
+
+Запуск: python benchmarks/bench_sampler.py [--seconds 10] [--speedup 10]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from soika.sampler import MAX_OVERHEAD, SAMPLE_RATES, ResourceSampler  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resource sampler overhead benchmark")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--speedup", type=float, default=10.0, help="Во сколько раз чаще обычного опрашивать")
+    args = parser.parse_args()
+
+    rates = {name: rate / args.speedup for name, rate in SAMPLE_RATES.items()}
+    sampler = ResourceSampler(rates)
+    sampler.start()
+    time.sleep(args.seconds)
+    sampler.stop()
+
+    overhead = sampler.overhead()
+    print(f"Интервалы ускорены в {args.speedup:g} раз, замеров: {sampler.samples}")
+    for name, series in sampler.series.items():
+        print(f"  {name:7s} значений {len(series):4d}, последнее {series.last or 0:8.1f}, "
+              f"среднее {series.mean or 0:8.1f}, макс {series.maximum or 0:8.1f}")
+    print(f"Нагрузка: {overhead * 100:.3f}% ядра при ускорении, "
+          f"~{overhead * 100 / args.speedup:.4f}% при обычных интервалах (бюджет {MAX_OVERHEAD * 100:g}%)")
+
+
+if __name__ == "__main__":
+    main()
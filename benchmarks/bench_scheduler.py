@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк планировщика: 10 000 таймеров на одном потоке.
+Измеряет скорость постановки и отмены, опоздание срабатывания и число потоков.
+
+Запуск: python benchmarks/bench_scheduler.py [--count 10000] [--spread 3]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from soika.scheduler import Scheduler  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Scheduler benchmark")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--spread", type=float, default=3.0, help="Интервал сроков, с")
+    args = parser.parse_args()
+
+    scheduler = Scheduler()
+    lateness = []
+    done = threading.Event()
+    fired = [0]
+    threads_before = threading.active_count()
+
+    def callback(event) -> None:
+        lateness.append(time.time() - event.due)
+        fired[0] += 1
+        if fired[0] == expected:
+            done.set()
+
+    rng = random.Random(1)
+    start = time.perf_counter()
+    base = time.time() + 0.5
+    ids = [scheduler.schedule(base + rng.random() * args.spread, callback, kind='timer')
+           for _ in range(args.count)]
+    scheduled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cancelled = ids[::2]
+    for event_id in cancelled:
+        scheduler.cancel(event_id)
+    cancel_time = time.perf_counter() - start
+    expected = args.count - len(cancelled)
+    threads_during = threading.active_count()
+
+    done.wait(args.spread + 10)
+    scheduler.stop()
+    lateness.sort()
+    print(f"Событий: {args.count}, отменено: {len(cancelled)}, сработало: {fired[0]}")
+    print(f"Постановка: {scheduled / args.count * 1e6:.1f} мкс/событие")
+    print(f"Отмена:     {cancel_time / len(cancelled) * 1e6:.1f} мкс/событие")
+    print(f"Опоздание p50: {statistics.median(lateness) * 1000:.2f} мс, "
+          f"p99: {lateness[int(len(lateness) * 0.99) - 1] * 1000:.2f} мс")
+    print(f"Потоков до: {threads_before}, во время работы: {threads_during}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Проверка холодного старта: импорт soika.app в отдельном интерпретаторе
+с `-X importtime` должен укладываться в бюджет и не подтягивать тяжёлые
+модули (окно мониторинга, обработку изображений, синтез речи), которые
+загружаются только при первой команде. Код возврата 1 — бюджет превышен
+или тяжёлый модуль импортирован заранее.
+
+Запуск: python benchmarks/check_import_time.py [--budget 300] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_BUDGET_MS = 300
+# Модули, которые не должны загружаться при старте
+DEFERRED = ('tkinter', 'PIL', 'pyautogui', 'pyttsx3', 'soika.monitoring', 'soika.actions.web',
+            'soika.actions.system', 'soika.commands')
+
+
+def measure(module: str):
+    """One cold import: total milliseconds and {module: (self µs, cumulative µs)}."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, env=dict(os.environ, PYTHONDONTWRITEBYTECODE='1'),
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Импорт {module} завершился ошибкой:\n{result.stderr[-2000:]}")
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(own), int(cumulative))
+    return modules[module][1] / 1000, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--module', default='soika.app')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS, help='бюджет в миллисекундах')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    # Первый прогон прогревает файловый кэш и не учитывается
+    measure(args.module)
+    runs = [measure(args.module) for _ in range(args.runs)]
+    total = statistics.median(ms for ms, _ in runs)
+    modules = runs[-1][1]
+
+    print(f"Импорт {args.module}: {total:.1f} мс (медиана {args.runs} прогонов), бюджет {args.budget:.0f} мс")
+    print("Самые долгие модули (собственное время):")
+    for name, (own, cumulative) in sorted(modules.items(), key=lambda item: -item[1][0])[:args.top]:
+        print(f"  {own / 1000:>8.1f} мс  {name}")
+
+    early = sorted(name for name in modules
+                   if any(name == deferred or name.startswith(deferred + '.') for deferred in DEFERRED))
+    failed = False
+    if early:
+        print(f"Загружены при старте, хотя должны подключаться по требованию: {', '.join(early)}")
+        failed = True
+    if total > args.budget:
+        print(f"Бюджет превышен на {total - args.budget:.1f} мс")
+        failed = True
+    print("ПРОВАЛ" if failed else "OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import os
-import subprocess
 from pathlib import Path
+from typing import Optional
 
+from ..file_index import file_index
+from ..results import attach
 from ..speech import speak
 from ..utils import error_handler
 
@@ -19,14 +21,19 @@ def create_folder(folder_name: str) -> None:
 
 
 @error_handler
-def search_file(filename: str) -> None:
+def search_file(filename: str, category: Optional[str] = None) -> None:
     if not filename or filename.strip() == "":
         speak("Пожалуйста, укажите название файла для поиска.")
         return
-    result = subprocess.run(['where', filename], capture_output=True, text=True)
-    if result.returncode == 0:
-        speak(f"Файл {filename} найден.")
-        print(f"Путь: {result.stdout}")
+    if not file_index.ready.is_set():
+        speak("Я ещё составляю список файлов, попробуйте чуть позже.")
+        return
+    found = file_index.search(filename, category)
+    attach(paths=[str(path) for path in found])
+    if found:
+        speak(f"Нашла {filename}: {len(found)} совпадений." if len(found) > 1 else f"Файл {filename} найден.")
+        for path in found:
+            print(f"Путь: {path}")
     else:
         speak(f"Файл {filename} не найден.")
 
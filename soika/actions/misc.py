@@ -3,19 +3,23 @@ from __future__ import annotations
 import datetime
 import random
 
-from ..speech import speak
+from ..results import attach
+from ..speech import speak, speak_template
 from ..utils import error_handler
 
 
 @error_handler
 def get_date() -> None:
     now = datetime.datetime.now()
+    attach(date=now.date().isoformat())
     speak(f"Сегодня {now.strftime('%d %B %Y, %A')}")
 
 
 @error_handler
 def get_time() -> None:
-    speak(f"Сейчас {datetime.datetime.now().strftime('%H:%M')}")
+    now = datetime.datetime.now().strftime('%H:%M')
+    attach(time=now)
+    speak_template("Сейчас {time}", time=now)
 
 
 @error_handler
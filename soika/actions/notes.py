@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 import datetime
-from typing import List, Dict, Any
 
-from ..speech import speak
+from ..results import attach
+from ..speech import PRIORITY_ALARM, speak
 from ..utils import error_handler
-from ..state import state
+from ..state import append_item, put_item, remove_item, state
+from ..scheduler import ScheduledEvent, scheduler
+from ..timeparse import parse_time
+
+
+def _reminder_due(event: ScheduledEvent) -> None:
+    remove_item('reminders', event.id)
+    speak(f"Напоминание: {event.payload['text']}", priority=PRIORITY_ALARM)
 
 
 @error_handler
@@ -16,8 +23,31 @@ def add_reminder(text: str, time_str: str) -> None:
     if not time_str or time_str.strip() == "":
         speak("Пожалуйста, укажите время напоминания.")
         return
-    state.reminders.append({'text': text, 'time': time_str, 'created': datetime.datetime.now().isoformat()})
-    speak(f"Напоминание '{text}' на {time_str} добавлено.")
+    due = parse_time(time_str)
+    if due is None:
+        speak(f"Не поняла время '{time_str}'. Скажите, например, в 8:30 или через 20 минут.")
+        return
+    reminder_id = scheduler.schedule(due, _reminder_due, kind='reminder', payload={'text': text})
+    put_item('reminders', reminder_id, {
+        'text': text,
+        'time': time_str,
+        'due': due.isoformat(),
+        'created': datetime.datetime.now().isoformat(),
+    })
+    attach(id=reminder_id, due=due.isoformat())
+    speak(f"Напоминание '{text}' на {due.strftime('%d.%m %H:%M')} добавлено.")
+
+
+def rearm_reminders() -> None:
+    """Re-schedule reminders restored from disk; overdue ones fire right away."""
+    now = datetime.datetime.now()
+    for reminder_id, reminder in list(state.reminders.items()):
+        if 'due' not in reminder:
+            continue
+        scheduler.reserve_id(reminder_id)
+        due = max(datetime.datetime.fromisoformat(reminder['due']), now)
+        scheduler.schedule(due, _reminder_due, kind='reminder', payload={'text': reminder['text']},
+                           event_id=reminder_id)
 
 
 @error_handler
@@ -25,12 +55,13 @@ def add_note(text: str) -> None:
     if not text or text.strip() == "":
         speak("Пожалуйста, укажите текст заметки.")
         return
-    state.notes.append({'text': text, 'timestamp': datetime.datetime.now().isoformat()})
+    append_item('notes', {'text': text, 'timestamp': datetime.datetime.now().isoformat()})
     speak(f"Заметка '{text}' добавлена.")
 
 
 @error_handler
 def read_notes() -> None:
+    attach(notes=[note['text'] for note in state.notes])
     if not state.notes:
         speak("У вас нет заметок.")
         return
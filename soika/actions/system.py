@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import os
 import time
-import psutil
 
+from ..cleanup import TERMINATE, engine
 from ..speech import speak
 from ..utils import error_handler
 
@@ -31,14 +31,9 @@ def lock_computer() -> None:
 @error_handler
 def clear_memory() -> None:
     try:
-        for proc in psutil.process_iter(['pid', 'name']):
-            if proc.info['name'] in ['chrome.exe', 'firefox.exe', 'msedge.exe']:
-                try:
-                    proc.kill()
-                except Exception:
-                    pass
+        report = engine.run(TERMINATE)
         os.system("ipconfig /flushdns")
-        speak("Память очищена, фоновые процессы закрыты.")
+        speak(report.summary())
     except Exception:
         speak("Частично очистила память.")
 
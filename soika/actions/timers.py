@@ -1,12 +1,42 @@
 from __future__ import annotations
 
 import datetime
-import threading
-import time
+from typing import Optional
 
-from ..speech import speak
+from ..results import attach
+from ..speech import PRIORITY_ALARM, speak, speak_template
 from ..utils import error_handler
-from ..state import state
+from ..state import put_item, remove_item, state
+from ..scheduler import ScheduledEvent, scheduler
+
+
+SNOOZE_MINUTES = 5
+
+_last_alarm: Optional[ScheduledEvent] = None
+
+
+def _number(event_id: str) -> str:
+    return event_id.rpartition('_')[2]
+
+
+def _timer_done(event: ScheduledEvent) -> None:
+    remove_item('timers', event.id)
+    speak_template("Таймер на {minutes} минут завершен!", priority=PRIORITY_ALARM, minutes=event.payload['duration'])
+
+
+def _alarm_done(event: ScheduledEvent) -> None:
+    global _last_alarm
+    _last_alarm = event
+    remove_item('alarms', event.id)
+    speak_template("Будильник! Время {time}", priority=PRIORITY_ALARM, time=event.payload['time'])
+
+
+def _next_occurrence(hour: int, minute: int) -> datetime.datetime:
+    now = datetime.datetime.now()
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += datetime.timedelta(days=1)
+    return target
 
 
 @error_handler
@@ -19,18 +49,16 @@ def set_timer(duration: str) -> None:
         if minutes <= 0:
             speak("Время таймера должно быть больше нуля.")
             return
-        timer_id = f"timer_{len(state.timers)}"
-        state.timers[timer_id] = {
+        now = datetime.datetime.now()
+        end_time = now + datetime.timedelta(minutes=minutes)
+        timer_id = scheduler.schedule(end_time, _timer_done, kind='timer', payload={'duration': minutes})
+        put_item('timers', timer_id, {
             'duration': minutes,
-            'start_time': datetime.datetime.now(),
-            'end_time': datetime.datetime.now() + datetime.timedelta(minutes=minutes),
-        }
-        def timer_thread() -> None:
-            time.sleep(minutes * 60)
-            speak(f"Таймер на {minutes} минут завершен!")
-            state.timers.pop(timer_id, None)
-        threading.Thread(target=timer_thread, daemon=True).start()
-        speak(f"Таймер на {minutes} минут установлен.")
+            'start_time': now.isoformat(),
+            'end_time': end_time.isoformat(),
+        })
+        attach(id=timer_id, due=end_time.isoformat())
+        speak_template("Таймер на {minutes} минут установлен.", minutes=minutes)
     except ValueError:
         speak("Пожалуйста, укажите время в минутах.")
 
@@ -45,24 +73,93 @@ def set_alarm(time_str: str) -> None:
         except ValueError:
             speak("Пожалуйста, укажите время в формате ЧЧ:ММ (например, 08:30)")
             return
-        alarm_id = f"alarm_{len(state.alarms)}"
-        state.alarms[alarm_id] = {
-            'time': time_str,
-            'hour': hour,
-            'minute': minute,
+        target = _next_occurrence(hour, minute)
+        payload = {'time': time_str, 'hour': hour, 'minute': minute}
+        alarm_id = scheduler.schedule(target, _alarm_done, kind='alarm', payload=payload)
+        put_item('alarms', alarm_id, {
+            **payload,
+            'due': target.isoformat(),
             'created': datetime.datetime.now().isoformat(),
-        }
-        def alarm_checker() -> None:
-            while True:
-                now = datetime.datetime.now()
-                if now.hour == hour and now.minute == minute:
-                    speak(f"Будильник! Время {time_str}")
-                    state.alarms.pop(alarm_id, None)
-                    break
-                time.sleep(30)
-        threading.Thread(target=alarm_checker, daemon=True).start()
-        speak(f"Будильник на {time_str} установлен.")
+        })
+        attach(id=alarm_id, due=target.isoformat())
+        speak_template("Будильник на {time} установлен.", time=time_str)
     except Exception:
         speak("Не удалось установить будильник.")
 
 
+@error_handler
+def list_timers() -> None:
+    events = scheduler.pending('timer') + scheduler.pending('alarm')
+    attach(events=[{'id': event.id, 'kind': event.kind, 'due': event.due_at.isoformat()} for event in sorted(events)])
+    if not events:
+        speak("Нет активных таймеров и будильников.")
+        return
+    for event in sorted(events):
+        if event.kind == 'timer':
+            left = max(0, int((event.due_at - datetime.datetime.now()).total_seconds() // 60))
+            speak(f"Таймер {_number(event.id)}: осталось {left} минут.")
+        else:
+            speak(f"Будильник {_number(event.id)} на {event.payload['time']}.")
+
+
+def _cancel(kind: str, number: str, name: str) -> None:
+    number = number.strip()
+    if not number:
+        events = scheduler.pending(kind)
+        if not events:
+            speak(f"{name.capitalize()} не найден.")
+            return
+        if len(events) > 1:
+            speak(f"Уточните номер {name}а: {', '.join(_number(e.id) for e in events)}.")
+            return
+        event_id = events[0].id
+    else:
+        event_id = f"{kind}_{number}"
+    if scheduler.cancel(event_id):
+        remove_item('timers' if kind == 'timer' else 'alarms', event_id)
+        speak(f"{name.capitalize()} {_number(event_id)} отменён.")
+    else:
+        speak(f"{name.capitalize()} {number} не найден.")
+
+
+@error_handler
+def cancel_timer(number: str) -> None:
+    _cancel('timer', number, 'таймер')
+
+
+@error_handler
+def cancel_alarm(number: str) -> None:
+    _cancel('alarm', number, 'будильник')
+
+
+@error_handler
+def snooze_alarm() -> None:
+    global _last_alarm
+    event = _last_alarm
+    if event is None:
+        speak("Нет будильника, который можно отложить.")
+        return
+    _last_alarm = None
+    target = datetime.datetime.now() + datetime.timedelta(minutes=SNOOZE_MINUTES)
+    scheduler.schedule(target, _alarm_done, kind='alarm', payload=event.payload, event_id=event.id)
+    put_item('alarms', event.id, {
+        **event.payload,
+        'due': target.isoformat(),
+        'created': datetime.datetime.now().isoformat(),
+    })
+    speak(f"Откладываю будильник на {SNOOZE_MINUTES} минут.")
+
+
+def rearm() -> None:
+    """Re-schedule timers and alarms restored from disk; overdue ones fire right away."""
+    now = datetime.datetime.now()
+    for timer_id, timer in list(state.timers.items()):
+        scheduler.reserve_id(timer_id)
+        end_time = max(datetime.datetime.fromisoformat(timer['end_time']), now)
+        scheduler.schedule(end_time, _timer_done, kind='timer', payload={'duration': timer['duration']},
+                           event_id=timer_id)
+    for alarm_id, alarm in list(state.alarms.items()):
+        scheduler.reserve_id(alarm_id)
+        due = max(datetime.datetime.fromisoformat(alarm['due']), now)
+        payload = {'time': alarm['time'], 'hour': alarm.get('hour'), 'minute': alarm.get('minute')}
+        scheduler.schedule(due, _alarm_done, kind='alarm', payload=payload, event_id=alarm_id)
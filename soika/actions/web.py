@@ -3,6 +3,7 @@ from __future__ import annotations
 import webbrowser
 from urllib.parse import quote
 
+from ..sites import site_url
 from ..speech import speak
 from ..utils import error_handler
 
@@ -12,14 +13,7 @@ def open_website(site_name: str) -> None:
     if not site_name or site_name.strip() == "":
         speak("Пожалуйста, укажите название сайта.")
         return
-    sites = {
-        'google': 'https://www.google.com',
-        'яндекс': 'https://www.yandex.ru',
-        'youtube': 'https://www.youtube.com',
-        'gmail': 'https://mail.google.com',
-        'почта': 'https://mail.yandex.ru'
-    }
-    url = sites.get(site_name, f'https://{site_name}' if not site_name.startswith('http') else site_name)
+    url = site_url(site_name) or f'https://{site_name}'
     webbrowser.open(url)
     speak(f"Открываю {site_name}.")
 
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import bisect
+import datetime
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple
+
+
+ACTIVITY_DIR = Path('soika_state') / 'activity'
+INDEX_STEP = 60.0        # секунд между отметками индекса времени
+KEEP_DAYS = 30           # сегменты старше удаляются при смене дня
+TAIL_BLOCK = 8192        # байт, читаемых с конца файла за один шаг
+ACTIVITY_FORMAT = '%(levelname)s - %(message)s'
+
+# Отметка индекса: время первой записи после отметки и её смещение в сегменте
+_MARK = struct.Struct('<dQ')
+
+
+def day_of(ts: float) -> datetime.date:
+    return datetime.date.fromtimestamp(ts)
+
+
+def _parse(line: bytes) -> Optional[Tuple[float, str]]:
+    """``(time, text)`` of a segment line; None for a damaged line, which readers skip."""
+    ts, tab, text = line.rstrip(b'\n').partition(b'\t')
+    if not tab:
+        return None
+    try:
+        return float(ts), text.decode('utf-8', errors='replace')
+    except ValueError:
+        return None
+
+
+def _show(ts: float, text: str) -> str:
+    return f"{time.strftime('%H:%M:%S', time.localtime(ts))} - {text}"
+
+
+class ActivityLog:
+    """Activity records split into one segment per day.
+
+    Each line of ``<day>.log`` is ``<unix time>\\t<text>``; ``<day>.idx`` holds
+    an ``(time, offset)`` mark every ``INDEX_STEP`` seconds, so a time range is
+    read from the nearest mark instead of the start of the day. Tails are read
+    backwards from the end of the file, and forgetting a day unlinks its two
+    files.
+    """
+
+    def __init__(self, directory: Path = ACTIVITY_DIR, index_step: float = INDEX_STEP,
+                 keep_days: int = KEEP_DAYS) -> None:
+        self.directory = directory
+        self.index_step = index_step
+        self.keep_days = keep_days
+        self._day: Optional[datetime.date] = None
+        self._log: Optional[BinaryIO] = None
+        self._index: Optional[BinaryIO] = None
+        self._last_mark = float('-inf')
+        self._lock = threading.Lock()
+
+    def paths(self, day: datetime.date) -> Tuple[Path, Path]:
+        name = day.isoformat()
+        return self.directory / f'{name}.log', self.directory / f'{name}.idx'
+
+    def days(self) -> List[datetime.date]:
+        if not self.directory.exists():
+            return []
+        found = []
+        for path in self.directory.glob('*.log'):
+            try:
+                found.append(datetime.date.fromisoformat(path.stem))
+            except ValueError:
+                continue
+        return sorted(found)
+
+    # Запись
+
+    def _open(self, day: datetime.date) -> None:
+        self._close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        log_path, index_path = self.paths(day)
+        self._log = open(log_path, 'ab')
+        self._index = open(index_path, 'ab')
+        self._day = day
+        self._last_mark = float('-inf')
+        if index_path.stat().st_size >= _MARK.size:
+            with open(index_path, 'rb') as index:
+                index.seek(-_MARK.size, os.SEEK_END)
+                self._last_mark = _MARK.unpack(index.read(_MARK.size))[0]
+        self._drop_old(day)
+
+    def _close(self) -> None:
+        for handle in (self._log, self._index):
+            if handle is not None:
+                handle.close()
+        self._log = self._index = None
+        self._day = None
+
+    def _drop_old(self, today: datetime.date) -> None:
+        oldest = today - datetime.timedelta(days=self.keep_days)
+        for day in self.days():
+            if day < oldest:
+                self._unlink(day)
+
+    def append(self, ts: float, text: str) -> None:
+        day = day_of(ts)
+        line = f"{ts:.3f}\t{text.replace(chr(10), ' ')}\n".encode('utf-8')
+        with self._lock:
+            if day != self._day:
+                self._open(day)
+            assert self._log is not None and self._index is not None
+            if ts - self._last_mark >= self.index_step:
+                self._index.write(_MARK.pack(ts, self._log.tell()))
+                self._index.flush()
+                self._last_mark = ts
+            self._log.write(line)
+            self._log.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    # Чтение
+
+    def tail(self, count: int, day: Optional[datetime.date] = None) -> List[str]:
+        """Last ``count`` records of ``day`` (today by default), oldest first."""
+        log_path, _ = self.paths(day or datetime.date.today())
+        try:
+            source = open(log_path, 'rb')
+        except FileNotFoundError:
+            return []
+        with source:
+            position = source.seek(0, os.SEEK_END)
+            chunk = b''
+            # Лишний перевод строки: первая строка блока может быть неполной
+            while position > 0 and chunk.count(b'\n') <= count:
+                step = min(TAIL_BLOCK, position)
+                position -= step
+                source.seek(position)
+                chunk = source.read(step) + chunk
+        lines = chunk.splitlines()
+        if position > 0:
+            lines = lines[1:]
+        records = [record for record in map(_parse, lines) if record is not None]
+        return [_show(*record) for record in records[-count:]]
+
+    def _marks(self, index_path: Path) -> Tuple[List[float], List[int]]:
+        times: List[float] = []
+        offsets: List[int] = []
+        try:
+            data = index_path.read_bytes()
+        except FileNotFoundError:
+            return times, offsets
+        for ts, offset in _MARK.iter_unpack(data[:len(data) - len(data) % _MARK.size]):
+            times.append(ts)
+            offsets.append(offset)
+        return times, offsets
+
+    def between(self, start: float, end: float) -> List[str]:
+        """Records with ``start <= time < end``, read from the closest index mark."""
+        found: List[str] = []
+        day, last = day_of(start), day_of(end)
+        while day <= last:
+            log_path, index_path = self.paths(day)
+            day += datetime.timedelta(days=1)
+            times, offsets = self._marks(index_path)
+            position = bisect.bisect_right(times, start) - 1
+            try:
+                source = open(log_path, 'rb')
+            except FileNotFoundError:
+                continue
+            with source:
+                source.seek(offsets[position] if position >= 0 else 0)
+                for line in source:
+                    record = _parse(line)
+                    if record is None:
+                        continue
+                    if record[0] >= end:
+                        break
+                    if record[0] >= start:
+                        found.append(_show(*record))
+        return found
+
+    # Удаление
+
+    def _unlink(self, day: datetime.date) -> bool:
+        removed = False
+        for path in self.paths(day):
+            try:
+                path.unlink()
+                removed = True
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def forget(self, day: datetime.date) -> bool:
+        """Drop a whole day; returns False if nothing was recorded that day."""
+        with self._lock:
+            if day == self._day:
+                self._close()
+            return self._unlink(day)
+
+
+class ActivityHandler(logging.Handler):
+    """Logging handler that appends formatted records to an ``ActivityLog``."""
+
+    def __init__(self, log: ActivityLog, level: int = logging.INFO) -> None:
+        super().__init__(level)
+        self.log = log
+        self.setFormatter(logging.Formatter(ACTIVITY_FORMAT))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.log.append(record.created, self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+activity = ActivityLog()
@@ -1,153 +1,128 @@
 from __future__ import annotations
 
 import logging
-import threading
 import time
+from functools import partial
+from typing import Callable, Optional
 
 from .logging_config import configure_logging
-from .speech import speak
-from .voice import listen_command
-from .background import background_clear_memory, background_check_memory
-from .commands import (
-    shutdown_computer, restart_computer, lock_computer, clear_memory, open_task_manager, open_explorer,
-    open_website, search_web, translate_text, search_images,
-    search_file, open_folder, create_folder,
-    control_music,
-    get_date, get_time, get_weather,
-    add_note, read_notes, add_reminder,
-    set_timer, set_alarm,
-    toggle_privacy_mode, toggle_learning_mode, toggle_do_not_disturb,
-    show_activity_logs, clear_yesterday_data, get_system_insights, adapt_to_game,
-)
-from .monitoring.screen import toggle_monitoring
-
-
-logger = configure_logging()
-
-
-def process_command(command: str) -> None:
-    if not command or command.strip() == "":
-        speak("Я не получила команду для обработки.")
+from .metrics import exporter, metrics
+from .speech import speak, speaker
+from .startup import Startup
+from .voice import get_capture_session, open_microphone, recognize_utterance, warm_up_recognizer
+from .capture import CaptureSession
+from .pipeline import CommandPipeline, PendingCommand
+from .background import start_resource_monitor
+from .sampler import ResourceSampler
+from .file_index import file_index
+from .dispatcher import choose_alternative, process_command, router
+from .state import attach_store, state
+from .persistence import StateStore
+from .actions.timers import rearm
+from .actions.notes import rearm_reminders
+
+
+logger = logging.getLogger("soika")
+
+
+def restore_state() -> StateStore:
+    """Load saved state and start journaling; raises if the state cannot be restored."""
+    store = StateStore()
+    try:
+        replayed = store.load(state)
+    except Exception:
+        logger.error("Не удалось восстановить сохранённое состояние", exc_info=True)
+        store.close()
+        raise
+    attach_store(store)
+    logger.info(f"Состояние восстановлено: заметок {len(state.notes)}, таймеров {len(state.timers)}, "
+                f"будильников {len(state.alarms)}, записей журнала {replayed}")
+    return store
+
+
+def rearm_state(startup: Startup) -> None:
+    """Re-schedule restored timers and reminders once speech is up, or tell the user they were lost."""
+    if not startup.wait('state'):
+        speak("Не удалось восстановить сохранённые заметки, таймеры и напоминания.")
         return
+    try:
+        rearm()
+        rearm_reminders()
+    except Exception:
+        logger.error("Не удалось заново запустить таймеры и напоминания", exc_info=True)
+        speak("Не удалось заново запустить сохранённые таймеры и напоминания.")
+
+
+def execute_pending(pending: PendingCommand) -> None:
+    started = time.monotonic()
+    metrics.observe('queue', (started - pending.recognized_at) * 1000)
+    logger.info(f"Выполняется команда #{pending.seq}: {pending.text}",
+                extra={'stage': 'recognize', 'latency_ms': round((started - pending.heard_at) * 1000, 1)})
+    with metrics.span('command'):
+        result = process_command(pending.text)
+    logger.info(f"Команда #{pending.seq} выполнена: {result.status}",
+                extra={'stage': 'execute', 'latency_ms': round((time.monotonic() - started) * 1000, 1)})
+
 
-    # Системные команды
-    if any(phrase in command for phrase in ['заверши работу компьютера', 'выключи компьютер', 'выключи пк']):
-        shutdown_computer()
-    elif any(phrase in command for phrase in ['перезагрузи компьютер', 'перезапусти компьютер']):
-        restart_computer()
-    elif any(phrase in command for phrase in ['заблокируй компьютер', 'заблокируй экран']):
-        lock_computer()
-    elif any(phrase in command for phrase in ['очисти память', 'очисти кэш', 'освободи ресурсы']):
-        clear_memory()
-    elif 'открой диспетчер задач' in command:
-        open_task_manager()
-    elif 'открой проводник' in command:
-        open_explorer()
-    elif 'создай папку' in command:
-        folder_name = command.replace('создай папку', '').strip()
-        create_folder(folder_name) if folder_name else speak("Пожалуйста, укажите название папки.")
-    # Интернет и браузер
-    elif 'открой google' in command:
-        open_website('google')
-    elif 'открой яндекс' in command:
-        open_website('яндекс')
-    elif 'открой youtube' in command:
-        open_website('youtube')
-    elif 'открой почту' in command:
-        open_website('почта')
-    elif command.startswith('открой ') and 'открой google' not in command and 'открой яндекс' not in command:
-        open_website(command.replace('открой ', '').strip())
-    elif command.startswith('найди ') and all(x not in command for x in ['картинку', 'файл', 'документ', 'музыку']):
-        search_web(command.replace('найди ', '').strip())
-    elif command.startswith('переведи '):
-        translate_text(command.replace('переведи ', '').replace(' на английский', '').strip())
-    elif command.startswith('найди картинку '):
-        search_images(command.replace('найди картинку ', '').strip())
-    # Поиск на компьютере
-    elif command.startswith('найди файл '):
-        search_file(command.replace('найди файл ', '').strip())
-    elif command.startswith('открой папку '):
-        open_folder(command.replace('открой папку ', '').strip())
-    elif command.startswith('найди документ '):
-        search_file(command.replace('найди документ ', '').strip())
-    elif command.startswith('найди музыку '):
-        search_file(command.replace('найди музыку ', '').strip())
-    # Мультимедиа
-    elif 'включи музыку' in command:
-        control_music('play')
-    elif 'поставь музыку на паузу' in command:
-        control_music('pause')
-    elif 'включи следующее' in command:
-        control_music('next')
-    elif 'сделай громче' in command:
-        control_music('volume_up')
-    elif 'сделай тише' in command:
-        control_music('volume_down')
-    elif command.startswith('открой фильм '):
-        search_web(f"смотреть {command.replace('открой фильм ', '').strip()} онлайн")
-    # Разное
-    elif 'какой сегодня день' in command:
-        get_date()
-    elif 'который час' in command or 'сколько времени' in command:
-        get_time()
-    elif 'какая погода' in command:
-        get_weather()
-    elif command.startswith('напомни мне ') and ' в ' in command:
-        parts = command.replace('напомни мне ', '').split(' в ')
-        if len(parts) == 2:
-            add_reminder(parts[0].strip(), parts[1].strip())
-        else:
-            speak("Пожалуйста, укажите время напоминания.")
-    elif command.startswith('запиши заметку '):
-        add_note(command.replace('запиши заметку ', '').strip())
-    elif 'прочитай заметки' in command:
-        read_notes()
-    elif command.startswith('включи таймер на '):
-        set_timer(command.replace('включи таймер на ', '').replace(' минут', '').strip())
-    elif command.startswith('включи будильник на '):
-        set_alarm(command.replace('включи будильник на ', '').strip())
-    # Система мониторинга и обучения
-    elif 'включи мониторинг экрана' in command or 'выключи мониторинг экрана' in command:
-        toggle_monitoring()
-    elif 'включи режим конфиденциальности' in command:
-        toggle_privacy_mode()
-    elif 'начни обучение поведения' in command or 'останови обучение' in command:
-        toggle_learning_mode()
-    elif command.startswith('адаптируйся к игре '):
-        adapt_to_game(command.replace('адаптируйся к игре ', '').strip().strip('"'))
-    elif 'включи режим не беспокоить' in command:
-        toggle_do_not_disturb()
-    elif 'покажи логи активности' in command:
-        show_activity_logs()
-    elif 'забудь данные за вчера' in command:
-        clear_yesterday_data()
-    elif 'какие у тебя догадки' in command:
-        get_system_insights()
-    # Базовые команды
-    elif 'привет' in command:
-        speak("Привет! Я Soika, как я могу помочь?")
-    elif 'что ты можешь' in command or 'что ты умеешь' in command:
-        speak("Я Soika, и я могу выполнять различные команды: управлять компьютером, работать с интернетом, искать файлы, управлять музыкой, устанавливать напоминания и таймеры, а также многое другое.")
-    elif any(x in command for x in ['расскажи шутку', 'пошути', 'шутка']):
-        from .actions.misc import tell_joke
-        tell_joke()
-    else:
-        speak("Я не знаю, как выполнить эту команду. Попробуйте сказать 'что ты можешь' для списка команд.")
+def build_pipeline(session: Callable[[], CaptureSession] = get_capture_session) -> CommandPipeline:
+    # Следующая команда распознаётся, пока выполняется предыдущая
+    return CommandPipeline(session, partial(recognize_utterance, rescore=choose_alternative),
+                           early=lambda text: router.resolve_early(text) is not None)
+
+
+def _warm_up_tts() -> None:
+    if not speaker.warm_up():
+        raise RuntimeError("синтез речи недоступен")
+
+
+def start_components() -> Startup:
+    """Bring up speech, audio, recognition and background services concurrently."""
+    return Startup([
+        ('tts', _warm_up_tts),
+        ('microphone', open_microphone),
+        ('recognizer', warm_up_recognizer),
+        ('state', restore_state),
+        ('resources', start_resource_monitor),
+        ('file_index', file_index.start),
+        ('metrics', exporter.start),
+    ]).start()
+
+
+def shutdown(pipeline: CommandPipeline, startup: Startup) -> None:
+    pipeline.stop()
+    monitor: Optional[ResourceSampler] = startup.result('resources')
+    if monitor is not None:
+        monitor.stop()
+    file_index.stop()
+    store: Optional[StateStore] = startup.result('state')
+    if store is not None:
+        store.close()
+    speak("До свидания!", wait=True)
+    exporter.stop()
 
 
 def run_app() -> None:
+    configure_logging()
     logger.info("Soika запущена")
+    startup = start_components()
+    # Приветствие звучит, как только готов синтез; микрофон и распознавание поднимаются параллельно
+    startup.wait('tts')
     speak("Привет! Я Soika, ваш голосовой помощник. Как я могу помочь?")
-    threading.Thread(target=background_clear_memory, args=(clear_memory,), daemon=True).start()
-    threading.Thread(target=background_check_memory, daemon=True).start()
+    # Просроченные события срабатывают при перезапуске, поэтому их планируем только после приветствия
+    rearm_state(startup)
+    startup.wait('microphone', 'recognizer')
+    pipeline = build_pipeline()
+    pipeline.start()
+    startup.wait()
+    startup.log_report()
     while True:
         try:
-            command = listen_command()
-            if command:
-                process_command(command)
+            pending = pipeline.next_command(timeout=1)
+            if pending:
+                execute_pending(pending)
         except KeyboardInterrupt:
             logger.info("Soika остановлена пользователем")
-            speak("До свидания!")
+            shutdown(pipeline, startup)
             break
         except Exception:
             logger.error("Критическая ошибка", exc_info=True)
@@ -155,7 +130,5 @@ def run_app() -> None:
             time.sleep(2)
         except SystemExit:
             logger.info("Soika завершена системой")
-            speak("До свидания!")
+            shutdown(pipeline, startup)
             break
-
-
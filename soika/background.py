@@ -1,36 +1,30 @@
 from __future__ import annotations
 
-import time
-import psutil
-
-from .speech import speak
-
-
-def background_clear_memory(clear_fn) -> None:
-    while True:
-        try:
-            time.sleep(60)
-            clear_fn()
-        except Exception:
-            pass
-        except KeyboardInterrupt:
-            break
-
-
-def background_check_memory() -> None:
-    warned = False
-    while True:
-        try:
-            time.sleep(30)
-            mem = psutil.virtual_memory()
-            if mem.percent >= 80 and not warned:
-                speak(f"Внимание! Использование оперативной памяти {mem.percent} процентов.")
-                warned = True
-            elif mem.percent < 80:
-                warned = False
-        except Exception:
-            pass
-        except KeyboardInterrupt:
-            break
+from .cleanup import ESCALATE_AFTER, PRESSURE_PERCENT, RELIEF_PERCENT, engine
+from .sampler import ResourceSampler, Rule, sampler
+from .speech import PRIORITY_WARNING, speak
 
 
+MEMORY_WARNING = 80    # процентов занятой памяти для предупреждения
+MEMORY_CLEAR = 75      # ниже этого предупреждение снова может сработать
+WARNING_COOLDOWN = 600
+
+
+def _warn_memory(percent: float) -> None:
+    speak(f"Внимание! Использование оперативной памяти {percent:.0f} процентов.", priority=PRIORITY_WARNING)
+
+
+def _notify(text: str) -> None:
+    speak(text, priority=PRIORITY_WARNING)
+
+
+def start_resource_monitor() -> ResourceSampler:
+    """Start the shared sampler with the memory warning and cleanup rules."""
+    sampler.add_rule(Rule('memory_warning', 'memory', MEMORY_WARNING, MEMORY_CLEAR, _warn_memory,
+                          cooldown=WARNING_COOLDOWN))
+    engine.notify = _notify
+    # Очистка запускается только при нехватке памяти и усиливается, пока давление не спадёт
+    sampler.add_rule(Rule('memory_cleanup', 'memory', PRESSURE_PERCENT, RELIEF_PERCENT, engine.on_pressure,
+                          cooldown=ESCALATE_AFTER, aggregate='mean', repeat=True, on_clear=engine.on_relief))
+    sampler.start()
+    return sampler
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+import wave
+from collections import deque
+from typing import Any, Callable, Deque, Iterator, List, Optional
+
+import speech_recognition as sr
+
+
+logger = logging.getLogger("soika")
+
+BUFFER_SECONDS = 10.0      # ёмкость кольцевого буфера
+PRE_ROLL_SECONDS = 0.5     # сколько звука до начала речи добавлять к фразе
+PAUSE_SECONDS = 0.8        # тишина, после которой фраза считается законченной
+PHRASE_TIME_LIMIT = 10.0
+MIN_PHRASE_SECONDS = 0.25  # более короткие всплески считаются шумом
+ENERGY_RATIO = 1.5         # порог речи относительно уровня шума
+MIN_ENERGY = 150.0
+NOISE_DAMPING = 0.15       # скорость адаптации уровня шума (доля за секунду)
+NOISE_RISE = 0.02          # медленный рост уровня шума во время «речи», чтобы постоянный шум не считался речью
+BARGE_IN_RATIO = 3.0       # во время речи Soika перебить её может только громкий голос
+BARGE_IN_SECONDS = 0.2
+
+
+_SAMPLE_TYPES = {1: 'int8', 2: 'int16', 4: 'int32'}
+
+
+def rms(chunk: bytes, width: int) -> float:
+    """Root mean square of signed PCM samples, as ``audioop.rms`` computed it."""
+    import numpy as np  # numpy нужен только при захвате звука, не при запуске
+    usable = len(chunk) - len(chunk) % width
+    if not usable:
+        return 0.0
+    if width == 3:
+        raw = np.frombuffer(chunk, np.uint8, count=usable).reshape(-1, 3).astype(np.int32)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = np.where(samples & 0x800000, samples - 0x1000000, samples)
+    else:
+        samples = np.frombuffer(chunk, _SAMPLE_TYPES[width], count=usable // width)
+    return float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+
+
+class Utterance:
+    """Frames of one phrase, readable while it is still being captured."""
+
+    def __init__(self, sample_rate: int, sample_width: int, frames: Optional[List[bytes]] = None) -> None:
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.discarded = False
+        self.started_at = time.monotonic()
+        self.ended_at: Optional[float] = None
+        self._frames: List[bytes] = []
+        self._closed = threading.Event()
+        self._cond = threading.Condition()
+        for frame in frames or []:
+            self.append(frame)
+
+    @classmethod
+    def from_wav(cls, path: str, chunk_size: int = 1024) -> "Utterance":
+        with wave.open(path, 'rb') as wav:
+            utterance = cls(wav.getframerate(), wav.getsampwidth())
+            while True:
+                frame = wav.readframes(chunk_size)
+                if not frame:
+                    break
+                utterance.append(frame)
+        utterance.close()
+        return utterance
+
+    def append(self, frame: bytes) -> None:
+        with self._cond:
+            self._frames.append(frame)
+            self._cond.notify_all()
+
+    def close(self, discarded: bool = False) -> None:
+        with self._cond:
+            self.discarded = discarded
+            self.ended_at = time.monotonic()
+            self._closed.set()
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def chunks(self) -> Iterator[bytes]:
+        """Yield frames as they arrive until the phrase ends."""
+        index = 0
+        while True:
+            with self._cond:
+                while index >= len(self._frames) and not self._closed.is_set():
+                    self._cond.wait()
+                if self.discarded:
+                    return
+                if index >= len(self._frames):
+                    return
+                frame = self._frames[index]
+            index += 1
+            yield frame
+
+    def audio(self) -> sr.AudioData:
+        """Block until the phrase is complete and return it as ``sr.AudioData``."""
+        return sr.AudioData(b"".join(self.chunks()), self.sample_rate, self.sample_width)
+
+
+class CaptureSession:
+    """Long-lived microphone capture with a ring buffer and a running noise floor.
+
+    A reader thread keeps the input stream open, so the microphone is never
+    reopened or recalibrated between commands. Complete utterances, including
+    a short pre-roll, are queued as :class:`Utterance` objects as soon as
+    speech starts, so streaming recognizers can consume frames live.
+    """
+
+    def __init__(self,
+                 microphone_factory: Callable[[], Any] = sr.Microphone,
+                 is_muted: Optional[Callable[[], bool]] = None,
+                 on_barge_in: Optional[Callable[[], None]] = None,
+                 max_pending: int = 4) -> None:
+        self._microphone_factory = microphone_factory
+        self._is_muted = is_muted or (lambda: False)
+        self._on_barge_in = on_barge_in
+        self._utterances: "queue.Queue[Utterance]" = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ring: Deque[bytes] = deque()
+        self.noise_floor: Optional[float] = None
+        self.sample_rate = 16000
+        self.sample_width = 2
+        self.chunk_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def threshold(self) -> float:
+        return max(MIN_ENERGY, (self.noise_floor or MIN_ENERGY) * ENERGY_RATIO)
+
+    def start(self, timeout: float = 5.0) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name="soika-capture", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def next_utterance(self, timeout: Optional[float] = None) -> Optional[Utterance]:
+        try:
+            return self._utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _run(self) -> None:
+        try:
+            with self._microphone_factory() as source:
+                self.sample_rate = source.SAMPLE_RATE
+                self.sample_width = source.SAMPLE_WIDTH
+                self.chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+                self._ring = deque(maxlen=max(1, int(BUFFER_SECONDS / self.chunk_seconds)))
+                self._ready.set()
+                self._loop(source)
+        except Exception as exc:
+            logger.error(f"Ошибка захвата звука с микрофона: {exc}")
+        finally:
+            self._ready.set()
+
+    def _loop(self, source: Any) -> None:
+        pre_roll = max(1, int(PRE_ROLL_SECONDS / self.chunk_seconds))
+        pause_chunks = max(1, int(PAUSE_SECONDS / self.chunk_seconds))
+        limit_chunks = max(1, int(PHRASE_TIME_LIMIT / self.chunk_seconds))
+        min_chunks = max(1, int(MIN_PHRASE_SECONDS / self.chunk_seconds))
+        barge_in_chunks = max(1, int(BARGE_IN_SECONDS / self.chunk_seconds))
+        damping = min(1.0, NOISE_DAMPING * self.chunk_seconds)
+        rise = min(1.0, NOISE_RISE * self.chunk_seconds)
+        phrase: Optional[Utterance] = None
+        voiced = silent = loud = 0
+        while not self._stop.is_set():
+            chunk = source.stream.read(source.CHUNK)
+            if not chunk:
+                break
+            self._ring.append(chunk)
+            energy = rms(chunk, self.sample_width)
+            if self._is_muted():
+                if phrase is not None:
+                    phrase.close(discarded=True)
+                    phrase = None
+                loud = loud + 1 if energy > self.threshold * BARGE_IN_RATIO else 0
+                if loud >= barge_in_chunks and self._on_barge_in is not None:
+                    loud = 0
+                    self._on_barge_in()
+                continue
+            loud = 0
+            if phrase is None:
+                if self.noise_floor is None:
+                    self.noise_floor = energy
+                if energy > self.threshold:
+                    phrase = self._open(list(self._ring)[-pre_roll - 1:])
+                    voiced, silent = 1, 0
+                else:
+                    self.noise_floor += (energy - self.noise_floor) * damping
+                continue
+            phrase.append(chunk)
+            if energy > self.threshold:
+                voiced += 1
+                silent = 0
+                # Уровень шума подтягивается вверх и во время «речи»: иначе выросший фоновый шум не даёт закончить фразу
+                self.noise_floor += (energy - self.noise_floor) * rise
+            else:
+                silent += 1
+            if silent >= pause_chunks or len(phrase) >= limit_chunks:
+                phrase.close(discarded=voiced < min_chunks)
+                phrase = None
+        if phrase is not None:
+            phrase.close(discarded=voiced < min_chunks)
+
+    def _open(self, frames: List[bytes]) -> Utterance:
+        utterance = Utterance(self.sample_rate, self.sample_width, frames)
+        try:
+            self._utterances.put_nowait(utterance)
+        except queue.Full:
+            logger.warning("Очередь фраз переполнена, фраза отброшена")
+        return utterance
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+import psutil
+
+
+logger = logging.getLogger("soika")
+
+PRESSURE_PERCENT = 85      # занятой памяти, при котором начинается очистка
+RELIEF_PERCENT = 75        # ниже этого давление считается снятым
+ESCALATE_AFTER = 120       # секунд под давлением до следующей ступени
+MAX_TARGETS = 3            # процессов за один проход
+MIN_TARGET_MB = 200        # процессы меньше этого не трогаем
+SETTLE_SECONDS = 2.0       # пауза перед замером освобождённой памяти
+DRY_RUN = False
+
+# Процессы, которые можно закрыть на последней ступени
+ALLOW_LIST = ('chrome.exe', 'firefox.exe', 'msedge.exe', 'opera.exe', 'brave.exe')
+# Процессы, которые нельзя трогать ни на какой ступени
+DENY_LIST = (
+    'system', 'system idle process', 'registry', 'smss.exe', 'csrss.exe', 'wininit.exe',
+    'winlogon.exe', 'services.exe', 'lsass.exe', 'svchost.exe', 'dwm.exe', 'explorer.exe',
+    'audiodg.exe', 'python.exe', 'pythonw.exe',
+)
+
+WARN, TRIM, TERMINATE = 0, 1, 2
+LEVEL_NAMES = {WARN: 'предупреждение', TRIM: 'сжатие рабочего набора', TERMINATE: 'закрытие процессов'}
+
+# Кандидат: имя, pid, RSS и оценка освобождаемой памяти в байтах
+Candidate = Tuple[str, int, int, int]
+
+
+@dataclass
+class CleanupReport:
+    level: int
+    dry_run: bool
+    actions: List[Tuple[str, int, str]] = field(default_factory=list)  # имя, pid, действие
+    available_before: int = 0
+    available_after: int = 0
+
+    @property
+    def recovered(self) -> int:
+        return max(0, self.available_after - self.available_before)
+
+    def summary(self) -> str:
+        if not self.actions:
+            return "Подходящих процессов для очистки не нашлось."
+        names = ', '.join(sorted({name for name, _, _ in self.actions}))
+        if self.dry_run:
+            return f"Пробный запуск, {LEVEL_NAMES[self.level]}: {names}."
+        return f"Освобождено {self.recovered / 1024 ** 2:.0f} мегабайт: {names}."
+
+
+def _reclaimable(memory: Any) -> int:
+    """Private memory where the platform reports it, otherwise RSS minus shared pages."""
+    private = getattr(memory, 'private', None)
+    if private:
+        return private
+    return memory.rss - getattr(memory, 'shared', 0)
+
+
+def _empty_working_set(pid: int) -> bool:
+    """Ask Windows to page out a process's working set; no-op elsewhere."""
+    if sys.platform != 'win32':
+        return False
+    import ctypes
+    PROCESS_QUERY_INFORMATION, PROCESS_SET_QUOTA = 0x0400, 0x0100
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(PROCESS_QUERY_INFORMATION | PROCESS_SET_QUOTA, False, pid)
+    if not handle:
+        return False
+    try:
+        return bool(ctypes.windll.psapi.EmptyWorkingSet(handle))
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class CleanupEngine:
+    """Frees memory under pressure, escalating warn → trim → terminate.
+
+    Candidates are ranked by reclaimable memory. ``DENY_LIST`` processes and
+    Soika itself are never touched; only ``ALLOW_LIST`` processes may be
+    terminated. In dry-run mode the report lists the actions without doing them.
+    """
+
+    def __init__(self, allow: Tuple[str, ...] = ALLOW_LIST, deny: Tuple[str, ...] = DENY_LIST,
+                 dry_run: bool = DRY_RUN, notify: Optional[Callable[[str], None]] = None) -> None:
+        self.allow = {name.lower() for name in allow}
+        self.deny = {name.lower() for name in deny}
+        self.dry_run = dry_run
+        self.notify = notify
+        self.level = WARN
+        self.history: List[CleanupReport] = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def candidates(self, level: int) -> List[Candidate]:
+        found: List[Candidate] = []
+        for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
+            name = (proc.info.get('name') or '').lower()
+            memory = proc.info.get('memory_info')
+            if memory is None or proc.info['pid'] == self._pid or name in self.deny:
+                continue
+            if level == TERMINATE:
+                # Браузер раскладывает память по многим мелким процессам: порог размера здесь не применяем
+                if name not in self.allow:
+                    continue
+            elif memory.rss < MIN_TARGET_MB * 1024 * 1024:
+                continue
+            found.append((name, proc.info['pid'], memory.rss, _reclaimable(memory)))
+        found.sort(key=lambda item: item[3], reverse=True)
+        return found
+
+    def run(self, level: Optional[int] = None) -> CleanupReport:
+        with self._lock:
+            level = self.level if level is None else level
+            report = CleanupReport(level, self.dry_run, available_before=psutil.virtual_memory().available)
+            targets = self.candidates(level)
+            if level == TERMINATE:
+                # Все процессы одного приложения закрываются вместе, иначе браузер перезапустит вкладки
+                names = {name for name, _, _, _ in targets[:MAX_TARGETS]}
+                targets = [target for target in targets if target[0] in names]
+            else:
+                targets = targets[:MAX_TARGETS]
+            for name, pid, rss, _ in targets:
+                action = self._act(level, pid)
+                report.actions.append((name, pid, action))
+                logger.info(f"Очистка памяти ({LEVEL_NAMES[level]}): {name} pid={pid} "
+                            f"RSS {rss / 1024 ** 2:.0f} МБ — {action}")
+            if targets and level != WARN and not self.dry_run:
+                time.sleep(SETTLE_SECONDS)
+            report.available_after = psutil.virtual_memory().available
+            self.history.append(report)
+            logger.info(f"Очистка памяти завершена: {report.summary()}")
+            return report
+
+    def _act(self, level: int, pid: int) -> str:
+        if level == WARN:
+            return 'отмечен'
+        if self.dry_run:
+            return 'пропущен (пробный запуск)'
+        try:
+            if level == TRIM:
+                return 'сжат' if _empty_working_set(pid) else 'не поддерживается'
+            psutil.Process(pid).terminate()
+            return 'закрыт'
+        except psutil.Error as exc:
+            return f'ошибка: {exc}'
+
+    def on_pressure(self, percent: float) -> None:
+        """Sampler rule callback: run at the current level, then escalate."""
+        def work() -> None:
+            report = self.run()
+            if self.notify is not None and report.actions:
+                if report.level == WARN:
+                    names = ', '.join(name for name, _, _ in report.actions)
+                    self.notify(f"Памяти не хватает ({percent:.0f} процентов). Больше всего занимают: {names}.")
+                else:
+                    self.notify(report.summary())
+            self.level = min(TERMINATE, self.level + 1)
+        threading.Thread(target=work, name="soika-cleanup", daemon=True).start()
+
+    def on_relief(self, percent: float) -> None:
+        self.level = WARN
+
+
+engine = CleanupEngine()
@@ -1,17 +1,18 @@
 from __future__ import annotations
 
+import datetime
+import time
+from typing import List
+
+from .activity import activity
+from .sampler import sampler
 from .speech import speak
-from .state import state, toggle_flag
+from .state import set_field, state, toggle_flag
 from .utils import error_handler
 
-from .actions.system import shutdown_computer, restart_computer, lock_computer, clear_memory, open_task_manager, open_explorer
-from .actions.files import create_folder, search_file, open_folder
-from .actions.web import open_website, search_web, translate_text, search_images
-from .actions.media import control_music
-from .actions.misc import get_date, get_time, get_weather, tell_joke
-from .actions.notes import add_note, read_notes, add_reminder
-from .actions.timers import set_timer, set_alarm
-from .monitoring.screen import toggle_monitoring
+
+ACTIVITY_LINES = 20    # сколько последних записей показывать
+RECENT_HOURS = 1       # окно команды «покажи логи за последний час»
 
 
 @error_handler
@@ -19,7 +20,7 @@ def adapt_to_game(game_name: str) -> None:
     if not game_name or game_name.strip() == "":
         speak("Пожалуйста, укажите название игры.")
         return
-    state.current_game = game_name
+    set_field('current_game', game_name)
     speak(f"Адаптируюсь к игре {game_name}.")
 
 
@@ -44,18 +45,66 @@ def toggle_do_not_disturb() -> None:
 @error_handler
 def show_activity_logs() -> None:
     try:
-        with open('soika_errors.log', 'r', encoding='utf-8') as f:
-            logs = f.readlines()[-20:]
-        speak("Показываю логи активности за сегодня.")
-        for log in logs:
-            print(log.strip())
+        logs = activity.tail(ACTIVITY_LINES)
+    except Exception:
+        speak("Не удалось прочитать логи.")
+        return
+    if not logs:
+        speak("За сегодня записей активности нет.")
+        return
+    speak("Показываю логи активности за сегодня.")
+    for log in logs:
+        print(log)
+
+
+@error_handler
+def show_recent_activity(hours: float = RECENT_HOURS) -> None:
+    now = time.time()
+    try:
+        logs = activity.between(now - hours * 3600, now)
     except Exception:
         speak("Не удалось прочитать логи.")
+        return
+    if not logs:
+        speak("За последний час записей активности нет.")
+        return
+    speak(f"Показываю логи за последний час: {len(logs)} записей.")
+    for log in logs:
+        print(log)
 
 
 @error_handler
 def clear_yesterday_data() -> None:
-    speak("Данные за вчера удалены.")
+    yesterday = datetime.date.today() - datetime.timedelta(days=1)
+    if activity.forget(yesterday):
+        speak("Данные за вчера удалены.")
+    else:
+        speak("За вчера данных нет.")
+
+
+def _resource_insights() -> List[str]:
+    if not sampler.running:
+        return []
+    series = sampler.series
+    insights = []
+    cpu, memory = series['cpu'].mean, series['memory'].last
+    if cpu is not None and cpu >= 70:
+        insights.append(f"Процессор загружен в среднем на {cpu:.0f} процентов")
+    if memory is not None and memory >= 70:
+        insights.append(f"Оперативная память занята на {memory:.0f} процентов")
+        if sampler.top_processes:
+            name, _, rss = sampler.top_processes[0]
+            insights.append(f"Больше всего памяти занимает {name}: {rss / 1024 ** 3:.1f} гигабайта")
+    trend = series['memory'].trend
+    if trend is not None and trend >= 10:
+        insights.append(f"Потребление памяти выросло на {trend:.0f} процентов за последнее время")
+    swap = series['swap'].last
+    if swap is not None and swap >= 50:
+        insights.append(f"Файл подкачки занят на {swap:.0f} процентов")
+    disk = series['disk'].last
+    if disk is not None and disk >= 90:
+        insights.append(f"Системный диск почти заполнен: {disk:.0f} процентов")
+    return insights
 
 
 @error_handler
@@ -68,7 +117,7 @@ def get_system_insights() -> None:
         status(state.learning_mode, 'Режим обучения активен'),
         status(state.do_not_disturb, "Режим 'не беспокоить' включен"),
         f"Адаптирована к игре {state.current_game}" if state.current_game else None,
-    ]))
+    ] + _resource_insights()))
     if not insights:
         insights.append("Система работает в обычном режиме")
     speak("Мои текущие догадки:")
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import logging
+from typing import List, Optional, Tuple
+
+from .fuzzy import confirmation, describe, needs_confirmation
+from .metrics import metrics
+from .registry import build_matcher, build_router
+from .results import CANCELLED, CONFIRM, EMPTY, UNKNOWN, ActionResult, collect
+from .router import Match
+from .speech import speak
+
+
+logger = logging.getLogger("soika")
+router = build_router()
+matcher = build_matcher()
+_pending: Optional[Match] = None  # команда, ждущая подтверждения
+
+
+def process_command(command: str) -> ActionResult:
+    """Resolve and run one command; what it said and how it went is returned as a result."""
+    with collect(command) as result:
+        _dispatch(command, result)
+    return result
+
+
+def resolve(command: str) -> Tuple[Optional[Match], bool]:
+    """Exact route, falling back to the fuzzy matcher, and whether it was exact; nothing is executed."""
+    with metrics.span('dispatch'):
+        match = router.resolve(command)
+        exact = match is not None
+        if not exact:
+            # Распознавание могло исказить слова: пробуем неточное совпадение
+            match = matcher.match(command)
+    return match, exact
+
+
+def _describe_match(result: ActionResult, match: Match) -> None:
+    result.action = match.command.name
+    result.argument = match.argument
+    result.confidence = round(match.confidence, 3)
+
+
+def _dispatch(command: str, result: ActionResult) -> None:
+    global _pending
+    if not command or command.strip() == "":
+        result.status = EMPTY
+        speak("Я не получила команду для обработки.")
+        return
+    pending, _pending = _pending, None
+    if pending is not None:
+        answer = confirmation(command)
+        if answer is not None:
+            _describe_match(result, pending)
+            if answer:
+                pending.execute()
+            else:
+                result.status = CANCELLED
+                speak("Хорошо, не буду.")
+            return
+    match, exact = resolve(command)
+    if match is None:
+        metrics.increment('commands.unknown')
+        result.status = UNKNOWN
+        speak("Я не знаю, как выполнить эту команду. Попробуйте сказать 'что ты можешь' для списка команд.")
+        return
+    _describe_match(result, match)
+    if not exact:
+        logger.info(f"Неточное совпадение «{command}» → {match.command.name} ({match.confidence:.2f})")
+        metrics.increment('commands.fuzzy')
+        if needs_confirmation(match):
+            _pending = match
+            result.status = CONFIRM
+            speak(f"Вы имели в виду «{describe(match)}»?")
+            return
+    else:
+        metrics.increment('commands.exact')
+    match.execute()
+
+
+def choose_alternative(alternatives: List[str]) -> int:
+    """Index of the n-best alternative that reads best as a registered command."""
+    return router.pick(alternatives)[0]
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+logger = logging.getLogger("soika")
+
+INDEX_PATH = Path('soika_state') / 'file_index.json'
+INDEX_ROOTS = tuple(str(Path.home() / name) for name in
+                    ('Desktop', 'Documents', 'Downloads', 'Music', 'Pictures', 'Videos'))
+REFRESH_INTERVAL = 600     # секунд между обходами корней
+RESULT_LIMIT = 10
+COMPACT_RATIO = 0.25       # доля удалённых записей, после которой индекс перестраивается
+SKIP_DIRS = {'$recycle.bin', 'appdata', 'node_modules', '.git', '__pycache__'}
+
+CATEGORIES: Dict[str, Set[str]] = {
+    'document': {'.doc', '.docx', '.odt', '.rtf', '.txt', '.md', '.pdf',
+                 '.xls', '.xlsx', '.ods', '.csv', '.ppt', '.pptx', '.odp'},
+    'music': {'.mp3', '.flac', '.wav', '.ogg', '.m4a', '.aac', '.wma', '.opus'},
+}
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+
+def tokens(name: str) -> List[str]:
+    return _TOKEN.findall(name.lower().replace('ё', 'е'))
+
+
+@dataclass
+class _Dir:
+    mtime: float
+    ids: List[int]
+    subdirs: List[str]
+
+
+class FileIndex:
+    """File-name index over a few root folders, kept fresh by directory mtime.
+
+    Names are split into word tokens; a sorted token list answers prefix
+    queries with a binary search and each token maps to an ``array`` of file
+    ids. A refresh stats every directory but re-lists only those whose mtime
+    changed. The directory table is saved to ``INDEX_PATH`` and the token
+    index is rebuilt from it on load.
+    """
+
+    def __init__(self, roots: Sequence[str] = INDEX_ROOTS, path: Path = INDEX_PATH) -> None:
+        self.roots = [os.path.normpath(root) for root in roots]
+        self.path = path
+        self.ready = threading.Event()
+        self._dirs: Dict[str, _Dir] = {}
+        self._names: List[str] = []
+        self._parents: List[str] = []
+        self._alive = bytearray()
+        self._dead = 0
+        self._postings: Dict[str, array] = {}
+        self._sorted: Optional[List[str]] = None
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._names) - self._dead
+
+    # Файловая система; бенчмарк подменяет эти два метода синтетическим деревом
+
+    def _stat(self, path: str) -> float:
+        return os.stat(path).st_mtime
+
+    def _list(self, path: str) -> Tuple[List[str], List[str]]:
+        files: List[str] = []
+        subdirs: List[str] = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name.lower() not in SKIP_DIRS and not entry.name.startswith('.'):
+                            subdirs.append(entry.name)
+                    elif entry.is_file():
+                        files.append(entry.name)
+                except OSError:
+                    continue
+        return files, subdirs
+
+    # Построение
+
+    def _add(self, parent: str, name: str) -> int:
+        file_id = len(self._names)
+        self._names.append(name)
+        self._parents.append(parent)
+        self._alive.append(1)
+        for token in set(tokens(name)):
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array('I')
+                self._sorted = None
+            postings.append(file_id)
+        return file_id
+
+    def _drop(self, ids: Iterable[int]) -> None:
+        for file_id in ids:
+            if self._alive[file_id]:
+                self._alive[file_id] = 0
+                self._dead += 1
+
+    def _put(self, path: str, mtime: float, files: List[str], subdirs: List[str]) -> None:
+        with self._lock:
+            old = self._dirs.get(path)
+            if old is not None:
+                self._drop(old.ids)
+            self._dirs[path] = _Dir(mtime, [self._add(path, name) for name in files], subdirs)
+
+    def _rebuild(self) -> None:
+        """Reassign ids from the directory table, dropping deleted entries."""
+        with self._lock:
+            listing = {path: ([self._names[i] for i in entry.ids], entry) for path, entry in self._dirs.items()}
+            self._names, self._parents, self._alive = [], [], bytearray()
+            self._postings, self._sorted, self._dead = {}, None, 0
+            for path, (names, entry) in listing.items():
+                entry.ids = [self._add(path, name) for name in names]
+
+    def refresh(self) -> int:
+        """Walk the roots, re-listing directories whose mtime changed; returns their count."""
+        changed = 0
+        seen: Set[str] = set()
+        stack = list(self.roots)
+        while stack and not self._stop.is_set():
+            path = stack.pop()
+            try:
+                mtime = self._stat(path)
+                seen.add(path)
+                entry = self._dirs.get(path)
+                if entry is None or entry.mtime != mtime:
+                    files, subdirs = self._list(path)
+                    self._put(path, mtime, files, subdirs)
+                    changed += 1
+            except OSError:
+                continue
+            stack.extend(os.path.join(path, name) for name in self._dirs[path].subdirs)
+        with self._lock:
+            for path in [path for path in self._dirs if path not in seen]:
+                self._drop(self._dirs.pop(path).ids)
+                changed += 1
+            if self._dead > COMPACT_RATIO * max(1, len(self._names)):
+                self._rebuild()
+        return changed
+
+    # Поиск
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self._postings)
+        position = bisect.bisect_left(self._sorted, prefix)
+        found: List[str] = []
+        while position < len(self._sorted) and self._sorted[position].startswith(prefix):
+            found.append(self._sorted[position])
+            position += 1
+        return found
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = RESULT_LIMIT) -> List[str]:
+        """Full paths whose name has a word starting with every query word."""
+        words = tokens(query)
+        if not words:
+            return []
+        extensions = CATEGORIES.get(category or '')
+        exact = ' '.join(words)
+        with self._lock:
+            # Кандидаты берутся по самому редкому слову, остальные проверяются по имени файла
+            matches = [(sum(len(self._postings[t]) for t in found), word, found)
+                       for word, found in ((word, self._prefix_tokens(word)) for word in words)]
+            matches.sort(key=lambda item: item[0])
+            ids: Set[int] = set()
+            for token in matches[0][2]:
+                ids.update(self._postings[token])
+            others = [word for _, word, _ in matches[1:]]
+            hits = []
+            for file_id in ids:
+                if not self._alive[file_id]:
+                    continue
+                name = self._names[file_id]
+                stem, extension = os.path.splitext(name)
+                if extensions is not None and extension.lower() not in extensions:
+                    continue
+                if others:
+                    name_tokens = tokens(name)
+                    if not all(any(token.startswith(word) for token in name_tokens) for word in others):
+                        continue
+                hits.append((' '.join(tokens(stem)) != exact, len(name), file_id))
+            hits.sort()
+            return [os.path.join(self._parents[i], self._names[i]) for _, _, i in hits[:limit]]
+
+    # Хранение
+
+    def save(self) -> None:
+        with self._lock:
+            data = {
+                'version': 1,
+                'dirs': {path: [entry.mtime, [self._names[i] for i in entry.ids], entry.subdirs]
+                         for path, entry in self._dirs.items()},
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as out:
+            json.dump(data, out, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, self.path)
+
+    def load(self) -> bool:
+        if not self.path.exists():
+            return False
+        with open(self.path, encoding='utf-8') as source:
+            data = json.load(source)
+        if data.get('version') != 1:
+            return False
+        with self._lock:
+            self._dirs = {}
+            for path, (mtime, files, subdirs) in data['dirs'].items():
+                self._dirs[path] = _Dir(mtime, [], subdirs)
+                self._dirs[path].ids = [self._add(path, name) for name in files]
+        return True
+
+    # Фоновый обход
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="soika-file-index", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def prepare(self) -> None:
+        """Load the saved index and bring it up to date on the calling thread."""
+        self._load_saved()
+        self._update()
+
+    def _load_saved(self) -> None:
+        try:
+            if self.load():
+                self.ready.set()
+                logger.info(f"Индекс файлов загружен: {len(self)} файлов")
+        except Exception as exc:
+            logger.error(f"Не удалось загрузить индекс файлов: {exc}")
+
+    def _update(self) -> None:
+        started = time.monotonic()
+        try:
+            changed = self.refresh()
+            if changed:
+                self.save()
+            self.ready.set()
+            logger.info(f"Индекс файлов обновлён за {time.monotonic() - started:.1f} с: "
+                        f"{len(self)} файлов, изменено папок {changed}")
+        except Exception as exc:
+            logger.error(f"Ошибка обновления индекса файлов: {exc}")
+
+    def _run(self) -> None:
+        self._load_saved()
+        while not self._stop.is_set():
+            self._update()
+            self._stop.wait(REFRESH_INTERVAL)
+
+file_index = FileIndex()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from .router import PHRASE, PREFIX, Command, Match
+
+
+NGRAM = 3
+STEM = 5                 # символов слова, по которым сравниваются словоформы
+CHAR_WEIGHT = 0.6        # вес совпадения n-грамм, остальное — совпадение слов
+ACCEPT_SCORE = 0.8       # выше — выполняем без вопросов
+CONFIRM_SCORE = 0.55     # между порогами — переспрашиваем
+MERGED_RATIO = 0.8       # доля длины префикса, которую должна покрыть голова из меньшего числа слов
+
+YES_WORDS = {'да', 'ага', 'конечно', 'верно', 'давай', 'выполняй'}
+NO_WORDS = {'нет', 'не', 'отмена', 'отмени', 'не надо'}
+
+_WORD = re.compile(r'\w+')
+
+
+def words(text: str) -> List[str]:
+    return _WORD.findall(text.lower().replace('ё', 'е'))
+
+
+def grams(tokens: Sequence[str]) -> Set[str]:
+    """Character n-grams of the words glued together, so «по громче» and «погромче» agree."""
+    compact = ''.join(tokens)
+    if len(compact) <= NGRAM:
+        return {compact} if compact else set()
+    return {compact[i:i + NGRAM] for i in range(len(compact) - NGRAM + 1)}
+
+
+def stems(tokens: Sequence[str]) -> Set[str]:
+    return {token[:STEM] for token in tokens}
+
+
+class FuzzyMatcher:
+    """Approximate command matching for misrecognized transcripts.
+
+    Every phrase and prefix is indexed once by character trigrams and word
+    stems. A transcript only scores the patterns it shares a trigram with:
+    phrases by how much of the phrase the transcript covers, prefixes by
+    aligning the first few words and keeping the rest as the argument.
+    """
+
+    def __init__(self, commands: Sequence[Command]) -> None:
+        self.commands = list(commands)
+        # шаблон: (текст, слова, n-граммы, основы, [(индекс команды, вид)])
+        self._patterns: List[Tuple[str, List[str], Set[str], Set[str], List[Tuple[int, str]]]] = []
+        self._index: Dict[str, List[int]] = {}
+        ids: Dict[str, int] = {}
+        for index, command in enumerate(self.commands):
+            entries = [(p, PHRASE) for p in command.phrases] + [(p, PREFIX) for p in command.prefixes]
+            for raw, kind in entries:
+                tokens = words(raw)
+                text = ' '.join(tokens)
+                if text not in ids:
+                    ids[text] = len(self._patterns)
+                    self._patterns.append((text, tokens, grams(tokens), stems(tokens), []))
+                    for gram in self._patterns[ids[text]][2]:
+                        self._index.setdefault(gram, []).append(ids[text])
+                self._patterns[ids[text]][4].append((index, kind))
+
+    def _align(self, pattern_grams: Set[str], pattern_tokens: List[str],
+               pattern_stems: Set[str], tokens: List[str]) -> Tuple[float, int]:
+        """Best score of a leading slice of ``tokens`` against a prefix pattern, and the slice length."""
+        best = (0.0, 0)
+        size = len(pattern_tokens)
+        pattern_length = len(''.join(pattern_tokens))
+        for count in range(max(1, size - 1), min(len(tokens), size + 1) + 1):
+            # Голова короче шаблона допустима, только если слова слились («найдифайл»), а не пропали:
+            # иначе «открой калькулятор» выравнивалось бы на «открой папку» с аргументом «калькулятор»
+            if count < size and len(''.join(tokens[:count])) < MERGED_RATIO * pattern_length:
+                continue
+            head = grams(tokens[:count])
+            shared = len(pattern_grams & head)
+            # Для префикса важна и точность: лишние слова в голове — это часть аргумента
+            dice = 2 * shared / (len(pattern_grams) + len(head)) if head else 0.0
+            score = CHAR_WEIGHT * dice + (1 - CHAR_WEIGHT) * (
+                len(pattern_stems & stems(tokens[:count])) / len(pattern_stems))
+            if score > best[0]:
+                best = (score, count)
+        return best
+
+    def match(self, text: str, min_score: float = CONFIRM_SCORE) -> Optional[Match]:
+        """Best approximate match scoring at least ``min_score``; ``Match.confidence`` holds the score."""
+        text = text.strip().lower()
+        # Слова нужны для оценки, а аргумент вырезается из самой фразы, чтобы сохранить «7:30» и «report.docx»
+        found = list(_WORD.finditer(text.replace('ё', 'е')))
+        tokens = [token.group() for token in found]
+        if not tokens:
+            return None
+        counts: Counter = Counter()
+        for gram in grams(tokens):
+            for pattern_id in self._index.get(gram, ()):
+                counts[pattern_id] += 1
+        # Среди уверенных совпадений, как и в точном разборе, побеждает самый длинный шаблон
+        best: Optional[Tuple[bool, int, float, int]] = None
+        best_match: Optional[Match] = None
+        text_stems = stems(tokens)
+        for pattern_id, shared in counts.items():
+            text_pattern, pattern_tokens, pattern_grams, pattern_stems, entries = self._patterns[pattern_id]
+            # Верхняя граница оценки по общим n-граммам и словам: слабых кандидатов не разбираем
+            word = len(pattern_stems & text_stems) / len(pattern_stems)
+            if CHAR_WEIGHT * 2 * shared / (len(pattern_grams) + shared) + (1 - CHAR_WEIGHT) * word < min_score:
+                continue
+            phrase_score = CHAR_WEIGHT * shared / len(pattern_grams) + (1 - CHAR_WEIGHT) * word
+            prefix_score, head = 0.0, 0
+            if any(kind == PREFIX for _, kind in entries):
+                prefix_score, head = self._align(pattern_grams, pattern_tokens, pattern_stems, tokens)
+            for index, kind in entries:
+                score = phrase_score if kind == PHRASE else prefix_score
+                confident = score >= ACCEPT_SCORE
+                rank = (confident, len(text_pattern) if confident else 0, score, -index)
+                if best is not None and rank <= best:
+                    continue
+                command = self.commands[index]
+                argument = None
+                if kind == PREFIX:
+                    argument = text[found[head - 1].end():].strip() if head else text
+                    if command.transform is not None:
+                        argument = command.transform(argument)
+                    if command.accepts is not None and not command.accepts(argument):
+                        continue
+                best, best_match = rank, Match(command, text_pattern, kind, argument, confidence=score)
+        if best_match is None or best_match.confidence < min_score:
+            return None
+        return best_match
+
+
+def needs_confirmation(match: Match) -> bool:
+    return match.confidence < ACCEPT_SCORE or match.command.confirm
+
+
+def describe(match: Match) -> str:
+    return f"{match.pattern} {match.argument}" if match.argument else match.pattern
+
+
+def confirmation(answer: str) -> Optional[bool]:
+    """True for «да», False for «нет», None if the answer is something else."""
+    tokens = words(answer)
+    if not tokens:
+        return None
+    if ' '.join(tokens) in NO_WORDS or tokens[0] == 'нет':
+        return False
+    if tokens[0] in YES_WORDS:
+        return True
+    return None
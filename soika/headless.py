@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from contextlib import redirect_stdout
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from .dispatcher import process_command, resolve
+from .file_index import file_index
+from .logging_config import configure_logging
+from .results import ERROR, MATCHED, UNKNOWN, ActionResult, collect
+from .speech import set_voice
+
+
+logger = logging.getLogger("soika")
+
+COMMENT = '#'  # строки с этим префиксом во входном файле пропускаются
+
+
+def read_commands(source: TextIO) -> Iterator[str]:
+    """Non-empty lines of ``source`` that are not comments, stripped."""
+    for line in source:
+        command = line.strip()
+        if command and not command.startswith(COMMENT):
+            yield command
+
+
+def match_only(command: str) -> ActionResult:
+    """Resolve ``command`` like :func:`process_command` would, without running the action."""
+    with collect(command) as result:
+        match, _ = resolve(command)
+        if match is None:
+            result.status = UNKNOWN
+        else:
+            result.status = MATCHED
+            result.action = match.command.name
+            result.argument = match.argument
+            result.confidence = round(match.confidence, 3)
+    return result
+
+
+def run_command(command: str, dry_run: bool = False) -> ActionResult:
+    if dry_run:
+        return match_only(command)
+    try:
+        return process_command(command)
+    except Exception as exc:
+        # Исключение вне error_handler (например, не установлен модуль действия) не прерывает пакет
+        logger.error(f"Команда «{command}» завершилась ошибкой: {exc}", exc_info=True)
+        return ActionResult(command, status=ERROR, error=f"{type(exc).__name__}: {exc}")
+
+
+def run(commands: Iterable[str], output: TextIO, dry_run: bool = False) -> Counter:
+    """Write one JSON line per command to ``output``; returns the count of each status."""
+    statuses: Counter = Counter()
+    for seq, command in enumerate(commands, 1):
+        result = run_command(command, dry_run)
+        statuses[result.status] += 1
+        output.write(json.dumps({'seq': seq, **result.to_dict()}, ensure_ascii=False, default=str) + '\n')
+        output.flush()
+    return statuses
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m soika.headless',
+        description="Выполняет текстовые команды без микрофона и синтеза речи и выводит результаты JSON-строками.",
+    )
+    parser.add_argument('input', nargs='?', help='файл с командами, по одной в строке (по умолчанию stdin)')
+    parser.add_argument('-o', '--output', help='куда писать результаты (по умолчанию stdout)')
+    parser.add_argument('--dry-run', action='store_true', help='только сопоставлять команды, не выполняя действий')
+    args = parser.parse_args(argv)
+
+    set_voice(False)
+    configure_logging()
+    if not args.dry_run:
+        # Без фонового обхода поиск файлов отвечал бы «ещё составляю список»: строим индекс до первой команды
+        file_index.prepare()
+    source = open(args.input, encoding='utf-8') if args.input else sys.stdin
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    started = time.perf_counter()
+    try:
+        # Действия печатают подсказки (например, найденные пути); stdout оставляем только для JSON
+        with redirect_stdout(sys.stderr):
+            statuses = run(read_commands(source), output, args.dry_run)
+    finally:
+        if args.input:
+            source.close()
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - started
+    total = sum(statuses.values())
+    summary = ", ".join(f"{status}: {count}" for status, count in statuses.most_common())
+    print(f"Команд: {total} за {elapsed:.2f} с ({total / elapsed if elapsed else 0:.0f} в секунду); {summary}",
+          file=sys.stderr)
+    return 1 if statuses[ERROR] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
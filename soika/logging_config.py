@@ -1,17 +1,170 @@
 from __future__ import annotations
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .activity import ActivityHandler, activity
+
+
+LOG_FILE = 'soika_errors.log'
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024   # размер файла лога до ротации
+LOG_BACKUPS = 5                   # сколько старых файлов хранить
+ROTATE_WHEN: Optional[str] = None  # 'midnight' — ротация по времени вместо размера
+JSON_LINES = False                # писать в файл JSON-строки вместо текста
+RATE_WINDOW = 10.0                # секунд, в течение которых повторы одного сообщения считаются
+RATE_BURST = 3                    # сколько одинаковых сообщений пропускать за окно
+RATE_KEYS = 256                   # сколько разных сообщений отслеживать
+RATE_SWEEP = 1.0                  # секунд между проверками окон с подавленными повторами
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[logging.Handler] = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per line; ``stage`` and ``latency_ms`` come from ``extra=``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        for name in ('stage', 'latency_ms'):
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+_Run = Tuple[float, int, int, Optional[logging.LogRecord]]
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through ``burst`` identical messages per ``window`` seconds.
+
+    The first message after a suppressed run says how many repeats were dropped;
+    :meth:`expired` turns runs whose window closed without such a message into
+    summary records, so the final count is not lost.
+    """
+
+    def __init__(self, window: float = RATE_WINDOW, burst: int = RATE_BURST, keys: int = RATE_KEYS) -> None:
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.keys = keys
+        # сообщение -> (начало окна, пропущено в окне, подавлено, последняя подавленная запись)
+        self._seen: "OrderedDict[Tuple[int, str], _Run]" = OrderedDict()
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.levelno, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            started, passed, dropped, last = self._seen.pop(key, (now, 0, 0, None))
+            if now - started >= self.window:
+                if dropped:
+                    record.msg = _repeated(record.getMessage(), dropped)
+                    record.args = None
+                started, passed, dropped, last = now, 0, 0, None
+            allowed = passed < self.burst
+            self._seen[key] = (started, passed + allowed, dropped + (not allowed), last if allowed else record)
+            while len(self._seen) > self.keys:
+                self._seen.popitem(last=False)
+        return allowed
+
+    def expired(self, everything: bool = False) -> List[logging.LogRecord]:
+        """Summary records for suppressed runs whose window has closed (all of them if ``everything``)."""
+        now = time.monotonic()
+        summaries: List[logging.LogRecord] = []
+        with self._lock:
+            if not everything and now < self._next_sweep:
+                return summaries
+            self._next_sweep = now + RATE_SWEEP
+            for key, (started, _, dropped, last) in list(self._seen.items()):
+                if dropped and last is not None and (everything or now - started >= self.window):
+                    del self._seen[key]
+                    summaries.append(logging.makeLogRecord(
+                        dict(last.__dict__, msg=_repeated(last.getMessage(), dropped), args=None)))
+        return summaries
+
+
+def _repeated(message: str, dropped: int) -> str:
+    return f"{message} (повторилось ещё {dropped} раз)"
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, records: "queue.Queue[logging.LogRecord]", limiter: RateLimitFilter) -> None:
+        super().__init__(records)
+        self.limiter = limiter
+        self.addFilter(limiter)
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        self.flush_suppressed()
+        return super().handle(record)
+
+    def flush_suppressed(self, everything: bool = False) -> None:
+        # Итоги подавленных повторов идут в очередь в обход фильтра
+        for summary in self.limiter.expired(everything):
+            self.emit(summary)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Текст сообщения фиксируется сразу: аргументы могут измениться до записи
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _file_handler() -> logging.Handler:
+    if ROTATE_WHEN:
+        handler: logging.Handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when=ROTATE_WHEN, backupCount=LOG_BACKUPS, encoding='utf-8')
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding='utf-8')
+    handler.setFormatter(JsonLinesFormatter() if JSON_LINES else logging.Formatter(LOG_FORMAT))
+    return handler
 
 
 def configure_logging() -> logging.Logger:
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('soika_errors.log'),
-            logging.StreamHandler()
-        ]
-    )
+    """Route logging through a queue to one writer thread; calling again is a no-op."""
+    global _listener, _handler
+    if _listener is None:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(LOG_FORMAT))
+        # Записи попадают в очередь как есть, форматирует их поток записи
+        records: "queue.Queue[logging.LogRecord]" = queue.Queue()
+        _handler = _RecordQueueHandler(records, RateLimitFilter())
+        root = logging.getLogger()
+        root.setLevel(logging.INFO)
+        root.addHandler(_handler)
+        _listener = logging.handlers.QueueListener(records, _file_handler(), ActivityHandler(activity), stream,
+                                                   respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
     return logging.getLogger("soika")
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener, _handler
+    if _handler is not None:
+        _handler.flush_suppressed(everything=True)
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    activity.close()
+
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+logger = logging.getLogger("soika")
+
+# Верхние границы корзин гистограмм в миллисекундах; последняя корзина — всё, что дольше
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9464        # 0 — не открывать HTTP-адрес
+DUMP_PATH = Path('soika_state') / 'metrics.json'
+DUMP_INTERVAL = 60.0       # секунд между сбросами метрик в файл
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; ``observe`` is one bisect and a few additions."""
+
+    def __init__(self, buckets: tuple = BUCKETS_MS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.maximum:
+            self.maximum = ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the ``q`` quantile (the maximum for the last bucket)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return float(self.buckets[index]) if index < len(self.buckets) else self.maximum
+        return self.maximum
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum_ms': round(self.total, 3),
+            'max_ms': round(self.maximum, 3),
+            'p50_ms': self.quantile(0.5),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets': {str(bound): count for bound, count in zip(self.buckets + ('inf',), self.counts)},
+        }
+
+
+class Metrics:
+    """Named latency histograms and counters shared by every stage of the assistant.
+
+    With ``keep_samples`` every observation is also kept as is, so benchmarks
+    can compute exact percentiles instead of bucket bounds.
+    """
+
+    def __init__(self, keep_samples: bool = False) -> None:
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self.samples: Dict[str, List[float]] = {}
+        self.keep_samples = keep_samples
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, ms: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(ms)
+            if self.keep_samples:
+                self.samples.setdefault(name, []).append(ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.samples.clear()
+            self.started = time.time()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the block into histogram ``name``; an exception also bumps ``<name>.errors``."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(f'{name}.errors')
+            raise
+        finally:
+            self.observe(name, (time.perf_counter() - started) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'time': time.time(),
+                'uptime_s': round(time.time() - self.started, 1),
+                'counters': dict(self.counters),
+                'histograms': {name: histogram.snapshot() for name, histogram in self.histograms.items()},
+            }
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = _metric_name(name)
+                lines.append(f'# TYPE soika_{metric}_total counter')
+                lines.append(f'soika_{metric}_total {value}')
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f'soika_{_metric_name(name)}_ms'
+                lines.append(f'# TYPE {metric} histogram')
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum {histogram.total:.3f}')
+                lines.append(f'{metric}_count {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, path: Path = DUMP_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as out:
+            json.dump(self.snapshot(), out, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+
+def _metric_name(name: str) -> str:
+    return ''.join(char if char.isalnum() else '_' for char in name).lower()
+
+
+class MetricsExporter:
+    """Serves ``/metrics`` and ``/metrics.json`` on localhost and dumps a snapshot to disk periodically."""
+
+    def __init__(self, metrics: Metrics, host: str = METRICS_HOST, port: int = METRICS_PORT,
+                 path: Path = DUMP_PATH, interval: float = DUMP_INTERVAL) -> None:
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.path = path
+        self.interval = interval
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def address(self) -> Optional[str]:
+        if self._server is None:
+            return None
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stop.clear()
+        if self.port:
+            # http.server грузится только когда адрес метрик действительно открывается
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+            metrics = self.metrics
+
+            class _Handler(BaseHTTPRequestHandler):
+                def do_GET(self) -> None:
+                    if self.path in ('/metrics', '/'):
+                        body, kind = metrics.render().encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+                    elif self.path == '/metrics.json':
+                        body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode('utf-8')
+                        kind = 'application/json; charset=utf-8'
+                    else:
+                        self.send_error(404)
+                        return
+                    self.send_response(200)
+                    self.send_header('Content-Type', kind)
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format: str, *args: Any) -> None:
+                    return
+
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+            except OSError as exc:
+                logger.error(f"Не удалось открыть адрес метрик {self.host}:{self.port}: {exc}")
+            else:
+                self._server.daemon_threads = True
+                self._threads.append(threading.Thread(target=self._server.serve_forever,
+                                                      name="soika-metrics-http", daemon=True))
+                logger.info(f"Метрики доступны по адресу {self.address}")
+        self._threads.append(threading.Thread(target=self._dump_loop, name="soika-metrics-dump", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
+        self._dump()
+
+    def _dump(self) -> None:
+        try:
+            self.metrics.dump(self.path)
+        except OSError as exc:
+            logger.error(f"Не удалось сохранить метрики: {exc}")
+
+    def _dump_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._dump()
+
+
+metrics = Metrics()
+exporter = MetricsExporter(metrics)
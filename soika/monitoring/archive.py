@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import mmap
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+logger = logging.getLogger("soika")
+
+ARCHIVE_DIR = Path('screen_monitor') / 'archive'
+ARCHIVE_SIZE = (1280, 720)           # разрешение кадров в архиве
+SEGMENT_BYTES = 32 * 1024 * 1024     # размер файла сегмента, после которого начинается новый
+SEGMENT_RECORDS = 8192               # ёмкость индекса одного сегмента
+MAX_ARCHIVE_BYTES = 512 * 1024 * 1024
+KEYFRAME_INTERVAL = 30               # дельта-кадров между опорными
+COMPRESSION_LEVEL = 3
+
+KEYFRAME = 0
+DELTA = 1
+
+# Заголовок индекса: сигнатура, версия, число записей
+_HEADER = struct.Struct('<4sHxxQ')
+# Запись индекса: время, смещение, длина, номер опорного кадра, ширина, высота, тип
+_RECORD = struct.Struct('<dQIIHHB3x')
+_MAGIC = b'SKIX'
+_VERSION = 1
+
+
+class Segment:
+    """One data file of compressed frames plus its memory-mapped fixed-size index."""
+
+    def __init__(self, base: Path, writable: bool = False) -> None:
+        self.base = base
+        self.start = int(base.name.split('_')[1]) / 1000
+        self.data_path = base.with_suffix('.dat')
+        self.index_path = base.with_suffix('.idx')
+        self.writable = writable
+        if writable and not self.index_path.exists():
+            with open(self.index_path, 'wb') as index:
+                index.write(_HEADER.pack(_MAGIC, _VERSION, 0))
+                index.truncate(_HEADER.size + _RECORD.size * SEGMENT_RECORDS)
+        self._index_file = open(self.index_path, 'r+b' if writable else 'rb')
+        self._index = mmap.mmap(self._index_file.fileno(), 0,
+                                access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+        magic, version, _ = _HEADER.unpack_from(self._index, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Неизвестный формат индекса {self.index_path}")
+        self._data = open(self.data_path, 'a+b' if writable else 'rb')
+        self._data.seek(0, 2)
+        self.size = self._data.tell()
+
+    @property
+    def count(self) -> int:
+        return _HEADER.unpack_from(self._index, 0)[2]
+
+    @property
+    def full(self) -> bool:
+        return self.size >= SEGMENT_BYTES or self.count >= SEGMENT_RECORDS
+
+    def record(self, number: int) -> Tuple[float, int, int, int, int, int, int]:
+        return _RECORD.unpack_from(self._index, _HEADER.size + number * _RECORD.size)
+
+    def timestamp(self, number: int) -> float:
+        return struct.unpack_from('<d', self._index, _HEADER.size + number * _RECORD.size)[0]
+
+    @property
+    def end(self) -> float:
+        return self.timestamp(self.count - 1) if self.count else self.start
+
+    def find(self, timestamp: float) -> int:
+        """Number of the last frame at or before ``timestamp`` (-1 if none)."""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.timestamp(middle) <= timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def append(self, timestamp: float, payload: bytes, key: int, width: int, height: int, kind: int) -> int:
+        number = self.count
+        offset = self.size
+        self._data.write(payload)
+        self._data.flush()
+        self.size += len(payload)
+        _RECORD.pack_into(self._index, _HEADER.size + number * _RECORD.size,
+                          timestamp, offset, len(payload), key, width, height, kind)
+        # Счётчик обновляется последним: запись видна читателям только целиком
+        _HEADER.pack_into(self._index, 0, _MAGIC, _VERSION, number + 1)
+        return number
+
+    def read(self, number: int) -> Tuple[bytes, int, int, int, int]:
+        _, offset, length, key, width, height, kind = self.record(number)
+        self._data.seek(offset)
+        return self._data.read(length), key, width, height, kind
+
+    def close(self) -> None:
+        self._index.flush()
+        self._index.close()
+        self._index_file.close()
+        self._data.close()
+
+    def remove(self) -> None:
+        self.close()
+        for path in (self.data_path, self.index_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class FrameArchive:
+    """Append-only screen history in fixed-size segments of keyframes and XOR deltas.
+
+    Any frame decodes from at most two records (its keyframe and itself), so
+    random access by time never touches the rest of the segment. Retention
+    drops whole segments, oldest first.
+    """
+
+    def __init__(self, directory: Path = ARCHIVE_DIR, size: Tuple[int, int] = ARCHIVE_SIZE,
+                 max_bytes: int = MAX_ARCHIVE_BYTES, keyframe_interval: int = KEYFRAME_INTERVAL) -> None:
+        self.directory = directory
+        self.size = size
+        self.max_bytes = max_bytes
+        self.keyframe_interval = keyframe_interval
+        self._lock = threading.Lock()
+        self._segments: List[Segment] = []
+        self._active: Optional[Segment] = None
+        self._key_number = -1
+        self._key_pixels: Optional[np.ndarray] = None
+        self._since_key = 0
+        self._opened = False
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+        self._opened = True
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for index_path in sorted(self.directory.glob('seg_*.idx')):
+            try:
+                self._segments.append(Segment(index_path.with_suffix('')))
+            except Exception as exc:
+                logger.error(f"Пропущен повреждённый сегмент архива {index_path}: {exc}")
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(segment.size + segment.index_path.stat().st_size for segment in self._segments)
+
+    def append(self, timestamp: float, image: Any) -> None:
+        # Новый кадр всегда дописывается в активный сегмент; после перезапуска начинается новый
+        if image.size != self.size:
+            image = image.resize(self.size, Image.BILINEAR)
+        pixels = np.asarray(image.convert('RGB'), dtype=np.uint8)
+        with self._lock:
+            self._open()
+            if self._active is None or self._active.full:
+                self._roll(timestamp)
+            segment = self._active
+            assert segment is not None
+            height, width = pixels.shape[:2]
+            keyframe = (self._key_pixels is None or self._key_pixels.shape != pixels.shape
+                        or self._since_key >= self.keyframe_interval)
+            if keyframe:
+                payload = zlib.compress(pixels.tobytes(), COMPRESSION_LEVEL)
+                self._key_number = segment.append(timestamp, payload, 0, width, height, KEYFRAME)
+                self._key_pixels = pixels
+                self._since_key = 0
+            else:
+                delta = np.bitwise_xor(pixels, self._key_pixels)
+                payload = zlib.compress(delta.tobytes(), COMPRESSION_LEVEL)
+                segment.append(timestamp, payload, self._key_number, width, height, DELTA)
+                self._since_key += 1
+
+    def _roll(self, timestamp: float) -> None:
+        if self._active is not None:
+            self._active.close()
+            self._segments[-1] = Segment(self._active.base)
+        base = self.directory / f"seg_{int(timestamp * 1000):016d}"
+        self._active = Segment(base, writable=True)
+        self._segments.append(self._active)
+        self._key_pixels = None
+        self._enforce_retention()
+
+    def _enforce_retention(self) -> None:
+        while len(self._segments) > 1 and self.total_bytes > self.max_bytes:
+            segment = self._segments.pop(0)
+            segment.remove()
+            logger.info(f"Удалён старый сегмент архива экрана {segment.base.name}")
+
+    def _decode(self, segment: Segment, number: int) -> Any:
+        payload, key, width, height, kind = segment.read(number)
+        pixels = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(height, width, 3)
+        if kind == DELTA:
+            key_payload = segment.read(key)[0]
+            key_pixels = np.frombuffer(zlib.decompress(key_payload), dtype=np.uint8).reshape(height, width, 3)
+            pixels = np.bitwise_xor(pixels, key_pixels)
+        return Image.fromarray(pixels, 'RGB')
+
+    def frame_at(self, timestamp: float) -> Optional[Tuple[float, Any]]:
+        """Return the last frame captured at or before ``timestamp``."""
+        with self._lock:
+            self._open()
+            starts = [segment.start for segment in self._segments]
+            position = bisect.bisect_right(starts, timestamp) - 1
+            while position >= 0:
+                segment = self._segments[position]
+                number = segment.find(timestamp)
+                if number >= 0:
+                    return segment.timestamp(number), self._decode(segment, number)
+                position -= 1
+            return None
+
+    def timestamps(self, start: float = 0.0, end: float = float('inf')) -> List[float]:
+        with self._lock:
+            self._open()
+            result: List[float] = []
+            for segment in self._segments:
+                if segment.end < start or segment.start > end:
+                    continue
+                for number in range(max(0, segment.find(start)), segment.count):
+                    ts = segment.timestamp(number)
+                    if ts > end:
+                        break
+                    if ts >= start:
+                        result.append(ts)
+            return result
+
+    def close(self) -> None:
+        with self._lock:
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+            self._active = None
+            self._opened = False
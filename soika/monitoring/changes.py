@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+
+DIFF_SIZE = (256, 144)   # разрешение, на котором сравниваются кадры
+TILE = 16                # сторона плитки в пикселях DIFF_SIZE
+TILE_THRESHOLD = 6.0     # средняя разница яркости, при которой плитка считается изменённой
+MIN_INTERVAL = 0.5       # секунд между снимками при активности на экране
+MAX_INTERVAL = 10.0      # секунд между снимками на неподвижном экране
+BACKOFF = 1.5            # во сколько раз растёт интервал после кадра без изменений
+
+Region = Tuple[int, int, int, int]  # x, y, ширина, высота в координатах исходного кадра
+
+
+@dataclass
+class ChangeResult:
+    changed: bool
+    fraction: float                      # доля изменённых плиток
+    regions: List[Region] = field(default_factory=list)
+
+
+class ChangeDetector:
+    """Tile-level diff of consecutive downsampled grayscale frames."""
+
+    def __init__(self, size: Tuple[int, int] = DIFF_SIZE, tile: int = TILE,
+                 threshold: float = TILE_THRESHOLD) -> None:
+        self.size = (size[0] - size[0] % tile, size[1] - size[1] % tile)
+        self.tile = tile
+        self.threshold = threshold
+        self._previous: Optional[np.ndarray] = None
+
+    def reset(self) -> None:
+        self._previous = None
+
+    def _prepare(self, image: Any) -> np.ndarray:
+        return np.asarray(image.convert('L').resize(self.size), dtype=np.int16)
+
+    def update(self, image: Any) -> ChangeResult:
+        current = self._prepare(image)
+        previous, self._previous = self._previous, current
+        if previous is None:
+            return ChangeResult(True, 1.0, [(0, 0, image.width, image.height)])
+        rows, cols = self.size[1] // self.tile, self.size[0] // self.tile
+        diff = np.abs(current - previous)
+        tiles = diff.reshape(rows, self.tile, cols, self.tile).mean(axis=(1, 3))
+        dirty = tiles > self.threshold
+        count = int(dirty.sum())
+        if not count:
+            return ChangeResult(False, 0.0)
+        return ChangeResult(True, count / dirty.size, self._regions(dirty, image.width, image.height))
+
+    @staticmethod
+    def _regions(dirty: np.ndarray, width: int, height: int) -> List[Region]:
+        """Merge dirty tiles into horizontal runs, one rectangle per run."""
+        rows, cols = dirty.shape
+        scale_x, scale_y = width / cols, height / rows
+        regions: List[Region] = []
+        for r in range(rows):
+            row = np.concatenate(([False], dirty[r], [False])).astype(np.int8)
+            edges = np.flatnonzero(np.diff(row))
+            for start, end in zip(edges[::2], edges[1::2]):
+                x, y = int(start * scale_x), int(r * scale_y)
+                regions.append((x, y, int(end * scale_x) - x, int((r + 1) * scale_y) - y))
+        return regions
+
+
+class AdaptiveInterval:
+    """Capture interval that drops to ``minimum`` on activity and backs off when idle."""
+
+    def __init__(self, minimum: float = MIN_INTERVAL, maximum: float = MAX_INTERVAL,
+                 backoff: float = BACKOFF) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.value = minimum
+
+    def update(self, changed: bool) -> float:
+        self.value = self.minimum if changed else min(self.maximum, self.value * self.backoff)
+        return self.value
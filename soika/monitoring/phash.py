@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import struct
+import threading
+from array import array
+from functools import lru_cache
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+HASH_SIZE = 8              # dHash 8×8 = 64 бита
+DUPLICATE_DISTANCE = 4     # соседние кадры ближе этого считаются одним показом
+QUERY_DISTANCE = 10        # расстояние Хэмминга по умолчанию для поиска
+CHUNKS = 4                 # частей хеша в мультииндексе
+CHUNK_BITS = 64 // CHUNKS
+_CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+_HEADER = struct.Struct('<4sHxxQ')
+_MAGIC = b'SKPH'
+_VERSION = 1
+
+# Показ на экране: первый кадр, последний кадр, расстояние до образца
+Sighting = Tuple[float, float, int]
+
+
+def dhash(image: Any) -> int:
+    """64-bit difference hash: brightness gradients of a 9×8 grayscale thumbnail."""
+    pixels = np.asarray(image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE)), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+@lru_cache(maxsize=None)
+def _flips(radius: int) -> Tuple[int, ...]:
+    """All CHUNK_BITS-wide masks with at most ``radius`` bits set."""
+    masks = [0]
+    for count in range(1, radius + 1):
+        masks.extend(sum(1 << bit for bit in bits) for bits in combinations(range(CHUNK_BITS), count))
+    return tuple(masks)
+
+
+class HashIndex:
+    """Perceptual hashes of screen history with Hamming-distance search.
+
+    Entries live in flat arrays (hash, first seen, last seen); consecutive
+    near-duplicate frames extend the previous entry instead of adding one.
+    Distinct hashes are indexed by multi-index hashing: each of ``CHUNKS``
+    parts of the hash has its own table, and any hash within distance ``r``
+    agrees with the query to within ``r // CHUNKS`` bits in at least one part.
+    """
+
+    def __init__(self, duplicate_distance: int = DUPLICATE_DISTANCE) -> None:
+        self.duplicate_distance = duplicate_distance
+        self.hashes = array('Q')
+        self.first = array('d')
+        self.last = array('d')
+        self._node_hash = array('Q')
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in range(CHUNKS)]
+        self._entries: List[List[int]] = []
+        self._nodes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, value: int, timestamp: float) -> int:
+        """Record a frame hash; returns the entry it was stored in."""
+        with self._lock:
+            if self.hashes and distance(self.hashes[-1], value) <= self.duplicate_distance:
+                self.last[-1] = timestamp
+                return len(self.hashes) - 1
+            entry = len(self.hashes)
+            self.hashes.append(value)
+            self.first.append(timestamp)
+            self.last.append(timestamp)
+            self._insert(value, entry)
+            return entry
+
+    def _insert(self, value: int, entry: int) -> None:
+        node = self._nodes.get(value)
+        if node is not None:
+            self._entries[node].append(entry)
+            return
+        new = len(self._node_hash)
+        self._node_hash.append(value)
+        self._entries.append([entry])
+        self._nodes[value] = new
+        for chunk, table in enumerate(self._tables):
+            table.setdefault((value >> (chunk * CHUNK_BITS)) & _CHUNK_MASK, []).append(new)
+
+    def search(self, value: int, max_distance: int = QUERY_DISTANCE) -> List[Sighting]:
+        """Entries within ``max_distance`` of ``value``, closest and then oldest first."""
+        with self._lock:
+            candidates = set()
+            flips = _flips(min(max_distance // CHUNKS, CHUNK_BITS))
+            for chunk, table in enumerate(self._tables):
+                part = (value >> (chunk * CHUNK_BITS)) & _CHUNK_MASK
+                for mask in flips:
+                    nodes = table.get(part ^ mask)
+                    if nodes:
+                        candidates.update(nodes)
+            found: List[Sighting] = []
+            for node in candidates:
+                d = distance(self._node_hash[node], value)
+                if d <= max_distance:
+                    found.extend((self.first[e], self.last[e], d) for e in self._entries[node])
+            found.sort(key=lambda item: (item[2], item[0]))
+            return found
+
+    def find(self, image: Any, max_distance: int = QUERY_DISTANCE) -> List[Sighting]:
+        return self.search(dhash(image), max_distance)
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            tmp = path.with_suffix('.tmp')
+            with open(tmp, 'wb') as out:
+                out.write(_HEADER.pack(_MAGIC, _VERSION, len(self.hashes)))
+                self.hashes.tofile(out)
+                self.first.tofile(out)
+                self.last.tofile(out)
+            tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, duplicate_distance: int = DUPLICATE_DISTANCE) -> "HashIndex":
+        index = cls(duplicate_distance)
+        if not path.exists():
+            return index
+        with open(path, 'rb') as source:
+            magic, version, count = _HEADER.unpack(source.read(_HEADER.size))
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Неизвестный формат индекса хешей {path}")
+            index.hashes.fromfile(source, count)
+            index.first.fromfile(source, count)
+            index.last.fromfile(source, count)
+        for entry, value in enumerate(index.hashes):
+            index._insert(value, entry)
+        return index
+
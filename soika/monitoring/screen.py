@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import atexit
 import datetime
 import logging
-import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Optional
+from typing import Any, Deque, Dict, List, Optional
 
 import tkinter as tk
 from PIL import Image, ImageTk
@@ -13,68 +18,260 @@ import pyautogui
 from ..speech import speak
 from ..state import state
 from ..utils import error_handler
+from .archive import FrameArchive
+from .changes import AdaptiveInterval, ChangeDetector, Region
+from .phash import QUERY_DISTANCE, HashIndex, Sighting, dhash
 
 
 logger = logging.getLogger("soika")
 
 MONITOR_DIR = Path('screen_monitor')
-MONITOR_DIR.mkdir(exist_ok=True)
-MAX_SCREENSHOTS = 100
-MONITOR_INTERVAL = 2  # seconds
+MONITOR_INTERVAL = 2  # seconds, начальный интервал; дальше подстраивается по активности
+PREVIEW_SIZE = (800, 450)
+FRAME_BUFFER = 30          # кадров в кольцевом буфере в памяти
+UI_REFRESH_MS = 250        # как часто окно проверяет появление нового кадра
+SAVE_SCREENSHOTS = True    # сохранять кадры в архив на диске в фоне
+SINK_QUEUE = 4             # кадров в очереди на запись; лишние отбрасываются
+STATS_LOG_EVERY = 30       # кадров между записями статистики в лог
+HASH_INDEX_PATH = MONITOR_DIR / 'phash.idx'
+HASH_SAVE_INTERVAL = 60.0  # секунд между сохранениями индекса хешей во время мониторинга
 
 
-def _clear_old_screenshots() -> None:
-    try:
-        files = sorted(MONITOR_DIR.glob('*.png'), key=os.path.getmtime)
-        while len(files) > MAX_SCREENSHOTS:
+@dataclass
+class Frame:
+    timestamp: datetime.datetime
+    image: Any                 # уменьшенный кадр для окна
+    full: Optional[Any]        # полноразмерный кадр для архива; в FrameBuffer всегда None
+    latency_ms: float          # снимок + уменьшение, по часам
+    cpu_ms: float              # процессорное время потока захвата
+    regions: Optional[List[Region]] = None  # изменённые области относительно предыдущего кадра
+    phash: int = 0             # перцептивный хеш уменьшенного кадра
+
+
+class FrameBuffer:
+    """Bounded ring of recent frames shared between the capture thread and the UI."""
+
+    def __init__(self, size: int = FRAME_BUFFER) -> None:
+        self._frames: Deque[Frame] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.captured = 0
+
+    def push(self, frame: Frame) -> None:
+        with self._lock:
+            self._frames.append(frame)
+            self.captured += 1
+
+    def latest(self) -> Optional[Frame]:
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+
+class DiskSink:
+    """Appends frames to a :class:`FrameArchive` on its own thread."""
+
+    def __init__(self, archive: Optional[FrameArchive] = None) -> None:
+        self.archive = archive or FrameArchive()
+        self._queue: "queue.Queue[Optional[Frame]]" = queue.Queue(maxsize=SINK_QUEUE)
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="soika-screen-sink", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=1)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=5)
+        self._thread = None
+        self.archive.close()
+
+    def submit(self, frame: Frame) -> None:
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                return
             try:
-                os.remove(files[0])
-                files.pop(0)
+                self.archive.append(frame.timestamp.timestamp(), frame.full or frame.image)
             except Exception as exc:
-                logger.error(f"Ошибка удаления скриншота: {exc}")
-                break
-    except Exception as exc:
-        logger.error(f"Ошибка при очистке старых скриншотов: {exc}")
+                logger.error(f"Ошибка при сохранении кадра в архив: {exc}")
 
 
-def _take_screenshot() -> Optional[Path]:
+def _take_screenshot(keep_full: bool = SAVE_SCREENSHOTS) -> Optional[Frame]:
     try:
-        img = pyautogui.screenshot()
-        ts = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
-        path = MONITOR_DIR / f'screen_{ts}.png'
-        img.save(path)
-        _clear_old_screenshots()
-        return path
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        full = pyautogui.screenshot()
+        image = full.resize(PREVIEW_SIZE, Image.BILINEAR, reducing_gap=2.0)
+        phash = dhash(image)
+        return Frame(
+            timestamp=datetime.datetime.now(),
+            image=image,
+            full=full if keep_full else None,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            cpu_ms=(time.thread_time() - cpu_started) * 1000,
+            phash=phash,
+        )
     except Exception as exc:
         logger.error(f"Ошибка при создании скриншота: {exc}")
         return None
 
 
+class ScreenCapture:
+    """Background thread that captures the screen into a :class:`FrameBuffer`.
+
+    Frames identical to the previous one are skipped, and the capture interval
+    adapts between ``MIN_INTERVAL`` and ``MAX_INTERVAL`` with screen activity.
+    """
+
+    def __init__(self, buffer: FrameBuffer, sink: Optional[DiskSink] = None,
+                 interval: Optional[AdaptiveInterval] = None,
+                 detector: Optional[ChangeDetector] = None,
+                 index: Optional[HashIndex] = None) -> None:
+        self.buffer = buffer
+        self.sink = sink
+        self.index = index
+        self.interval = interval or AdaptiveInterval()
+        self.interval.value = max(self.interval.minimum, min(self.interval.maximum, MONITOR_INTERVAL))
+        self.detector = detector or ChangeDetector()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._latency_total = 0.0
+        self._cpu_total = 0.0
+        self._frames = 0
+        self._index_saved = time.monotonic()
+        self.skipped = 0
+
+    def start(self) -> None:
+        if self.sink is not None:
+            self.sink.start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="soika-screen-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval.maximum + 2)
+            self._thread = None
+        if self.sink is not None:
+            self.sink.stop()
+
+    def stats(self) -> Dict[str, float]:
+        frames = max(1, self._frames)
+        return {
+            'frames': self._frames,
+            'stored': self.buffer.captured,
+            'skipped': self.skipped,
+            'interval': self.interval.value,
+            'avg_latency_ms': self._latency_total / frames,
+            'avg_cpu_ms': self._cpu_total / frames,
+            'sink_dropped': self.sink.dropped if self.sink is not None else 0,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            frame = _take_screenshot(keep_full=self.sink is not None)
+            if frame is not None:
+                change = self.detector.update(frame.image)
+                self.interval.update(change.changed)
+                if self.index is not None:
+                    self.index.add(frame.phash, frame.timestamp.timestamp())
+                if change.changed:
+                    frame.regions = change.regions
+                    # В кольцевом буфере только уменьшенные кадры; полноразмерный уходит лишь в архив
+                    self.buffer.push(replace(frame, full=None))
+                    if self.sink is not None:
+                        self.sink.submit(frame)
+                else:
+                    self.skipped += 1
+                self._record(frame)
+            if self.index is not None and time.monotonic() - self._index_saved >= HASH_SAVE_INTERVAL:
+                save_hash_index(self.index)
+                self._index_saved = time.monotonic()
+            self._stop.wait(max(0.0, self.interval.value - (time.monotonic() - started)))
+
+    def _record(self, frame: Frame) -> None:
+        self._frames += 1
+        self._latency_total += frame.latency_ms
+        self._cpu_total += frame.cpu_ms
+        if self._frames % STATS_LOG_EVERY == 0:
+            stats = self.stats()
+            logger.info(f"Мониторинг экрана: снято {stats['frames']}, сохранено {stats['stored']}, "
+                        f"пропущено без изменений {stats['skipped']}, интервал {stats['interval']:.1f} с, "
+                        f"задержка {stats['avg_latency_ms']:.1f} мс, CPU {stats['avg_cpu_ms']:.1f} мс на кадр")
+
+
 class ScreenMonitorWindow:
-    def __init__(self, root: tk.Tk):
+    def __init__(self, root: tk.Tk, buffer: FrameBuffer):
         self.root = root
+        self.buffer = buffer
         self.root.title('Мониторинг экрана Soika')
-        self.label = tk.Label(root)
+        # Один PhotoImage на всё время работы окна; новые кадры копируются в него
+        self.photo = ImageTk.PhotoImage('RGB', PREVIEW_SIZE)
+        self.label = tk.Label(root, image=self.photo)
         self.label.pack()
+        self._shown: Optional[datetime.datetime] = None
         self.update_image()
 
     def update_image(self) -> None:
         try:
-            path = _take_screenshot()
-            if path is None:
-                self.root.after(MONITOR_INTERVAL * 1000, self.update_image)
-                return
-            img = Image.open(path)
-            img = img.resize((800, 450))
-            self.photo = ImageTk.PhotoImage(img)
-            self.label.config(image=self.photo)
-            self.root.after(MONITOR_INTERVAL * 1000, self.update_image)
+            frame = self.buffer.latest()
+            if frame is not None and frame.timestamp != self._shown:
+                self.photo.paste(frame.image)
+                self._shown = frame.timestamp
         except Exception as exc:
             logger.error(f"Ошибка при обновлении изображения: {exc}")
-            self.root.after(MONITOR_INTERVAL * 1000, self.update_image)
+        self.root.after(UI_REFRESH_MS, self.update_image)
 
 
 _monitor_window_thread = None
+_capture: Optional[ScreenCapture] = None
+_hash_index: Optional[HashIndex] = None
+
+
+def get_hash_index() -> HashIndex:
+    global _hash_index
+    if _hash_index is None:
+        try:
+            _hash_index = HashIndex.load(HASH_INDEX_PATH)
+        except Exception as exc:
+            logger.error(f"Не удалось загрузить индекс хешей экрана: {exc}")
+            _hash_index = HashIndex()
+        atexit.register(_save_on_exit)
+    return _hash_index
+
+
+def save_hash_index(index: HashIndex) -> None:
+    try:
+        MONITOR_DIR.mkdir(exist_ok=True)
+        index.save(HASH_INDEX_PATH)
+    except Exception as exc:
+        logger.error(f"Не удалось сохранить индекс хешей экрана: {exc}")
+
+
+def _save_on_exit() -> None:
+    # Приложение может закрыться при включённом мониторинге: история хешей сессии не теряется
+    if _hash_index is not None:
+        save_hash_index(_hash_index)
+
+
+def find_on_screen(image: Any, max_distance: int = QUERY_DISTANCE) -> List[Sighting]:
+    """When was something like ``image`` on screen: (first seen, last seen, distance) per showing."""
+    return get_hash_index().find(image, max_distance)
 
 
 @error_handler
@@ -88,28 +285,37 @@ def toggle_monitoring() -> None:
 
 
 def _start_screen_monitor() -> None:
-    import threading
+    global _monitor_window_thread, _capture
+    if _monitor_window_thread and _monitor_window_thread.is_alive():
+        return
+    buffer = FrameBuffer()
+    _capture = ScreenCapture(buffer, DiskSink() if SAVE_SCREENSHOTS else None, index=get_hash_index())
+    _capture.start()
 
     def run_window() -> None:
         try:
             root = tk.Tk()
             state.monitor_window = root
-            _ = ScreenMonitorWindow(root)
+            _ = ScreenMonitorWindow(root, buffer)
             root.protocol("WM_DELETE_WINDOW", lambda: _stop_screen_monitor())
             root.mainloop()
         except Exception as exc:
             logger.error(f"Ошибка при запуске мониторинга экрана: {exc}")
             state.monitoring_enabled = False
 
-    global _monitor_window_thread
-    if _monitor_window_thread and _monitor_window_thread.is_alive():
-        return
     _monitor_window_thread = threading.Thread(target=run_window, daemon=True)
     _monitor_window_thread.start()
 
 
 def _stop_screen_monitor() -> None:
+    global _capture
     state.monitoring_enabled = False
+    if _capture is not None:
+        capture, _capture = _capture, None
+        capture.stop()
+        logger.info(f"Мониторинг экрана остановлен: {capture.stats()}")
+        if capture.index is not None:
+            save_hash_index(capture.index)
     win = state.monitor_window
     if win:
         try:
@@ -120,5 +326,3 @@ def _stop_screen_monitor() -> None:
         finally:
             state.monitor_window = None
     speak('Мониторинг экрана выключен.')
-
-
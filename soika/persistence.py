@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .state import SystemState
+
+
+logger = logging.getLogger("soika")
+
+STATE_DIR = Path('soika_state')
+FSYNC_INTERVAL = 1.0    # секунд между fsync журнала; 0 — после каждой записи
+COMPACT_EVERY = 500     # записей в журнале до сжатия в снимок
+
+# Поля SystemState, которые переживают перезапуск
+PERSISTENT_FIELDS = (
+    'privacy_mode', 'learning_mode', 'do_not_disturb', 'current_game',
+    'notes', 'reminders', 'timers', 'alarms',
+)
+
+
+def apply(state: SystemState, op: Dict[str, Any]) -> None:
+    kind = op['op']
+    if kind == 'set':
+        setattr(state, op['field'], op['value'])
+    elif kind == 'append':
+        getattr(state, op['field']).append(op['value'])
+    elif kind == 'put':
+        getattr(state, op['field'])[op['key']] = op['value']
+    elif kind == 'remove':
+        container = getattr(state, op['field'])
+        if isinstance(container, dict):
+            container.pop(op['key'], None)
+        elif 0 <= op['key'] < len(container):
+            container.pop(op['key'])
+    elif kind == 'clear':
+        getattr(state, op['field']).clear()
+    else:
+        raise ValueError(f"Неизвестная операция журнала: {kind}")
+
+
+class StateStore:
+    """Append-only journal of state mutations plus a periodically compacted snapshot.
+
+    Every mutation is one JSON line in ``journal.jsonl``; after
+    ``compact_every`` lines the whole state is written to ``snapshot.json``
+    and the journal is truncated. Entries carry a sequence number, so a crash
+    between the two steps never replays a mutation twice.
+
+    Between fsyncs a timer makes sure the last mutation of a burst reaches
+    the disk within ``fsync_interval`` even if nothing else is written.
+    """
+
+    def __init__(self, directory: Path = STATE_DIR, fsync_interval: float = FSYNC_INTERVAL,
+                 compact_every: int = COMPACT_EVERY) -> None:
+        self.directory = directory
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+        self.snapshot_path = directory / 'snapshot.json'
+        self.journal_path = directory / 'journal.jsonl'
+        self._state: Optional[SystemState] = None
+        self._journal: Optional[Any] = None
+        self._seq = 0
+        self._entries = 0
+        self._last_fsync = 0.0
+        self._unsynced = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+
+    def load(self, state: SystemState) -> int:
+        """Restore ``state`` from disk and start journaling; returns replayed entries."""
+        with self._lock:
+            self.directory.mkdir(exist_ok=True)
+            snapshot_seq = 0
+            if self.snapshot_path.exists():
+                snapshot = json.loads(self.snapshot_path.read_text(encoding='utf-8'))
+                snapshot_seq = snapshot.get('seq', 0)
+                for name, value in snapshot.get('state', {}).items():
+                    if name in PERSISTENT_FIELDS:
+                        setattr(state, name, value)
+            self._seq = snapshot_seq
+            replayed = 0
+            if self.journal_path.exists():
+                with open(self.journal_path, 'r+b') as journal:
+                    offset = 0
+                    for line in journal:
+                        try:
+                            op = json.loads(line.decode('utf-8'))
+                        except ValueError:
+                            # Запись оборвалась при сбое: отрезаем хвост, чтобы дописывать после целых строк
+                            logger.warning("Повреждённая запись в конце журнала состояния отброшена")
+                            journal.truncate(offset)
+                            break
+                        offset += len(line)
+                        if op.get('seq', 0) <= snapshot_seq:
+                            continue
+                        apply(state, op)
+                        self._seq = op['seq']
+                        replayed += 1
+            self._state = state
+            self._entries = replayed
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+            if replayed >= self.compact_every:
+                self.compact()
+            return replayed
+
+    def record(self, op: Dict[str, Any]) -> None:
+        with self._lock:
+            if self._journal is None:
+                return
+            self._seq += 1
+            op = dict(op, seq=self._seq)
+            self._journal.write(json.dumps(op, ensure_ascii=False, default=str) + '\n')
+            self._journal.flush()
+            self._entries += 1
+            self._unsynced = True
+            delay = self.fsync_interval - (time.monotonic() - self._last_fsync)
+            if delay <= 0:
+                self._sync()
+            elif self._flush_timer is None:
+                # fsync по сроку, а не только при следующей записи
+                self._flush_timer = threading.Timer(delay, self._sync_due)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            if self._entries >= self.compact_every:
+                self.compact()
+
+    def _sync(self) -> None:
+        if self._journal is not None and self._unsynced:
+            os.fsync(self._journal.fileno())
+        self._unsynced = False
+        self._last_fsync = time.monotonic()
+
+    def _sync_due(self) -> None:
+        with self._lock:
+            self._flush_timer = None
+            try:
+                self._sync()
+            except OSError as exc:
+                logger.error(f"Не удалось сохранить журнал состояния на диск: {exc}")
+
+    def compact(self) -> None:
+        with self._lock:
+            if self._state is None or self._journal is None:
+                return
+            data = {name: getattr(self._state, name) for name in PERSISTENT_FIELDS}
+            tmp = self.snapshot_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as snapshot:
+                json.dump({'seq': self._seq, 'state': data}, snapshot, ensure_ascii=False, default=str)
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(tmp, self.snapshot_path)
+            self._journal.close()
+            self._journal = open(self.journal_path, 'w', encoding='utf-8')
+            self._unsynced = False
+            self._entries = 0
+            logger.info(f"Журнал состояния сжат в снимок (seq={self._seq})")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._journal is None:
+                return
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._journal.close()
+            self._journal = None
+
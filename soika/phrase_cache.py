@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import string
+import threading
+import wave
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger("soika")
+
+CACHE_DIR = Path('tts_cache')
+CACHE_LIMIT_BYTES = 64 * 1024 * 1024
+
+
+def template_parts(template: str, slots: Dict[str, Any]) -> List[str]:
+    """Split a ``str.format`` template into literal fragments and rendered slot values."""
+    formatter = string.Formatter()
+    parts: List[str] = []
+    for literal, field_name, spec, conversion in formatter.parse(template):
+        if literal.strip():
+            parts.append(literal.strip())
+        if field_name is not None:
+            value, _ = formatter.get_field(field_name, (), slots)
+            value = formatter.format_field(formatter.convert_field(value, conversion), spec or "")
+            if value.strip():
+                parts.append(value.strip())
+    return parts
+
+
+def template_literals(template: str) -> List[str]:
+    """Fixed text fragments of a ``str.format`` template, without the slot values."""
+    return [literal.strip() for literal, _, _, _ in string.Formatter().parse(template) if literal.strip()]
+
+
+def join_wav(chunks: Iterable[bytes]) -> Optional[bytes]:
+    """Concatenate WAV files with identical parameters into one in-memory WAV."""
+    params: Optional[Tuple[int, int, int]] = None
+    frames: List[bytes] = []
+    for data in chunks:
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            current = (wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+            if params is not None and current != params:
+                return None
+            params = current
+            frames.append(wav.readframes(wav.getnframes()))
+    if params is None:
+        return None
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as wav:
+        wav.setnchannels(params[0])
+        wav.setsampwidth(params[1])
+        wav.setframerate(params[2])
+        wav.writeframes(b"".join(frames))
+    return out.getvalue()
+
+
+def wav_seconds(data: bytes) -> float:
+    """Duration of an in-memory WAV file."""
+    with wave.open(io.BytesIO(data), 'rb') as wav:
+        return wav.getnframes() / float(wav.getframerate() or 1)
+
+
+class PhraseCache:
+    """On-disk LRU of synthesized phrases keyed by text, voice, rate and volume."""
+
+    def __init__(self, directory: Path = CACHE_DIR, limit_bytes: int = CACHE_LIMIT_BYTES) -> None:
+        self.directory = directory
+        self.limit_bytes = limit_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, voice: Any, rate: Any, volume: Any) -> str:
+        raw = f"{text.strip()}\x00{voice}\x00{rate}\x00{volume}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.wav"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        self.directory.mkdir(exist_ok=True)
+        files = sorted(self.directory.glob('*.wav'), key=os.path.getmtime)
+        for file in files:
+            size = file.stat().st_size
+            self._entries[file.stem] = size
+            self._total += size
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._load()
+            return key in self._entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+                self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def add(self, key: str) -> None:
+        """Register a file already written to :meth:`path` and evict old entries."""
+        path = self.path(key)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        if size == 0:
+            path.unlink()
+            return
+        with self._lock:
+            self._load()
+            self._total += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self._total > self.limit_bytes and len(self._entries) > 1:
+                old, old_size = self._entries.popitem(last=False)
+                self._total -= old_size
+                try:
+                    self.path(old).unlink()
+                except OSError as exc:
+                    logger.error(f"Ошибка удаления фразы из кэша: {exc}")
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .capture import CaptureSession
+from .metrics import metrics
+
+
+logger = logging.getLogger("soika")
+
+MAX_PENDING_COMMANDS = 2
+POLL_INTERVAL = 0.5
+
+
+@dataclass
+class PendingCommand:
+    seq: int
+    text: str
+    heard_at: float
+    recognized_at: float = 0.0
+
+
+class CommandPipeline:
+    """Capture → recognition → execution, connected by bounded FIFO queues.
+
+    The capture session fills its own utterance queue; a recognition thread
+    turns utterances into commands; the caller executes them with
+    :meth:`next_command`. One worker per stage keeps commands in the order
+    they were spoken. When execution falls behind, the recognizer blocks on
+    the full command queue and the capture session starts dropping phrases.
+    """
+
+    def __init__(self,
+                 session: Callable[[], CaptureSession],
+                 recognize: Callable[..., str],
+                 early: Optional[Callable[[str], bool]] = None,
+                 max_pending: int = MAX_PENDING_COMMANDS) -> None:
+        self._session = session
+        self._recognize = recognize
+        self._early = early
+        self._commands: "queue.Queue[PendingCommand]" = queue.Queue(maxsize=max_pending)
+        self._seq = itertools.count(1)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._recognition_stage, name="soika-recognition", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def next_command(self, timeout: Optional[float] = None) -> Optional[PendingCommand]:
+        try:
+            return self._commands.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _recognition_stage(self) -> None:
+        while not self._stop.is_set():
+            try:
+                utterance = self._session().next_utterance(timeout=POLL_INTERVAL)
+                if utterance is None:
+                    continue
+                heard_at = time.monotonic()
+                text = self._recognize(utterance, self._early)
+                recognized_at = time.monotonic()
+                if utterance.ended_at is not None and not utterance.discarded:
+                    metrics.observe('capture', (utterance.ended_at - utterance.started_at) * 1000)
+                    # С конца фразы: потоковое распознавание начинается ещё во время речи
+                    metrics.observe('recognize', (recognized_at - max(heard_at, utterance.ended_at)) * 1000)
+                metrics.increment('utterances')
+                if text:
+                    self._put(PendingCommand(next(self._seq), text, heard_at, recognized_at))
+                else:
+                    metrics.increment('utterances.unrecognized')
+            except Exception:
+                logger.error("Ошибка на этапе распознавания", exc_info=True)
+                time.sleep(POLL_INTERVAL)
+
+    def _put(self, command: PendingCommand) -> None:
+        while not self._stop.is_set():
+            try:
+                self._commands.put(command, timeout=POLL_INTERVAL)
+                return
+            except queue.Full:
+                continue
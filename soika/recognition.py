@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import json
+import logging
+import socket
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Union
+
+import speech_recognition as sr
+
+from .capture import Utterance
+
+
+logger = logging.getLogger("soika")
+
+LANGUAGE = "ru-RU"
+GOOGLE_HOST = "www.google.com"  # адрес Web Speech API, который разрешается заранее
+MAX_ALTERNATIVES = 5  # вариантов распознавания, которые сверяются с командами
+
+
+@dataclass
+class Hypothesis:
+    text: str
+    final: bool
+    confidence: Optional[float] = None
+    alternatives: List[str] = field(default_factory=list)  # n-best варианты, первый совпадает с text
+
+
+class RecognizerBackend:
+    """Turns an utterance into a stream of hypotheses; the last one is final."""
+
+    name = "base"
+
+    def stream(self, utterance: Utterance) -> Iterator[Hypothesis]:
+        raise NotImplementedError
+
+    def warm_up(self) -> None:
+        """Pay one-off setup costs before the first utterance."""
+
+    def recognize(self, utterance: Utterance) -> str:
+        text = ""
+        for hypothesis in self.stream(utterance):
+            if hypothesis.final:
+                text = hypothesis.text
+        return text
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API: no partial results, one final hypothesis with n-best alternatives."""
+
+    name = "google"
+
+    def __init__(self, language: str = LANGUAGE) -> None:
+        self.language = language
+        self._recognizer = sr.Recognizer()
+
+    def warm_up(self) -> None:
+        # Первая команда не ждёт разрешения DNS
+        socket.getaddrinfo(GOOGLE_HOST, 80, proto=socket.IPPROTO_TCP)
+
+    def stream(self, utterance: Utterance) -> Iterator[Hypothesis]:
+        audio = utterance.audio()
+        if utterance.discarded or not audio.frame_data:
+            return
+        result = self._recognizer.recognize_google(audio, language=self.language, show_all=True)
+        alternatives = result.get("alternative", []) if isinstance(result, dict) else []
+        texts = [item["transcript"] for item in alternatives if item.get("transcript")][:MAX_ALTERNATIVES]
+        if not texts:
+            raise sr.UnknownValueError()
+        yield Hypothesis(texts[0], final=True, confidence=alternatives[0].get("confidence"), alternatives=texts)
+
+
+class VoskBackend(RecognizerBackend):
+    """Offline streaming recognition with Vosk; emits partial hypotheses per frame."""
+
+    name = "vosk"
+
+    def __init__(self, model_path: str) -> None:
+        try:
+            import vosk  # type: ignore
+        except ImportError:
+            raise RuntimeError("vosk is not installed. Please install it with: pip install vosk")
+        self._vosk = vosk
+        self._model = vosk.Model(model_path)
+
+    def warm_up(self) -> None:
+        # Первый распознаватель достраивает граф декодера; прогоняем его на тишине
+        recognizer = self._vosk.KaldiRecognizer(self._model, 16000)
+        recognizer.AcceptWaveform(b'\x00' * 3200)
+        recognizer.FinalResult()
+
+    def stream(self, utterance: Utterance) -> Iterator[Hypothesis]:
+        recognizer = self._vosk.KaldiRecognizer(self._model, utterance.sample_rate)
+        recognizer.SetMaxAlternatives(MAX_ALTERNATIVES)
+        # Vosk сам находит конец сегмента (часто в паузе после фразы): текст каждого сегмента
+        # забираем через Result(), иначе он теряется и FinalResult() возвращает пустоту
+        segments: List[List[str]] = []
+        last_partial = ""
+        for chunk in utterance.chunks():
+            if recognizer.AcceptWaveform(chunk):
+                texts = _vosk_texts(recognizer.Result())
+                if texts:
+                    segments.append(texts)
+                continue
+            partial = json.loads(recognizer.PartialResult()).get("partial", "")
+            if partial and partial != last_partial:
+                last_partial = partial
+                yield Hypothesis(" ".join([segment[0] for segment in segments] + [partial]), final=False)
+        if utterance.discarded:
+            return
+        texts = _vosk_texts(recognizer.FinalResult())
+        if texts:
+            segments.append(texts)
+        alternatives = _join_segments(segments)
+        if alternatives:
+            yield Hypothesis(alternatives[0], final=True, alternatives=alternatives)
+
+
+def _vosk_texts(raw: str) -> List[str]:
+    """Alternative texts of one Vosk result, best first."""
+    result = json.loads(raw)
+    texts = [item["text"] for item in result.get("alternatives", []) if item.get("text")]
+    if not texts and result.get("text"):
+        texts = [result["text"]]
+    return texts
+
+
+def _join_segments(segments: List[List[str]]) -> List[str]:
+    """Whole-utterance alternatives: the best of every segment, then one segment swapped for its n-best."""
+    if not segments:
+        return []
+    best = [segment[0] for segment in segments]
+    joined = [" ".join(best)]
+    for index, segment in enumerate(segments):
+        for text in segment[1:]:
+            candidate = " ".join(best[:index] + [text] + best[index + 1:])
+            if candidate not in joined:
+                joined.append(candidate)
+    return joined[:MAX_ALTERNATIVES]
+
+
+class ScriptedBackend(RecognizerBackend):
+    """Fake backend for offline runs: replays transcripts word by word, ignoring audio.
+
+    ``word_delay`` simulates decoder latency between partial hypotheses. A line
+    like ``открой провод ник | открой проводник`` supplies n-best alternatives.
+    """
+
+    name = "scripted"
+
+    def __init__(self, transcripts: Iterable[str], word_delay: float = 0.0) -> None:
+        self.transcripts: List[str] = list(transcripts)
+        self._position = 0
+        self.word_delay = word_delay
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path], word_delay: float = 0.0) -> "ScriptedBackend":
+        lines = Path(path).read_text(encoding="utf-8").splitlines()
+        return cls([line.strip() for line in lines if line.strip()], word_delay)
+
+    def stream(self, utterance: Utterance) -> Iterator[Hypothesis]:
+        for _ in utterance.chunks():
+            pass
+        if utterance.discarded:
+            return
+        if self._position >= len(self.transcripts):
+            raise sr.UnknownValueError()
+        alternatives = [text.strip() for text in self.transcripts[self._position].split("|") if text.strip()]
+        transcript = alternatives[0]
+        self._position += 1
+        words = transcript.split()
+        for count in range(1, len(words)):
+            if self.word_delay:
+                time.sleep(self.word_delay)
+            yield Hypothesis(" ".join(words[:count]), final=False)
+        if self.word_delay:
+            time.sleep(self.word_delay)
+        yield Hypothesis(transcript, final=True, alternatives=alternatives)
+
+
+def transcribe(backend: RecognizerBackend, utterance: Utterance,
+               early: Optional[Callable[[str], bool]] = None) -> Optional[Hypothesis]:
+    """Run recognition, returning the first partial accepted by ``early`` or the final result."""
+    final: Optional[Hypothesis] = None
+    for hypothesis in backend.stream(utterance):
+        if hypothesis.final:
+            final = hypothesis
+        elif early is not None and early(hypothesis.text.lower()):
+            logger.info(f"Ранний запуск по частичному результату: {hypothesis.text}")
+            return hypothesis
+    return final
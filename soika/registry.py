@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import List, Tuple
+
+from .speech import speak
+from .fuzzy import FuzzyMatcher
+from .router import Command, CommandRouter, lazy
+from .sites import is_site, spoken_names
+from .timeparse import split_expression
+
+
+GREETING = "Привет! Я Soika, как я могу помочь?"
+CAPABILITIES = (
+    "Я Soika, и я могу выполнять различные команды: управлять компьютером, работать с интернетом, "
+    "искать файлы, управлять музыкой, устанавливать напоминания и таймеры, а также многое другое."
+)
+
+
+_create_folder_action = lazy('.actions.files:create_folder')
+_add_reminder_action = lazy('.actions.notes:add_reminder')
+_search_web = lazy('.actions.web:search_web')
+
+
+def _create_folder(folder_name: str) -> None:
+    _create_folder_action(folder_name) if folder_name else speak("Пожалуйста, укажите название папки.")
+
+
+def _add_reminder(argument: str) -> None:
+    text, when = split_expression(argument)
+    if when is None:
+        speak("Пожалуйста, укажите время напоминания.")
+        return
+    _add_reminder_action(text, when)
+
+
+def _open_site(site: str) -> Tuple[str, ...]:
+    return tuple(f'открой {name}' for name in spoken_names(site))
+
+
+def _watch_movie(title: str) -> None:
+    _search_web(f"смотреть {title} онлайн")
+
+
+# Обработчики вида «модуль:функция» импортируются при первом вызове команды
+COMMANDS: List[Command] = [
+    # Системные команды
+    Command('shutdown', '.actions.system:shutdown_computer',
+            phrases=('заверши работу компьютера', 'выключи компьютер', 'выключи пк'), confirm=True),
+    Command('restart', '.actions.system:restart_computer',
+            phrases=('перезагрузи компьютер', 'перезапусти компьютер'), confirm=True),
+    Command('lock', '.actions.system:lock_computer', phrases=('заблокируй компьютер', 'заблокируй экран')),
+    Command('clear_memory', '.actions.system:clear_memory',
+            phrases=('очисти память', 'очисти кэш', 'освободи ресурсы'), confirm=True),
+    Command('task_manager', '.actions.system:open_task_manager', phrases=('открой диспетчер задач',)),
+    Command('explorer', '.actions.system:open_explorer', phrases=('открой проводник',)),
+    Command('create_folder', _create_folder, prefixes=('создай папку',), anywhere=True),
+    # Интернет и браузер
+    Command('open_google', lazy('.actions.web:open_website', 'google'), phrases=_open_site('google')),
+    Command('open_yandex', lazy('.actions.web:open_website', 'яндекс'), phrases=_open_site('яндекс')),
+    Command('open_youtube', lazy('.actions.web:open_website', 'youtube'), phrases=_open_site('youtube')),
+    Command('open_mail', lazy('.actions.web:open_website', 'почта'), phrases=_open_site('почта')),
+    Command('open_website', '.actions.web:open_website', prefixes=('открой',), accepts=is_site),
+    Command('search_web', '.actions.web:search_web', prefixes=('найди',)),
+    Command('translate', '.actions.web:translate_text', prefixes=('переведи',),
+            transform=lambda text: text.replace(' на английский', '').replace('на английский', '').strip()),
+    Command('search_images', '.actions.web:search_images', prefixes=('найди картинку',)),
+    # Поиск на компьютере
+    Command('search_file', '.actions.files:search_file', prefixes=('найди файл',)),
+    Command('search_document', lazy('.actions.files:search_file', category='document'), prefixes=('найди документ',)),
+    Command('search_music', lazy('.actions.files:search_file', category='music'), prefixes=('найди музыку',)),
+    Command('open_folder', '.actions.files:open_folder', prefixes=('открой папку',)),
+    # Мультимедиа
+    Command('music_play', lazy('.actions.media:control_music', 'play'), phrases=('включи музыку',)),
+    Command('music_pause', lazy('.actions.media:control_music', 'pause'), phrases=('поставь музыку на паузу',),
+            early=True),
+    Command('music_next', lazy('.actions.media:control_music', 'next'), phrases=('включи следующее',), early=True),
+    Command('volume_up', lazy('.actions.media:control_music', 'volume_up'), phrases=('сделай громче',), early=True),
+    Command('volume_down', lazy('.actions.media:control_music', 'volume_down'), phrases=('сделай тише',), early=True),
+    Command('watch_movie', _watch_movie, prefixes=('открой фильм',)),
+    # Разное
+    Command('date', '.actions.misc:get_date', phrases=('какой сегодня день',), early=True),
+    Command('time', '.actions.misc:get_time', phrases=('который час', 'сколько времени'), early=True),
+    Command('weather', '.actions.misc:get_weather', phrases=('какая погода',)),
+    Command('reminder', _add_reminder, prefixes=('напомни мне',)),
+    Command('add_note', '.actions.notes:add_note', prefixes=('запиши заметку',)),
+    Command('read_notes', '.actions.notes:read_notes', phrases=('прочитай заметки',)),
+    Command('timer', '.actions.timers:set_timer', prefixes=('включи таймер на',),
+            transform=lambda text: text.replace(' минут', '').strip()),
+    Command('alarm', '.actions.timers:set_alarm', prefixes=('включи будильник на',)),
+    Command('list_timers', '.actions.timers:list_timers',
+            phrases=('какие таймеры', 'покажи таймеры', 'покажи будильники')),
+    Command('cancel_timer', '.actions.timers:cancel_timer', prefixes=('отмени таймер',)),
+    Command('cancel_alarm', '.actions.timers:cancel_alarm', prefixes=('отмени будильник',)),
+    Command('snooze_alarm', '.actions.timers:snooze_alarm', phrases=('отложи будильник',)),
+    # Система мониторинга и обучения
+    Command('monitoring', '.monitoring.screen:toggle_monitoring',
+            phrases=('включи мониторинг экрана', 'выключи мониторинг экрана')),
+    Command('privacy', '.commands:toggle_privacy_mode', phrases=('включи режим конфиденциальности',)),
+    Command('learning', '.commands:toggle_learning_mode', phrases=('начни обучение поведения', 'останови обучение')),
+    Command('adapt_game', '.commands:adapt_to_game', prefixes=('адаптируйся к игре',),
+            transform=lambda text: text.strip('"')),
+    Command('do_not_disturb', '.commands:toggle_do_not_disturb', phrases=('включи режим не беспокоить',)),
+    Command('activity_logs', '.commands:show_activity_logs', phrases=('покажи логи активности',)),
+    Command('recent_activity', '.commands:show_recent_activity',
+            phrases=('покажи логи за последний час', 'логи за последний час')),
+    Command('forget_yesterday', '.commands:clear_yesterday_data', phrases=('забудь данные за вчера',)),
+    Command('insights', '.commands:get_system_insights', phrases=('какие у тебя догадки',)),
+    # Базовые команды
+    Command('greeting', partial(speak, GREETING), phrases=('привет',)),
+    Command('capabilities', partial(speak, CAPABILITIES), phrases=('что ты можешь', 'что ты умеешь')),
+    Command('joke', '.actions.misc:tell_joke', phrases=('расскажи шутку', 'пошути', 'шутка')),
+]
+
+
+def build_router() -> CommandRouter:
+    return CommandRouter(COMMANDS)
+
+
+def build_matcher() -> FuzzyMatcher:
+    return FuzzyMatcher(COMMANDS)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+
+OK = 'ok'
+ERROR = 'error'
+UNKNOWN = 'unknown'      # команда не распознана
+CONFIRM = 'confirm'      # неточное совпадение, ждём подтверждения
+CANCELLED = 'cancelled'  # пользователь отказался от предложенной команды
+EMPTY = 'empty'          # пустая строка
+MATCHED = 'matched'      # команда найдена, но не выполнялась (пробный прогон)
+
+
+@dataclass
+class ActionResult:
+    """Outcome of one command, independent of how (or whether) it is spoken.
+
+    ``replies`` are the phrases the assistant said while handling the
+    command; actions may add machine-readable details to ``data``.
+    """
+
+    command: str
+    status: str = OK
+    action: Optional[str] = None
+    argument: Optional[str] = None
+    confidence: Optional[float] = None
+    replies: List[str] = field(default_factory=list)
+    data: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def message(self) -> str:
+        return ' '.join(self.replies)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result['message'] = self.message
+        result['elapsed_ms'] = round(self.elapsed_ms, 3)
+        return result
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+
+
+_local = threading.local()
+
+
+def current() -> Optional[ActionResult]:
+    """Result of the command being handled on this thread, if any."""
+    return getattr(_local, 'result', None)
+
+
+@contextmanager
+def collect(command: str) -> Iterator[ActionResult]:
+    """Gather replies, data and errors of everything run inside the block into one result."""
+    result = ActionResult(command)
+    previous, _local.result = current(), result
+    started = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        _local.result = previous
+
+
+def record_reply(text: str) -> None:
+    result = current()
+    if result is not None:
+        result.replies.append(text)
+
+
+def attach(**data: Any) -> None:
+    """Add structured details to the current result; a no-op outside :func:`collect`."""
+    result = current()
+    if result is not None:
+        result.data.update(data)
+
+
+def fail(error: str) -> None:
+    result = current()
+    if result is not None:
+        result.status = ERROR
+        result.error = error
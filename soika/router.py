@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import bisect
+import importlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, cast
+
+
+PHRASE = "phrase"
+PREFIX = "prefix"
+RANK_PENALTY = 0.05   # штраф за каждую позицию гипотезы ниже первой в списке распознавания
+COVERAGE_WEIGHT = 0.2  # бонус за долю фразы, объяснённую шаблоном команды
+
+
+class LazyHandler:
+    """Handler given as ``"module:attr"``, imported on first call.
+
+    Relative module names resolve against the ``soika`` package. Extra
+    arguments are bound like ``functools.partial``.
+    """
+
+    def __init__(self, target: str, *args: Any, **kwargs: Any) -> None:
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self._func: Optional[Callable[..., Any]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._func is not None
+
+    def resolve(self) -> Callable[..., Any]:
+        if self._func is None:
+            module, _, attr = self.target.partition(':')
+            self._func = getattr(importlib.import_module(module, __package__), attr)
+        return self._func
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        return self.resolve()(*self.args, *args, **{**self.kwargs, **kwargs})
+
+    def __repr__(self) -> str:
+        return f"LazyHandler({self.target!r})"
+
+
+def lazy(target: str, *args: Any, **kwargs: Any) -> LazyHandler:
+    return LazyHandler(target, *args, **kwargs)
+
+
+@dataclass
+class Command:
+    """Declarative command: phrases match anywhere, prefixes capture the rest as an argument.
+
+    ``handler`` may be a ``"module:attr"`` string; the module is then imported
+    on the first call instead of when the registry is built. A prefix match
+    whose argument ``accepts`` rejects is skipped, so another command (or the
+    fuzzy matcher) gets the phrase.
+    """
+
+    name: str
+    handler: Union[Callable[..., Any], str]
+    phrases: Tuple[str, ...] = ()
+    prefixes: Tuple[str, ...] = ()
+    transform: Optional[Callable[[str], str]] = None
+    early: bool = False  # можно запускать по частичному результату распознавания
+    confirm: bool = False  # при неточном совпадении всегда переспрашивать
+    anywhere: bool = False  # префикс может стоять не в начале фразы («Soika, создай папку ...»)
+    accepts: Optional[Callable[[str], bool]] = None  # проверка аргумента префикса
+
+    def __post_init__(self) -> None:
+        if isinstance(self.handler, str):
+            self.handler = LazyHandler(self.handler)
+
+
+@dataclass
+class Match:
+    command: Command
+    pattern: str
+    kind: str
+    argument: Optional[str] = None
+    confidence: float = 1.0
+
+    def execute(self) -> Any:
+        handler = cast(Callable[..., Any], self.command.handler)
+        if self.kind == PREFIX:
+            return handler(self.argument or "")
+        return handler()
+
+
+@dataclass
+class _Node:
+    goto: Dict[str, int] = field(default_factory=dict)
+    fail: int = 0
+    outputs: List[int] = field(default_factory=list)
+
+
+class CommandRouter:
+    """Aho-Corasick automaton over every command pattern, compiled once.
+
+    ``resolve`` scans the transcript in a single pass and picks the longest
+    matching pattern; ties go to the command declared first.
+    """
+
+    def __init__(self, commands: Sequence[Command]) -> None:
+        self.commands: List[Command] = list(commands)
+        # pattern id -> (text, [(command index, kind), ...])
+        self._patterns: List[Tuple[str, List[Tuple[int, str]]]] = []
+        self._nodes: List[_Node] = [_Node()]
+        self._compile()
+
+    def _compile(self) -> None:
+        ids: Dict[str, int] = {}
+        for index, command in enumerate(self.commands):
+            entries = [(p, PHRASE) for p in command.phrases] + [(p, PREFIX) for p in command.prefixes]
+            for raw, kind in entries:
+                pattern = raw.strip().lower()
+                if not pattern:
+                    raise ValueError(f"Пустой шаблон в команде {command.name}")
+                if pattern not in ids:
+                    ids[pattern] = len(self._patterns)
+                    self._patterns.append((pattern, []))
+                    self._insert(pattern, ids[pattern])
+                self._patterns[ids[pattern]][1].append((index, kind))
+        self._link()
+
+    def _insert(self, pattern: str, pattern_id: int) -> None:
+        state = 0
+        for char in pattern:
+            nxt = self._nodes[state].goto.get(char)
+            if nxt is None:
+                nxt = len(self._nodes)
+                self._nodes.append(_Node())
+                self._nodes[state].goto[char] = nxt
+            state = nxt
+        self._nodes[state].outputs.append(pattern_id)
+
+    def _link(self) -> None:
+        queue: deque = deque()
+        for child in self._nodes[0].goto.values():
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for char, child in self._nodes[state].goto.items():
+                queue.append(child)
+                fail = self._nodes[state].fail
+                while fail and char not in self._nodes[fail].goto:
+                    fail = self._nodes[fail].fail
+                target = self._nodes[fail].goto.get(char, 0)
+                self._nodes[child].fail = target if target != child else 0
+                self._nodes[child].outputs.extend(self._nodes[self._nodes[child].fail].outputs)
+
+    def _scan(self, text: str) -> Tuple[List[Tuple[int, int]], int]:
+        """Return (pattern id, start offset) for every occurrence in ``text`` and the final state."""
+        hits: List[Tuple[int, int]] = []
+        nodes = self._nodes
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in nodes[state].goto:
+                state = nodes[state].fail
+            state = nodes[state].goto.get(char, 0)
+            for pattern_id in nodes[state].outputs:
+                hits.append((pattern_id, pos + 1 - len(self._patterns[pattern_id][0])))
+        return hits, state
+
+    def resolve(self, text: str) -> Optional[Match]:
+        text = text.strip().lower()
+        if not text:
+            return None
+        return self._best(text, self._scan(text)[0])
+
+    def resolve_early(self, partial: str) -> Optional[Match]:
+        """Match a partial transcript only if it already settles on an ``early`` command.
+
+        The automaton must not be in the middle of a longer pattern, otherwise
+        the next words could still change the winner.
+        """
+        text = partial.strip().lower()
+        if not text:
+            return None
+        hits, state = self._scan(text)
+        if self._nodes[state].goto:
+            return None
+        match = self._best(text, hits)
+        if match is None or match.kind != PHRASE or not match.command.early:
+            return None
+        return match
+
+    def _best(self, text: str, hits: List[Tuple[int, int]]) -> Optional[Match]:
+        best: Optional[Tuple[int, int]] = None  # (длина шаблона, -индекс команды)
+        best_match: Optional[Match] = None
+        for pattern_id, start in hits:
+            pattern, entries = self._patterns[pattern_id]
+            end = start + len(pattern)
+            for index, kind in entries:
+                command = self.commands[index]
+                if kind == PREFIX and (not self._starts_word(text, start, command.anywhere)
+                                       or (end < len(text) and text[end] != " ")):
+                    continue
+                rank = (len(pattern), -index)
+                if best is not None and rank <= best:
+                    continue
+                argument = None
+                if kind == PREFIX:
+                    argument = text[end:].strip()
+                    if command.transform is not None:
+                        argument = command.transform(argument)
+                    if command.accepts is not None and not command.accepts(argument):
+                        continue
+                best, best_match = rank, Match(command, pattern, kind, argument)
+        return best_match
+
+    @staticmethod
+    def _starts_word(text: str, start: int, anywhere: bool) -> bool:
+        return start == 0 or (anywhere and text[start - 1] == " ")
+
+    def resolve_many(self, texts: Sequence[str]) -> List[Optional[Match]]:
+        """Resolve several transcripts with one scan over their newline-joined text.
+
+        No pattern contains a newline, so the automaton falls back to the root
+        at every separator and a match never spans two transcripts.
+        """
+        texts = [text.strip().lower() for text in texts]
+        starts: List[int] = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        hits, _ = self._scan('\n'.join(texts))
+        grouped: List[List[Tuple[int, int]]] = [[] for _ in texts]
+        for pattern_id, start in hits:
+            index = bisect.bisect_right(starts, start) - 1
+            grouped[index].append((pattern_id, start - starts[index]))
+        return [self._best(text, group) if text else None for text, group in zip(texts, grouped)]
+
+    def pick(self, texts: Sequence[str]) -> Tuple[int, Optional[Match]]:
+        """Choose among n-best recognition alternatives the one that reads best as a command.
+
+        A phrase or a prefix with an argument beats a bare prefix, longer
+        patterns beat shorter ones, and each step down the n-best list costs
+        ``RANK_PENALTY``. Without any match the top alternative is kept.
+        """
+        best, best_score = 0, 0.0
+        matches = self.resolve_many(texts)
+        for rank, (text, match) in enumerate(zip(texts, matches)):
+            if match is None:
+                continue
+            quality = 0.6 if match.kind == PREFIX and not match.argument else 1.0
+            score = quality + COVERAGE_WEIGHT * len(match.pattern) / max(1, len(text)) - RANK_PENALTY * rank
+            if score > best_score:
+                best, best_score = rank, score
+        return best, matches[best] if texts else None
@@ -0,0 +1,289 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
+
+import psutil
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+logger = logging.getLogger("soika")
+
+HISTORY = 720              # значений в кольцевом буфере каждой метрики
+WINDOW = 60                # значений в скользящем окне агрегатов
+TOP_PROCESSES = 5          # процессов в снимке по объёму памяти
+MAX_OVERHEAD = 0.01        # доля одного ядра, которую может занимать сэмплер
+OVERHEAD_BACKOFF = 2.0     # во сколько раз растягиваются интервалы при превышении
+OVERHEAD_PERIOD = 60.0     # секунд, за которые оценивается нагрузка
+DISK_PATH = os.path.abspath(os.sep)
+
+# Интервалы опроса, секунд
+SAMPLE_RATES: Dict[str, float] = {
+    'cpu': 2.0,
+    'memory': 5.0,
+    'swap': 30.0,
+    'disk': 60.0,
+    'rss': 10.0,           # память самой Soika, МБ
+    'processes': 60.0,     # самые крупные процессы по RSS
+}
+
+ProcessInfo = Tuple[str, int, int]  # имя, pid, RSS в байтах
+
+
+class Series:
+    """Fixed-size ring of (time, value) samples with incremental rolling aggregates.
+
+    The window sum is updated on every push, and min/max come from monotonic
+    deques, so aggregates cost O(1) amortized regardless of history length.
+    """
+
+    def __init__(self, capacity: int = HISTORY, window: int = WINDOW) -> None:
+        self.capacity = capacity
+        self.window = min(window, capacity)
+        self.times: Optional[np.ndarray] = None  # кольца выделяются при первом замере, numpy не грузится при импорте
+        self.values: Optional[np.ndarray] = None
+        self.count = 0
+        self._sum = 0.0
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+
+    def push(self, timestamp: float, value: float) -> None:
+        if self.values is None:
+            self._allocate()
+        n = self.count
+        if n >= self.window:
+            self._sum -= self.values[(n - self.window) % self.capacity]
+        self.times[n % self.capacity] = timestamp
+        self.values[n % self.capacity] = value
+        self._sum += value
+        self.count = n + 1
+        oldest = self.count - self.window
+        for ring, worse in ((self._min, lambda old: old >= value), (self._max, lambda old: old <= value)):
+            while ring and worse(ring[-1][1]):
+                ring.pop()
+            ring.append((n, value))
+            while ring[0][0] < oldest:
+                ring.popleft()
+
+    def _allocate(self) -> None:
+        import numpy as np
+        self.times = np.zeros(self.capacity)
+        self.values = np.zeros(self.capacity)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def last(self) -> Optional[float]:
+        return float(self.values[(self.count - 1) % self.capacity]) if self.count else None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._sum / min(self.count, self.window) if self.count else None
+
+    @property
+    def minimum(self) -> Optional[float]:
+        return self._min[0][1] if self._min else None
+
+    @property
+    def maximum(self) -> Optional[float]:
+        return self._max[0][1] if self._max else None
+
+    @property
+    def trend(self) -> Optional[float]:
+        """Change between the oldest and newest value of the window."""
+        if self.count < 2:
+            return None
+        oldest = max(0, self.count - self.window)
+        return float(self.values[(self.count - 1) % self.capacity] - self.values[oldest % self.capacity])
+
+    def series(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Chronological copy of the stored (times, values)."""
+        import numpy as np
+        if self.values is None:
+            self._allocate()
+        if self.count <= self.capacity:
+            return self.times[:self.count].copy(), self.values[:self.count].copy()
+        head = self.count % self.capacity
+        return np.roll(self.times, -head), np.roll(self.values, -head)
+
+
+@dataclass
+class Rule:
+    """Threshold alert with hysteresis: fires at ``threshold``, re-arms below ``clear``.
+
+    With ``repeat`` the rule fires again every ``cooldown`` seconds for as long
+    as the value stays above ``clear``.
+    """
+
+    name: str
+    metric: str
+    threshold: float
+    clear: float
+    action: Callable[[float], None]
+    cooldown: float = 300.0
+    aggregate: str = 'last'          # last, mean, minimum или maximum
+    repeat: bool = False
+    on_clear: Optional[Callable[[float], None]] = None
+    active: bool = field(default=False, init=False)
+    fired_at: float = field(default=0.0, init=False)
+
+    def check(self, series: Series, now: float) -> bool:
+        value = getattr(series, self.aggregate)
+        if value is None:
+            return False
+        if self.active:
+            if value < self.clear:
+                self.active = False
+                if self.on_clear is not None:
+                    self._call(self.on_clear, value)
+                return False
+            if not self.repeat or now - self.fired_at < self.cooldown:
+                return False
+        elif value < self.threshold or now - self.fired_at < self.cooldown:
+            return False
+        self.active = True
+        self.fired_at = now
+        self._call(self.action, value)
+        return True
+
+    def _call(self, callback: Callable[[float], None], value: float) -> None:
+        try:
+            callback(value)
+        except Exception as exc:
+            logger.error(f"Ошибка в правиле {self.name}: {exc}")
+
+
+class ResourceSampler:
+    """One background thread sampling system metrics at per-metric rates.
+
+    The thread measures its own CPU time; when it exceeds ``MAX_OVERHEAD``
+    of one core, all intervals are stretched by ``OVERHEAD_BACKOFF``.
+    """
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, history: int = HISTORY,
+                 window: int = WINDOW) -> None:
+        self.rates = dict(rates or SAMPLE_RATES)
+        self.series: Dict[str, Series] = {name: Series(history, window) for name in self.rates if name != 'processes'}
+        self.rules: List[Rule] = []
+        self.top_processes: List[ProcessInfo] = []
+        self.scale = 1.0
+        self._due: Dict[str, float] = {}
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._cpu_spent = 0.0
+        self._started = 0.0
+        self._period_cpu = 0.0
+        self._period_started = 0.0
+        self.samples = 0
+
+    def add_rule(self, rule: Rule) -> None:
+        with self._lock:
+            self.rules.append(rule)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        psutil.cpu_percent(None)  # первый вызов задаёт точку отсчёта
+        self._started = self._period_started = time.monotonic()
+        self._due = {name: self._started for name in self.rates}
+        self._thread = threading.Thread(target=self._run, name="soika-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        logger.info(f"Сэмплер ресурсов остановлен: замеров {self.samples}, "
+                    f"нагрузка {self.overhead() * 100:.2f}% ядра")
+
+    def overhead(self) -> float:
+        """Sampler CPU time as a fraction of one core since start."""
+        elapsed = time.monotonic() - self._started
+        return self._cpu_spent / elapsed if elapsed > 0 else 0.0
+
+    def _measure(self, name: str) -> Optional[float]:
+        if name == 'cpu':
+            return psutil.cpu_percent(None)
+        if name == 'memory':
+            return psutil.virtual_memory().percent
+        if name == 'swap':
+            return psutil.swap_memory().percent
+        if name == 'disk':
+            return psutil.disk_usage(DISK_PATH).percent
+        if name == 'rss':
+            return self._process.memory_info().rss / (1024 * 1024)
+        if name == 'processes':
+            self.top_processes = self._top_processes()
+        return None
+
+    @staticmethod
+    def _top_processes() -> List[ProcessInfo]:
+        found: List[ProcessInfo] = []
+        for proc in psutil.process_iter(['pid', 'name', 'memory_info']):
+            memory = proc.info.get('memory_info')
+            if memory is not None:
+                found.append((proc.info.get('name') or '?', proc.info['pid'], memory.rss))
+        found.sort(key=lambda item: item[2], reverse=True)
+        return found[:TOP_PROCESSES]
+
+    def sample(self, names: List[str]) -> None:
+        now = time.time()
+        for name in names:
+            try:
+                value = self._measure(name)
+            except Exception as exc:
+                logger.debug(f"Не удалось снять метрику {name}: {exc}")
+                continue
+            if value is None:
+                continue
+            series = self.series[name]
+            series.push(now, value)
+            with self._lock:
+                rules = [rule for rule in self.rules if rule.metric == name]
+            for rule in rules:
+                rule.check(series, now)
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            now = time.monotonic()
+            due = [name for name, at in self._due.items() if at <= now]
+            if due:
+                cpu_started = time.thread_time()
+                self.sample(due)
+                spent = time.thread_time() - cpu_started
+                self._cpu_spent += spent
+                self._period_cpu += spent
+                self._check_budget(now)
+                for name in due:
+                    self._due[name] = now + self.rates[name] * self.scale
+            self._stop.wait(max(0.05, min(self._due.values()) - time.monotonic()))
+
+    def _check_budget(self, now: float) -> None:
+        elapsed = now - self._period_started
+        if elapsed < OVERHEAD_PERIOD:
+            return
+        if self._period_cpu / elapsed > MAX_OVERHEAD:
+            self.scale *= OVERHEAD_BACKOFF
+            logger.warning(f"Сэмплер превысил бюджет нагрузки, интервалы увеличены в {self.scale:g} раз")
+        self._period_cpu = 0.0
+        self._period_started = now
+
+
+sampler = ResourceSampler()
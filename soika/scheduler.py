@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import datetime
+import heapq
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+logger = logging.getLogger("soika")
+
+MAX_SLEEP = 60.0  # перепроверка раз в минуту на случай перевода системных часов
+
+When = Union[float, datetime.datetime]
+
+
+@dataclass(order=True)
+class ScheduledEvent:
+    due: float
+    seq: int
+    id: str = field(compare=False)
+    kind: str = field(compare=False)
+    callback: Callable[["ScheduledEvent"], Any] = field(compare=False, repr=False)
+    payload: Dict[str, Any] = field(compare=False, default_factory=dict)
+    cancelled: bool = field(compare=False, default=False)
+
+    @property
+    def due_at(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.due)
+
+
+def _timestamp(when: When) -> float:
+    return when.timestamp() if isinstance(when, datetime.datetime) else float(when)
+
+
+class Scheduler:
+    """One thread and a min-heap of deadlines for timers, alarms and reminders.
+
+    The thread sleeps until the earliest deadline; cancelled entries are
+    dropped lazily and the heap is rebuilt once they make up half of it.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[ScheduledEvent] = []
+        self._events: Dict[str, ScheduledEvent] = {}
+        self._counters: Dict[str, "itertools.count[int]"] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def new_id(self, kind: str) -> str:
+        with self._cond:
+            counter = self._counters.setdefault(kind, itertools.count(1))
+            return f"{kind}_{next(counter)}"
+
+    def reserve_id(self, event_id: str) -> None:
+        """Make sure :meth:`new_id` never hands out ``event_id`` again (e.g. after a restore)."""
+        kind, _, number = event_id.rpartition('_')
+        if not number.isdigit():
+            return
+        with self._cond:
+            counter = self._counters.get(kind)
+            start = next(counter) if counter is not None else 1
+            self._counters[kind] = itertools.count(max(start, int(number) + 1))
+
+    def schedule(self, when: When, callback: Callable[[ScheduledEvent], Any], kind: str = "event",
+                 payload: Optional[Dict[str, Any]] = None, event_id: Optional[str] = None) -> str:
+        event_id = event_id or self.new_id(kind)
+        event = ScheduledEvent(_timestamp(when), next(self._seq), event_id, kind, callback, dict(payload or {}))
+        with self._cond:
+            previous = self._events.pop(event_id, None)
+            if previous is not None:
+                previous.cancelled = True
+            self._events[event_id] = event
+            heapq.heappush(self._heap, event)
+            self._ensure_thread()
+            if self._heap[0] is event:
+                self._cond.notify()
+        return event_id
+
+    def cancel(self, event_id: str) -> bool:
+        with self._cond:
+            event = self._events.pop(event_id, None)
+            if event is None:
+                return False
+            event.cancelled = True
+            if len(self._heap) > 64 and len(self._events) * 2 < len(self._heap):
+                self._heap = [e for e in self._heap if not e.cancelled]
+                heapq.heapify(self._heap)
+            return True
+
+    def get(self, event_id: str) -> Optional[ScheduledEvent]:
+        with self._cond:
+            return self._events.get(event_id)
+
+    def pending(self, kind: Optional[str] = None) -> List[ScheduledEvent]:
+        with self._cond:
+            events = [e for e in self._events.values() if kind is None or e.kind == kind]
+        return sorted(events)
+
+    def next_due(self) -> Optional[float]:
+        with self._cond:
+            self._drop_cancelled()
+            return self._heap[0].due if self._heap else None
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="soika-scheduler", daemon=True)
+            self._thread.start()
+
+    def _drop_cancelled(self) -> None:
+        while self._heap and self._heap[0].cancelled:
+            heapq.heappop(self._heap)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopped:
+                        return
+                    self._drop_cancelled()
+                    now = time.time()
+                    if self._heap and self._heap[0].due <= now:
+                        event = heapq.heappop(self._heap)
+                        self._events.pop(event.id, None)
+                        break
+                    timeout = min(MAX_SLEEP, self._heap[0].due - now) if self._heap else MAX_SLEEP
+                    self._cond.wait(timeout)
+            try:
+                event.callback(event)
+            except Exception as exc:
+                logger.error(f"Ошибка при срабатывании события {event.id}: {exc}")
+
+
+scheduler = Scheduler()
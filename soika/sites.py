@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+
+# Названия сайтов, которые можно открыть голосом, и их адреса
+SITES = {
+    'google': 'https://www.google.com',
+    'яндекс': 'https://www.yandex.ru',
+    'youtube': 'https://www.youtube.com',
+    'gmail': 'https://mail.google.com',
+    'почта': 'https://mail.yandex.ru',
+}
+# Как названия звучат в распознанной речи, кроме написания из SITES
+SPOKEN_NAMES = {
+    'google': ('гугл',),
+    'яндекс': ('yandex',),
+    'youtube': ('ютуб', 'ютьюб'),
+    'почта': ('почту',),
+}
+_ALIASES = {alias: site for site, aliases in SPOKEN_NAMES.items() for alias in aliases}
+
+
+def spoken_names(site: str) -> Tuple[str, ...]:
+    return (site,) + SPOKEN_NAMES.get(site, ())
+
+
+def site_url(name: str) -> Optional[str]:
+    """Address for a known site name, an explicit URL or a domain; None for anything else."""
+    name = _ALIASES.get(name.strip(), name.strip())
+    if name in SITES:
+        return SITES[name]
+    if name.startswith('http'):
+        return name
+    if '.' in name and ' ' not in name:
+        return f'https://{name}'
+    return None
+
+
+def is_site(name: str) -> bool:
+    return site_url(name) is not None
@@ -1,34 +1,282 @@
 from __future__ import annotations
 
+import itertools
 import logging
-import pyttsx3
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Iterable, Optional, Tuple
+
+from .metrics import metrics
+from .phrase_cache import PhraseCache, join_wav, template_literals, template_parts, wav_seconds
+from .results import record_reply
+
+try:
+    import winsound
+except ImportError:  # pragma: no cover - воспроизведение из кэша доступно только в Windows
+    winsound = None  # type: ignore[assignment]
 
 
 logger = logging.getLogger("soika")
 
+PRIORITY_ALARM = 0
+PRIORITY_WARNING = 1
+PRIORITY_NORMAL = 5
+
+# Фиксированные фразы, которые заранее синтезируются в кэш
+COMMON_PHRASES = (
+    "Привет! Я Soika, ваш голосовой помощник. Как я могу помочь?",
+    "Я не поняла вашу команду, Soika.",
+    "Я не знаю, как выполнить эту команду. Попробуйте сказать 'что ты можешь' для списка команд.",
+    "Открываю проводник.",
+    "Открываю диспетчер задач.",
+    "До свидания!",
+)
+SEEN_LIMIT = 512  # сколько недавних фраз помнить, чтобы кэшировать повторяющиеся
+# Из памяти winsound играет только синхронно, поэтому фраза из кэша проигрывается через файл
+PLAYBACK_PATH = Path(tempfile.gettempdir()) / 'soika_phrase.wav'
+
+
+@dataclass(order=True)
+class _Phrase:
+    priority: int
+    seq: int
+    text: str = field(compare=False)
+    parts: Tuple[str, ...] = field(compare=False, default=())
+    fixed: Tuple[str, ...] = field(compare=False, default=())  # неизменные фрагменты шаблона
+    done: threading.Event = field(compare=False, default_factory=threading.Event)
+    queued_at: float = field(compare=False, default_factory=time.monotonic)
+
 
 class Speaker:
-    def __init__(self, rate: int = 150, volume: float = 0.9) -> None:
-        self._engine = pyttsx3.init()
-        self._engine.setProperty('rate', rate)
-        self._engine.setProperty('volume', volume)
+    """Owns the pyttsx3 engine on a dedicated worker thread.
+
+    Phrases are spoken in priority order (alarms, then warnings, then regular
+    replies); a more urgent phrase or :meth:`interrupt` cuts off regular
+    speech at the next word boundary.
+
+    With a :class:`PhraseCache`, repeated phrases and template fragments are
+    synthesized to WAV once while the worker is idle and then played directly.
+    """
+
+    def __init__(self, rate: int = 150, volume: float = 0.9, cache: Optional[PhraseCache] = None) -> None:
+        self.rate = rate
+        self.volume = volume
+        self.cache = cache if winsound is not None else None
+        self._voice: Any = None
+        self._renders: Deque[str] = deque()
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self._queue: "queue.PriorityQueue[_Phrase]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._engine: Optional[Any] = None
+        self._current: Optional[_Phrase] = None
+        self._interrupt = threading.Event()
+        self._stopped = False  # движок остановлен посреди текущей фразы или рендера
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def speaking(self) -> bool:
+        return self._current is not None or not self._queue.empty()
 
-    def say(self, text: str) -> None:
+    def say(self, text: str, priority: int = PRIORITY_NORMAL, wait: bool = False,
+            parts: Tuple[str, ...] = (), fixed: Tuple[str, ...] = ()) -> None:
         if not text or text.strip() == "":
             return
+        self._ensure_worker()
+        phrase = _Phrase(priority, next(self._seq), text, parts, fixed)
+        current = self._current
+        if current is not None and priority < PRIORITY_NORMAL <= current.priority:
+            self._interrupt.set()
+        self._queue.put(phrase)
+        if wait:
+            phrase.done.wait()
+
+    def interrupt(self) -> None:
+        """Stop regular speech and drop queued replies; alarms and warnings are kept."""
+        kept = []
+        while True:
+            try:
+                phrase = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if phrase.priority < PRIORITY_NORMAL:
+                kept.append(phrase)
+            else:
+                phrase.done.set()
+        for phrase in kept:
+            self._queue.put(phrase)
+        current = self._current
+        if current is not None and current.priority >= PRIORITY_NORMAL:
+            self._interrupt.set()
+
+    def warm_up(self, timeout: Optional[float] = None) -> bool:
+        """Start the worker and wait for the engine; False if speech synthesis is unavailable."""
+        self._ensure_worker()
+        self._ready.wait(timeout)
+        return self._engine is not None
+
+    def prerender(self, texts: Iterable[str]) -> None:
+        """Queue phrases for synthesis into the cache while the worker is idle."""
+        if self.cache is None:
+            return
+        self._renders.extend(text.strip() for text in texts if text.strip())
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="soika-tts", daemon=True)
+                self._thread.start()
+
+    def _init_engine(self) -> Optional[Any]:
+        try:
+            import comtypes  # type: ignore
+            comtypes.CoInitialize()
+        except Exception:
+            pass
+        try:
+            # pyttsx3 тянет за собой драйвер SAPI, поэтому импортируется уже в потоке синтеза
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            engine.setProperty('volume', self.volume)
+            engine.connect('started-word', self._on_word)
+            self._voice = engine.getProperty('voice')
+            return engine
+        except Exception as exc:  # pragma: no cover
+            logger.error(f"Не удалось инициализировать синтез речи: {exc}")
+            return None
+
+    def _on_word(self, name: Any, location: int, length: int) -> None:
+        # Прерывание касается только произносимой фразы, а не синтеза в кэш в простое
+        if self._interrupt.is_set() and self._current is not None and self._engine is not None:
+            self._stopped = True
+            self._engine.stop()
+
+    def _run(self) -> None:
+        self._engine = self._init_engine()
+        self._ready.set()
+        if self._engine is not None:
+            self.prerender(COMMON_PHRASES)
+        while True:
+            try:
+                phrase = self._queue.get(timeout=0.05 if self._renders else None)
+            except queue.Empty:
+                self._render(self._renders.popleft())
+                continue
+            self._current = phrase
+            self._interrupt.clear()
+            started = time.monotonic()
+            metrics.observe('speak.wait', (started - phrase.queued_at) * 1000)
+            try:
+                if self._play_cached(phrase):
+                    metrics.increment('speak.cached')
+                else:
+                    self._speak(phrase.text)
+            finally:
+                metrics.observe('speak', (time.monotonic() - started) * 1000)
+                self._current = None
+                phrase.done.set()
+
+    def _key(self, text: str) -> str:
+        return PhraseCache.key(text, self._voice, self.rate, self.volume)
+
+    def _play_cached(self, phrase: _Phrase) -> bool:
+        if self.cache is None or self._engine is None:
+            return False
+        parts = phrase.parts or (phrase.text.strip(),)
+        chunks = [self.cache.get(self._key(part)) for part in parts]
+        missing = [part for part, data in zip(parts, chunks) if data is None]
+        if missing:
+            # Неизменные фрагменты шаблонов кэшируем сразу, значения слотов и обычный текст — со второго
+            # повтора: иначе, например, каждая новая минута в «Сейчас {time}» вытесняла бы кэш
+            self._renders.extend(part for part in missing if part in phrase.fixed or self._repeated(part))
+            return False
+        audio = chunks[0] if len(chunks) == 1 else join_wav(chunks)  # type: ignore[arg-type]
+        if audio is None:
+            return False
+        try:
+            PLAYBACK_PATH.write_bytes(audio)
+            winsound.PlaySound(str(PLAYBACK_PATH), winsound.SND_FILENAME | winsound.SND_ASYNC)  # type: ignore[union-attr]
+        except Exception as exc:  # pragma: no cover
+            logger.error(f"Ошибка воспроизведения из кэша: {exc}")
+            return False
+        # Воспроизведение асинхронное: перебивание и срочные фразы останавливают его, как и синтез
+        if self._interrupt.wait(wav_seconds(audio)):
+            winsound.PlaySound(None, 0)  # type: ignore[union-attr]
+            logger.info(f"Soika прервана (кэш): {phrase.text}")
+        else:
+            logger.info(f"Soika сказала (кэш): {phrase.text}")
+        return True
+
+    def _repeated(self, text: str) -> bool:
+        count = self._seen.pop(text, 0) + 1
+        self._seen[text] = count
+        if len(self._seen) > SEEN_LIMIT:
+            self._seen.popitem(last=False)
+        return count >= 2
+
+    def _render(self, text: str) -> None:
+        if self.cache is None or self._engine is None:
+            return
+        key = self._key(text)
+        if key in self.cache:
+            return
+        path = self.cache.path(key)
+        self._stopped = False
+        try:
+            self._engine.save_to_file(text, str(path))
+            self._engine.runAndWait()
+            if self._stopped:
+                # Обрезанный файл проигрывался бы при каждом повторе фразы
+                path.unlink(missing_ok=True)
+                return
+            self.cache.add(key)
+        except Exception as exc:  # pragma: no cover
+            logger.error(f"Ошибка синтеза фразы в кэш: {exc}")
+
+    def _speak(self, text: str) -> None:
+        if self._engine is None:
+            print(f"Soika: {text}")
+            return
         try:
             self._engine.say(text)
             self._engine.runAndWait()
-            logger.info(f"Soika сказала: {text}")
+            if self._interrupt.is_set():
+                logger.info(f"Soika прервана: {text}")
+            else:
+                logger.info(f"Soika сказала: {text}")
         except Exception as exc:  # pragma: no cover
             logger.error(f"Ошибка при озвучивании: {exc}")
             print(f"Soika: {text}")
 
 
-speaker = Speaker()
+speaker = Speaker(cache=PhraseCache())
+_voice = True  # False — ответы только записываются в результат команды, без синтеза
+
+
+def set_voice(enabled: bool) -> None:
+    """Turn speech output on or off; replies are recorded into the command result either way."""
+    global _voice
+    _voice = enabled
 
 
-def speak(text: str) -> None:
-    speaker.say(text)
+def speak(text: str, priority: int = PRIORITY_NORMAL, wait: bool = False) -> None:
+    record_reply(text)
+    if _voice:
+        speaker.say(text, priority=priority, wait=wait)
 
 
+def speak_template(template: str, priority: int = PRIORITY_NORMAL, wait: bool = False, **slots: Any) -> None:
+    """Speak ``template.format(**slots)``, reusing cached audio for each fragment."""
+    text = template.format(**slots)
+    record_reply(text)
+    if _voice:
+        speaker.say(text, priority=priority, wait=wait, parts=tuple(template_parts(template, slots)),
+                    fixed=tuple(template_literals(template)))
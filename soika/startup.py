@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .metrics import metrics
+
+
+logger = logging.getLogger("soika")
+
+STARTUP_TIMEOUT = 15.0  # секунд, после которых недоступный компонент считается неготовым
+
+
+@dataclass
+class Component:
+    """One startup step; ``start`` runs on its own thread and its return value is kept."""
+
+    name: str
+    start: Callable[[], Any]
+    value: Any = None
+    error: Optional[Exception] = None
+    seconds: Optional[float] = None
+    done: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def ready(self) -> bool:
+        return self.done.is_set() and self.error is None
+
+
+class Startup:
+    """Initializes independent components concurrently and reports their readiness.
+
+    Each component starts on its own thread as soon as :meth:`start` is
+    called; callers :meth:`wait` only for the components they need next, so
+    a slow microphone does not delay the greeting and vice versa.
+    """
+
+    def __init__(self, components: Sequence[Tuple[str, Callable[[], Any]]]) -> None:
+        self.components: Dict[str, Component] = {name: Component(name, start) for name, start in components}
+        self.started_at: Optional[float] = None
+
+    def start(self) -> "Startup":
+        self.started_at = time.monotonic()
+        for component in self.components.values():
+            threading.Thread(target=self._run, args=(component,), name=f"soika-start-{component.name}",
+                             daemon=True).start()
+        return self
+
+    def _run(self, component: Component) -> None:
+        started = time.monotonic()
+        try:
+            component.value = component.start()
+        except Exception as exc:
+            component.error = exc
+            logger.error(f"Компонент {component.name} не запустился: {exc}")
+            logger.debug(f"Трассировка запуска {component.name}", exc_info=True)
+        finally:
+            component.seconds = time.monotonic() - started
+            metrics.observe(f'startup.{component.name}', component.seconds * 1000)
+            component.done.set()
+
+    def wait(self, *names: str, timeout: Optional[float] = STARTUP_TIMEOUT) -> bool:
+        """Wait for ``names`` (all components if empty); True if every one is ready."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in names or tuple(self.components):
+            component = self.components[name]
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not component.done.wait(remaining):
+                logger.warning(f"Компонент {name} не готов за {timeout:.0f} с")
+        return all(self.components[name].ready for name in names or self.components)
+
+    def result(self, name: str) -> Any:
+        return self.components[name].value
+
+    def report(self) -> List[str]:
+        lines = []
+        for component in self.components.values():
+            if not component.done.is_set():
+                lines.append(f"{component.name}: запускается")
+            elif component.error is not None:
+                lines.append(f"{component.name}: ошибка за {component.seconds:.2f} с ({component.error})")
+            else:
+                lines.append(f"{component.name}: готов за {component.seconds:.2f} с")
+        return lines
+
+    def log_report(self) -> None:
+        elapsed = time.monotonic() - (self.started_at or time.monotonic())
+        logger.info(f"Запуск занял {elapsed:.2f} с: " + "; ".join(self.report()))
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any
 
@@ -12,7 +13,7 @@ class SystemState:
     do_not_disturb: bool = False
     current_game: Optional[str] = None
     notes: List[Dict[str, Any]] = field(default_factory=list)
-    reminders: List[Dict[str, Any]] = field(default_factory=list)
+    reminders: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     timers: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     alarms: Dict[str, Dict[str, Any]] = field(default_factory=dict)
     monitor_thread: Optional[Any] = None
@@ -21,12 +22,59 @@ class SystemState:
 
 state = SystemState()
 
+# Журнал изменений (см. soika.persistence); пока он не подключён, изменения живут только в памяти
+_store: Optional[Any] = None
+_lock = threading.RLock()
+
+
+def attach_store(store: Optional[Any]) -> None:
+    global _store
+    _store = store
+
+
+def _record(op: Dict[str, Any]) -> None:
+    if _store is not None:
+        _store.record(op)
+
+
+def set_field(name: str, value: Any) -> None:
+    with _lock:
+        setattr(state, name, value)
+        _record({'op': 'set', 'field': name, 'value': value})
+
+
+def append_item(name: str, value: Any) -> None:
+    with _lock:
+        getattr(state, name).append(value)
+        _record({'op': 'append', 'field': name, 'value': value})
+
+
+def put_item(name: str, key: str, value: Any) -> None:
+    with _lock:
+        getattr(state, name)[key] = value
+        _record({'op': 'put', 'field': name, 'key': key, 'value': value})
+
+
+def remove_item(name: str, key: Any) -> bool:
+    with _lock:
+        container = getattr(state, name)
+        if isinstance(container, dict):
+            if key not in container:
+                return False
+            del container[key]
+        else:
+            if not 0 <= key < len(container):
+                return False
+            del container[key]
+        _record({'op': 'remove', 'field': name, 'key': key})
+        return True
+
 
 def toggle_flag(flag_name: str) -> bool:
     if not hasattr(state, flag_name):
         raise AttributeError(f"Unknown flag: {flag_name}")
-    current = bool(getattr(state, flag_name))
-    setattr(state, flag_name, not current)
-    return getattr(state, flag_name)
+    with _lock:
+        set_field(flag_name, not bool(getattr(state, flag_name)))
+        return getattr(state, flag_name)
 
 
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import datetime
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+
+MEMO_SIZE = 512
+DEFAULT_HOUR = 9  # «завтра» без времени
+
+UNITS = {
+    'ноль': 0, 'один': 1, 'одна': 1, 'одну': 1, 'два': 2, 'две': 2, 'три': 3, 'четыре': 4,
+    'пять': 5, 'шесть': 6, 'семь': 7, 'восемь': 8, 'девять': 9,
+}
+TEENS = {
+    'десять': 10, 'одиннадцать': 11, 'двенадцать': 12, 'тринадцать': 13, 'четырнадцать': 14,
+    'пятнадцать': 15, 'шестнадцать': 16, 'семнадцать': 17, 'восемнадцать': 18, 'девятнадцать': 19,
+}
+TENS = {'двадцать': 20, 'тридцать': 30, 'сорок': 40, 'пятьдесят': 50}
+DAYS = {'сегодня': 0, 'завтра': 1, 'послезавтра': 2}
+UNIT_SECONDS = {'секунд': 1, 'минут': 60, 'час': 3600, 'дн': 86400, 'ден': 86400}
+
+_DAY = r'(?P<day>сегодня|завтра|послезавтра)'
+_ABSOLUTE = re.compile(
+    r'^(?:' + _DAY + r'\s*)?'
+    r'(?:(?P<at>в|на)\s+)?'
+    r'(?:(?P<noon>полдень)|(?P<midnight>полночь)|'
+    r'(?P<hour>\d{1,2})(?:(?::|\.|\s)(?P<minute>\d{1,2}))?(?:\s+час(?:а|ов)?)?(?P<minutes_word>\s+минут[аы]?)?'
+    r'(?:\s+(?P<period>утра|дня|вечера|ночи))?)?'
+    r'(?:\s+(?P<day_after>сегодня|завтра|послезавтра))?$'
+)
+_RELATIVE = re.compile(
+    r'^через\s+(?:(?P<count>\d+)\s+)?(?P<unit>секунд[уы]?|минут[уы]?|час(?:а|ов)?|дн(?:я|ей)|день)'
+    r'(?:\s+(?:и\s+)?(?P<count2>\d+)\s+(?P<unit2>секунд[уы]?|минут[уы]?))?$'
+)
+
+# Разобранное выражение: ('rel', секунды) или ('abs', сдвиг в днях, час, минута, день указан явно)
+Spec = Tuple
+
+
+def normalize(phrase: str) -> str:
+    text = phrase.lower().replace('ё', 'е')
+    text = re.sub(r'[,!?]', ' ', text)
+    return ' '.join(text.split())
+
+
+def _numberize(words: List[str]) -> List[str]:
+    """Replace number words with digits: «двадцать пять» → «25», «полчаса» → «30 минут»."""
+    out: List[str] = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        if word == 'полчаса':
+            out += ['30', 'минут']
+        elif word == 'полтора' and i + 1 < len(words) and words[i + 1].startswith('час'):
+            out += ['90', 'минут']
+            i += 1
+        elif word in TENS:
+            value = TENS[word]
+            if i + 1 < len(words) and words[i + 1] in UNITS and UNITS[words[i + 1]]:
+                value += UNITS[words[i + 1]]
+                i += 1
+            out.append(str(value))
+        elif word in TEENS:
+            out.append(str(TEENS[word]))
+        elif word in UNITS:
+            out.append(str(UNITS[word]))
+        else:
+            out.append(word)
+        i += 1
+    return out
+
+
+def _unit_seconds(unit: str) -> int:
+    for stem, seconds in UNIT_SECONDS.items():
+        if unit.startswith(stem):
+            return seconds
+    raise ValueError(unit)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def compile_expression(normalized: str) -> Optional[Spec]:
+    """Parse a normalized phrase into a time spec independent of the current moment."""
+    text = ' '.join(_numberize(normalized.split()))
+    match = _RELATIVE.match(text)
+    if match:
+        seconds = int(match.group('count') or 1) * _unit_seconds(match.group('unit'))
+        if match.group('count2'):
+            seconds += int(match.group('count2')) * _unit_seconds(match.group('unit2'))
+        return ('rel', seconds) if seconds > 0 else None
+    match = _ABSOLUTE.match(text)
+    if not match:
+        return None
+    day = match.group('day') or match.group('day_after')
+    has_time = match.group('hour') or match.group('noon') or match.group('midnight')
+    if not day and not (has_time and match.group('at')):
+        return None
+    if match.group('noon'):
+        hour, minute = 12, 0
+    elif match.group('midnight'):
+        hour, minute = 0, 0
+    elif match.group('hour'):
+        if match.group('minutes_word') and match.group('minute') is None:
+            # «в пять минут» — это не 05:00: без часа время не угадываем
+            return None
+        hour, minute = int(match.group('hour')), int(match.group('minute') or 0)
+        period = match.group('period')
+        if period in ('дня', 'вечера') and hour < 12:
+            hour += 12
+        elif period in ('утра', 'ночи') and hour == 12:
+            hour = 0
+    else:
+        hour, minute = DEFAULT_HOUR, 0
+    if not (0 <= hour <= 23 and 0 <= minute <= 59):
+        return None
+    return ('abs', DAYS.get(day or '', 0), hour, minute, bool(day))
+
+
+def resolve(spec: Spec, now: datetime.datetime) -> datetime.datetime:
+    if spec[0] == 'rel':
+        return now + datetime.timedelta(seconds=spec[1])
+    _, days, hour, minute, explicit_day = spec
+    target = datetime.datetime.combine(now.date() + datetime.timedelta(days=days), datetime.time(hour, minute))
+    if not explicit_day and target <= now:
+        target += datetime.timedelta(days=1)
+    return target
+
+
+def parse_time(phrase: str, now: Optional[datetime.datetime] = None) -> Optional[datetime.datetime]:
+    """Parse spoken Russian like «в 8:30», «в восемь вечера», «через 20 минут», «завтра в 9»."""
+    spec = compile_expression(normalize(phrase))
+    if spec is None:
+        return None
+    return resolve(spec, now or datetime.datetime.now())
+
+
+def split_expression(phrase: str) -> Tuple[str, Optional[str]]:
+    """Split «позвонить маме завтра в 9» into the text and the time expression.
+
+    The longest trailing (or, failing that, leading) run of words that
+    parses as a time wins.
+    """
+    words = normalize(phrase).split()
+    for start in range(len(words)):
+        if compile_expression(' '.join(words[start:])) is not None:
+            return ' '.join(words[:start]), ' '.join(words[start:])
+    for end in range(len(words), 0, -1):
+        if compile_expression(' '.join(words[:end])) is not None:
+            return ' '.join(words[end:]), ' '.join(words[:end])
+    return ' '.join(words), None
@@ -4,6 +4,8 @@ from functools import wraps
 import logging
 from typing import Any, Callable, Optional, TypeVar, cast
 
+from .metrics import metrics
+from .results import fail
 from .speech import speak
 
 
@@ -12,12 +14,16 @@ F = TypeVar("F", bound=Callable[..., Any])
 
 
 def error_handler(func: F) -> F:
+    span = f"action.{func.__name__}"
+
     @wraps(func)
     def wrapper(*args: Any, **kwargs: Any):  # type: ignore[misc]
         try:
-            return func(*args, **kwargs)
+            with metrics.span(span):
+                return func(*args, **kwargs)
         except Exception as exc:  # pragma: no cover
             logger.error(f"Ошибка в функции {func.__name__}: {exc}")
+            fail(f"{type(exc).__name__}: {exc}")
             speak("Произошла ошибка при выполнении команды. Попробуйте еще раз.")
             return None
     return cast(F, wrapper)
@@ -1,31 +1,89 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+import time
+from typing import Callable, List, Optional
 
 import speech_recognition as sr
 
-from .speech import speak
+from .capture import CaptureSession, Utterance
+from .recognition import GoogleBackend, RecognizerBackend, transcribe
+from .speech import speak, speaker
 
 
 logger = logging.getLogger("soika")
 
+_backend: Optional[RecognizerBackend] = None
+_session: Optional[CaptureSession] = None
 
-def listen_command() -> str:
-    recognizer = sr.Recognizer()
+
+def configure(backend: Optional[RecognizerBackend] = None, session: Optional[CaptureSession] = None) -> None:
+    """Swap the recognition backend or the audio source (e.g. for offline runs)."""
+    global _backend, _session
+    if backend is not None:
+        _backend = backend
+    if session is not None:
+        if _session is not None and _session is not session:
+            _session.stop()
+        _session = session
+
+
+def get_backend() -> RecognizerBackend:
+    global _backend
+    if _backend is None:
+        _backend = GoogleBackend()
+    return _backend
+
+
+def warm_up_recognizer() -> RecognizerBackend:
+    backend = get_backend()
+    backend.warm_up()
+    return backend
+
+
+def open_microphone() -> CaptureSession:
+    """Start capture ahead of the first command; raises if the microphone cannot be opened."""
+    session = get_capture_session()
+    if not session.running:
+        raise RuntimeError("микрофон недоступен")
+    return session
+
+
+def get_capture_session() -> CaptureSession:
+    global _session
+    if _session is None:
+        # Пока Soika говорит, микрофон не превращает её собственный голос в команды,
+        # но громкая речь пользователя прерывает ответ
+        _session = CaptureSession(is_muted=lambda: speaker.speaking, on_barge_in=speaker.interrupt)
+    if not _session.running:
+        _session.start()
+    return _session
+
+
+def recognize_utterance(utterance: Utterance, early: Optional[Callable[[str], bool]] = None,
+                        rescore: Optional[Callable[[List[str]], int]] = None) -> str:
+    """Recognize one utterance; ``rescore`` picks the index of the best n-best alternative."""
     try:
-        with sr.Microphone() as source:
-            print("Soika слушает...")
-            recognizer.adjust_for_ambient_noise(source, duration=1)
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-        command = recognizer.recognize_google(audio, language="ru-RU")
-        if not command or command.strip() == "":
+        hypothesis = transcribe(get_backend(), utterance, early)
+        if hypothesis is None and utterance.discarded:
+            return ""
+        if hypothesis is None or hypothesis.text.strip() == "":
             speak("Я не поняла вашу команду, Soika.")
             return ""
+        command = hypothesis.text
+        if rescore is not None and len(hypothesis.alternatives) > 1:
+            started = time.perf_counter()
+            choice = rescore(hypothesis.alternatives)
+            logger.debug(f"Пересчёт {len(hypothesis.alternatives)} вариантов: "
+                         f"{(time.perf_counter() - started) * 1000:.2f} мс")
+            if choice:
+                logger.info(f"Выбран вариант {choice + 1} из {len(hypothesis.alternatives)}: "
+                            f"{hypothesis.alternatives[choice]} (первый: {command})")
+                command = hypothesis.alternatives[choice]
         print(f"Вы сказали: {command}")
         logger.info(f"Распознана команда: {command}")
         return command.lower()
-    except (sr.WaitTimeoutError, sr.UnknownValueError):
+    except sr.UnknownValueError:
         speak("Я не поняла вашу команду, Soika.")
     except sr.RequestError as exc:
         logger.error(f"Ошибка распознавания речи: {exc}")
@@ -34,5 +92,3 @@ def listen_command() -> str:
         logger.error(f"Неожиданная ошибка при распознавании: {exc}")
         speak("Произошла неожиданная ошибка.")
     return ""
-
-
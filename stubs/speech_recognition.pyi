@@ -2,17 +2,33 @@
 Типы для speech_recognition
 """
 
-from typing import Any, Optional
+from typing import Any, Optional, Union
 
 class Recognizer:
     def adjust_for_ambient_noise(self, source: Any, duration: int = 1) -> None: ...
     def listen(self, source: Any, timeout: Optional[int] = None, 
                phrase_time_limit: Optional[int] = None) -> Any: ...
-    def recognize_google(self, audio: Any, language: str = "en-US") -> str: ...
+    def recognize_google(self, audio: Any, language: str = "en-US",
+                         show_all: bool = ...) -> Union[str, dict, list]: ...
+
+class AudioData:
+    sample_rate: int
+    sample_width: int
+    def __init__(self, frame_data: bytes, sample_rate: int, sample_width: int) -> None: ...
+    def get_raw_data(self, convert_rate: Optional[int] = None,
+                     convert_width: Optional[int] = None) -> bytes: ...
+    def get_wav_data(self, convert_rate: Optional[int] = None,
+                     convert_width: Optional[int] = None) -> bytes: ...
 
 class Microphone:
+    SAMPLE_RATE: int
+    SAMPLE_WIDTH: int
+    CHUNK: int
+    stream: Any
     def __init__(self, device_index: Optional[int] = None, 
                  sample_rate: int = 16000, chunk_size: int = 1024) -> None: ...
+    def __enter__(self) -> "Microphone": ...
+    def __exit__(self, *args: Any) -> None: ...
 
 class WaitTimeoutError(Exception): ...
 class UnknownValueError(Exception): ...
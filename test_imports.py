@@ -10,6 +10,7 @@ def test_imports():
         'pyttsx3', 
         'psutil',
         'PIL',
+        'numpy',
         'pyautogui',
         'tkinter',
         'threading',